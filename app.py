@@ -1,143 +1,26 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-import pandas_ta as ta
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+import time
 import streamlit.components.v1 as components
+from motor.almacen import AlmacenOHLCV, recortar_periodo
+from motor.backtest import backtest_binario, backtest_tradicional
+from motor.cache_resultados import CacheResultados, clave_resultado
+from motor.escaner import escanear
+from motor.estrategias import ESTRATEGIA_ML, ESTRATEGIAS, columna_estrategia
+from motor.grafico import construir_figura
+from motor.indicadores import MotorIndicadores
+from motor.memoria import huella_memoria, senal
+from motor.modelo import RegistroModelos, huella_datos, preparar_datos_ml
+from motor.optimizacion import optimizar
+from motor.pipeline import aplicar_indicadores, horizonte_prediccion, pasos_expiracion, resumen_operaciones, senal_en_vivo, unir_prediccion_ml
+from motor.replay import replay, resumen_replay
+from motor.servicio import FuenteAlmacen, ServicioSenales, iniciar_en_segundo_plano
+from motor.walkforward import MAX_PLIEGUES, paso_reentrenamiento, precision_global, walk_forward
 
 st.set_page_config(layout="wide", initial_sidebar_state="expanded")
 
 st.title("🤖 Herramienta de Trading con Machine Learning y Señales en Vivo")
 
-# --- MODIFICADO: Función para calcular Soportes y Resistencias (Versión Corregida y Robusta) ---
-def calculate_support_resistance(df, window=5, threshold_pct=0.5):
-    highs = df['High']
-    lows = df['Low']
-    fractal_highs_idx = []
-    fractal_lows_idx = []
-    
-    for i in range(window // 2, len(highs) - window // 2):
-        is_high_fractal = True
-        is_low_fractal = True
-        current_high = highs.iloc[i]
-        current_low = lows.iloc[i]
-        
-        for j in range(i - window // 2, i + window // 2 + 1):
-            if j == i: continue
-            if highs.iloc[j] >= current_high: is_high_fractal = False
-            if lows.iloc[j] <= current_low: is_low_fractal = False
-        
-        if is_high_fractal: fractal_highs_idx.append(i)
-        if is_low_fractal: fractal_lows_idx.append(i)
-
-    fractal_highs = df['High'].iloc[fractal_highs_idx].values
-    fractal_lows = df['Low'].iloc[fractal_lows_idx].values
-    
-    def cluster_levels(levels):
-        levels_array = np.array(levels)
-        if levels_array.size == 0: return []
-        levels_array.sort()
-        clustered = []
-        current_cluster = [levels_array[0]]
-        
-        for i in range(1, len(levels_array)):
-            cluster_mean = np.mean(current_cluster)
-            if cluster_mean == 0:
-                 if abs(levels_array[i] - cluster_mean) < (threshold_pct / 100):
-                     current_cluster.append(levels_array[i])
-                 else:
-                     clustered.append(cluster_mean)
-                     current_cluster = [levels_array[i]]
-            else:
-                 if abs(levels_array[i] - cluster_mean) / cluster_mean * 100 < threshold_pct:
-                     current_cluster.append(levels_array[i])
-                 else:
-                     clustered.append(cluster_mean)
-                     current_cluster = [levels_array[i]]
-        
-        if current_cluster: clustered.append(np.mean(current_cluster))
-        return clustered
-
-    resistance_levels = cluster_levels(fractal_highs)
-    support_levels = cluster_levels(fractal_lows)
-    return support_levels, resistance_levels
-
-# --- NUEVO: SEÑAL EN VIVO - Funciones Auxiliares ---
-def calculate_ema_slope(df, ema_col='EMA_20', period=5):
-    """Calcula la pendiente de una EMA para determinar la fuerza de la tendencia."""
-    if len(df) < period + 1:
-        return 0
-    recent_values = df[ema_col].tail(period)
-    slope = np.polyfit(range(len(recent_values)), recent_values, 1)[0]
-    # Normalizar la pendiente para que sea más interpretable
-    normalized_slope = (slope / recent_values.mean()) * 1000
-    return normalized_slope
-
-def check_proximity_to_sr(price, levels, threshold_pct=0.5):
-    """Verifica si el precio está cerca de un nivel de soporte o resistencia."""
-    for level in levels:
-        if abs(price - level) / price * 100 < threshold_pct:
-            return True
-    return False
-
-# --- NUEVO: SEÑAL EN VIVO - Función Principal de Análisis ---
-def analizar_senal_en_vivo(df, support_levels, resistance_levels):
-    """Analiza la última vela para generar una recomendación de trading en vivo."""
-    if df.empty:
-        return {"action": "ESPERAR", "strength": "N/A", "reason": "No hay datos para analizar."}
-
-    last_row = df.iloc[-1]
-    current_price = last_row['Close']
-    
-    # 1. Señal Base de la Estrategia
-    base_buy_signal = last_row['senal_compra']
-    base_sell_signal = last_row['senal_venta']
-    
-    # 2. Fuerza de la Tendencia
-    ema_slope = calculate_ema_slope(df)
-    trend_strength = "Fuerte" if abs(ema_slope) > 0.5 else "Moderada" if abs(ema_slope) > 0.1 else "Débil"
-    trend_direction = "alcista" if ema_slope > 0 else "bajista"
-
-    # 3. Proximidad a S/R
-    near_resistance = check_proximity_to_sr(current_price, resistance_levels)
-    near_support = check_proximity_to_sr(current_price, support_levels)
-    
-    # 4. Confirmación de Volumen
-    volume_confirmed = last_row['volumen_alto']
-
-    # --- Lógica de Decisión ---
-    recommendation = {}
-    
-    if base_buy_signal:
-        strength_score = 0
-        reasons = []
-        if trend_direction == "alcista": strength_score += 2; reasons.append(f"Tendencia {trend_strength} alcista.")
-        if near_support: strength_score += 2; reasons.append("Cercano a soporte clave.")
-        if volume_confirmed: strength_score += 1; reasons.append("Confirmado por volumen alto.")
-        
-        if strength_score >= 4: recommendation = {"action": "COMPRA (CALL)", "strength": "FUERTE", "reason": " | ".join(reasons)}
-        elif strength_score >= 2: recommendation = {"action": "COMPRA (CALL)", "strength": "MODERADA", "reason": " | ".join(reasons)}
-        else: recommendation = {"action": "COMPRA (CALL)", "strength": "DÉBIL", "reason": "Señal sin confirmaciones claras."}
-
-    elif base_sell_signal:
-        strength_score = 0
-        reasons = []
-        if trend_direction == "bajista": strength_score += 2; reasons.append(f"Tendencia {trend_strength} bajista.")
-        if near_resistance: strength_score += 2; reasons.append("Cercano a resistencia clave.")
-        if volume_confirmed: strength_score += 1; reasons.append("Confirmado por volumen alto.")
-
-        if strength_score >= 4: recommendation = {"action": "VENTA (PUT)", "strength": "FUERTE", "reason": " | ".join(reasons)}
-        elif strength_score >= 2: recommendation = {"action": "VENTA (PUT)", "strength": "MODERADA", "reason": " | ".join(reasons)}
-        else: recommendation = {"action": "VENTA (PUT)", "strength": "DÉBIL", "reason": "Señal sin confirmaciones claras."}
-    else:
-        recommendation = {"action": "ESPERAR", "strength": "N/A", "reason": "No hay señal de entrada según la estrategia."}
-        
-    return recommendation
-
 # --- 1. CONFIGURACIÓN EN LA BARRA LATERAL ---
 st.sidebar.header("Parámetros de Configuración")
 ACTIVO = st.sidebar.text_input("Símbolo del Activo", value="AAPL")
@@ -150,6 +33,7 @@ st.sidebar.info("💡 **Tip:** El 'Período de Datos' se ajusta automáticamente
 st.sidebar.header("Actualización de Datos")
 refresh_button = st.sidebar.button("🔄 Actualizar Datos Ahora")
 auto_refresh_interval = st.sidebar.slider("Intervalo de Auto-Refresh (segundos)", min_value=30, max_value=600, value=120, step=30)
+SENAL_STREAMING = st.sidebar.checkbox("Señal en Vivo por Streaming", value=False, help="Un servicio en segundo plano consulta las velas nuevas cada intervalo y actualiza solo la señal en vivo, sin recargar la página. No disponible con la estrategia de Machine Learning.")
 
 st.sidebar.header("Modo de Operación")
 MODO_BINARIAS = st.sidebar.checkbox("Activar Modo Opciones Binarias", value=False, help="Activa el simulador de Opciones Binarias con expiración fija.")
@@ -167,223 +51,263 @@ if MODO_BINARIAS:
     INVERSION_POR_OPERACION = st.sidebar.number_input("Inversión por Operación ($)", value=100, min_value=1)
 
 st.sidebar.header("Estrategia de Trading")
-ESTRATEGIA = st.sidebar.selectbox("Selecciona Estrategia", 
-                                  ['Momentum', 'Mean Reversion', 'MACD Crossover', 'Stochastic Oscillator', 'VWAP Trading', 'Machine Learning (RF)'], 
-                                  index=5)
+ESTRATEGIA = st.sidebar.selectbox("Selecciona Estrategia", ESTRATEGIAS, index=ESTRATEGIAS.index(ESTRATEGIA_ML))
 ML_THRESHOLD = 0.6
-if ESTRATEGIA == 'Machine Learning (RF)':
+ML_WALK_FORWARD = False
+if ESTRATEGIA == ESTRATEGIA_ML:
     st.sidebar.subheader("Parámetros de ML")
     ML_THRESHOLD = st.sidebar.slider("Umbral de Confianza para Comprar (%)", 50, 90, 60) / 100
+    ML_WALK_FORWARD = st.sidebar.checkbox("Evaluación Walk-Forward", value=False, help="Reentrena el modelo cada N velas y predice solo las velas siguientes (todas las señales fuera de muestra).")
+    if ML_WALK_FORWARD:
+        ML_REENTRENAR_CADA = st.sidebar.number_input("Reentrenar cada N velas", value=250, min_value=20, step=10)
+
+st.sidebar.header("Optimización de Parámetros")
+MODO_OPTIMIZACION = st.sidebar.checkbox("Activar Optimización por Rejilla", value=False, help="Evalúa en paralelo todas las combinaciones de parámetros del backtester tradicional.")
+if MODO_OPTIMIZACION:
+    OPT_ESTRATEGIAS = st.sidebar.multiselect("Estrategias a Evaluar", ESTRATEGIAS, default=[ESTRATEGIA])
+    OPT_STOP_LOSS = st.sidebar.slider("Rango Stop-Loss (%)", 1, 20, (2, 10))
+    OPT_TAKE_PROFIT = st.sidebar.slider("Rango Take-Profit (%)", 1, 30, (5, 20))
+    OPT_TRAILING_STOP = st.sidebar.slider("Rango Trailing Stop (%)", 1, 20, (1, 5))
+    OPT_ML_THRESHOLD = st.sidebar.slider("Rango Umbral ML (%)", 50, 90, (55, 70), step=5, help="Solo se aplica a la estrategia de Machine Learning.")
+
+st.sidebar.header("Escáner de Activos")
+MODO_ESCANER = st.sidebar.checkbox("Activar Escáner Multi-Activo", value=False, help="Analiza la señal en vivo de una lista de activos en paralelo.")
+if MODO_ESCANER:
+    ESCANER_WATCHLIST = st.sidebar.text_area("Lista de Activos (separados por comas)", value="AAPL, MSFT, GOOGL, AMZN, NVDA, TSLA, META, JPM")
+    ESCANER_ESTRATEGIA = st.sidebar.selectbox("Estrategia del Escáner", [e for e in ESTRATEGIAS if e != ESTRATEGIA_ML])
+    ESCANER_PROCESOS = st.sidebar.slider("Procesos de Análisis", 1, 16, 4)
+    ESCANER_DESCARGAS = st.sidebar.slider("Descargas Simultáneas", 1, 16, 4)
+
+st.sidebar.header("Replay de la Señal en Vivo")
+MODO_REPLAY = st.sidebar.checkbox("Activar Replay de la Señal en Vivo", value=False, help="Reproduce el histórico vela a vela con la lógica de la señal en vivo y mide el resultado de cada recomendación FUERTE/MODERADA/DÉBIL.")
+if MODO_REPLAY:
+    REPLAY_VELAS_RESULTADO = st.sidebar.number_input("Velas hasta el Resultado", value=max(1, pasos_expiracion(TIMEFRAME, EXPIRACION_MINUTOS)) if MODO_BINARIAS else 5, min_value=1, help="El resultado de cada recomendación es el cierre N velas después.")
+
+ALMACEN_OHLCV = AlmacenOHLCV()
 
 @st.cache_data(ttl=300) 
 def cargar_datos_robusto(activo, periodo, intervalo):
-    simbolos_a_probar = [activo]
-    if activo.endswith('-USD'): simbolos_a_probar.append(activo.replace('-USD', '=X'))
-    for simbolo in simbolos_a_probar:
-        with st.spinner(f'Descargando datos para {simbolo}...'):
-            try:
-                datos = yf.download(simbolo, period=periodo, interval=intervalo, progress=False)
-                if datos.empty: continue
-                if isinstance(datos.columns, pd.MultiIndex):
-                    datos.columns = ['_'.join(col).strip() for col in datos.columns.values]
-                    rename_dict = {f'Open_{simbolo}': 'Open', f'High_{simbolo}': 'High', f'Low_{simbolo}': 'Low', f'Close_{simbolo}': 'Close', f'Adj Close_{simbolo}': 'Adj Close', f'Volume_{simbolo}': 'Volume'}
-                    datos = datos.rename(columns=rename_dict)
-                st.success(f"✅ Datos descargados exitosamente para '{simbolo}'. Última actualización: {datos.index[-1]}")
-                return datos
-            except Exception as e: continue
+    with st.spinner(f'Cargando datos para {activo}...'):
+        # Todo el histórico guardado: el motor de indicadores parte siempre de la misma vela.
+        datos, simbolo = ALMACEN_OHLCV.cargar(activo, periodo, intervalo, completo=True)
+    if datos is not None:
+        st.success(f"✅ Datos cargados exitosamente para '{simbolo}'. Última actualización: {datos.index[-1]}")
+        return datos
     st.error(f"❌ No se pudieron descargar los datos.")
     return None
 
+# El escáner lanza descargas y un pool de procesos: se reutiliza su resultado en los refrescos en lugar de repetirlo.
+@st.cache_data(ttl=300, show_spinner="Escaneando la lista de activos...")
+def escanear_lista(simbolos, periodo, intervalo, estrategia, procesos, descargas):
+    return escanear(simbolos, periodo, intervalo, estrategia=estrategia, almacen=ALMACEN_OHLCV, max_workers=procesos, max_descargas=descargas)
+
+@st.cache_resource
+def obtener_motor_indicadores(activo, periodo, intervalo):
+    return MotorIndicadores()
+
+@st.cache_resource
+def obtener_registro_modelos():
+    return RegistroModelos()
+
+@st.cache_resource
+def obtener_cache_resultados():
+    return CacheResultados()
+
+def resultado_compartido(etapa, calcular, *contenido, **parametros):
+    # Compartido entre sesiones: mismo activo, mismas velas y mismos parámetros → se calcula una vez.
+    return obtener_cache_resultados().obtener(clave_resultado(ACTIVO, TIMEFRAME, PERIODO, etapa, *contenido, **parametros), calcular)
+
+@st.cache_data(ttl=3600, show_spinner="Evaluando el modelo walk-forward...")
+def evaluar_walk_forward(df_ml, prediction_horizon, reentrenar_cada):
+    return walk_forward(df_ml, prediction_horizon, reentrenar_cada=reentrenar_cada)
+
+@st.cache_resource(max_entries=4, on_release=lambda servicio: servicio.detener())
+def obtener_servicio_senales(activo, periodo, intervalo, estrategia, sr_window, sr_threshold, cada_segundos, _historico):
+    servicio = ServicioSenales(_historico, estrategia=estrategia, simbolo=activo, sr_window=sr_window, sr_threshold=sr_threshold)
+    iniciar_en_segundo_plano(servicio, FuenteAlmacen(ALMACEN_OHLCV, activo, periodo, intervalo, cada_segundos=cada_segundos, desde=_historico.index[-1]))
+    return servicio
+
+def mostrar_senal(live_signal, current_price):
+    col_signal, col_reason = st.columns(2)
+    with col_signal:
+        if "COMPRA" in live_signal['action']:
+            st.error(f"ACCIÓN RECOMENDADA: {live_signal['action']}")
+            st.metric("Fuerza de la Señal", live_signal['strength'])
+        elif "VENTA" in live_signal['action']:
+            st.warning(f"ACCIÓN RECOMENDADA: {live_signal['action']}")
+            st.metric("Fuerza de la Señal", live_signal['strength'])
+        else:
+            st.info(f"ACCIÓN RECOMENDADA: {live_signal['action']}")
+            st.metric("Fuerza de la Señal", live_signal['strength'])
+            
+    with col_reason:
+        st.subheader("Razonamiento")
+        st.write(live_signal['reason'])
+        st.caption(f"Precio Actual: {current_price:.2f}")
+
+# Solo este fragmento se vuelve a ejecutar: lee el último evento que ha publicado el servicio.
+@st.fragment(run_every=2)
+def mostrar_senal_streaming(servicio):
+    evento = servicio.ultimo_evento
+    mostrar_senal(evento['senal'], evento['precio'])
+    estadisticas = servicio.estadisticas()
+    latencia = f" Latencia vela → señal: p50 {estadisticas['p50_ms']:.1f} ms, p95 {estadisticas['p95_ms']:.1f} ms." if estadisticas['eventos'] else ""
+    st.caption(f"📡 Streaming: última vela {evento['vela']}{' (revisada)' if evento['revisada'] else ''}, {estadisticas['eventos']} actualizaciones.{latencia}")
+
 if refresh_button: st.rerun()
 
-datos_historicos = cargar_datos_robusto(ACTIVO, PERIODO, TIMEFRAME)
+# --- NUEVO: ESCÁNER MULTI-ACTIVO ---
+if MODO_ESCANER:
+    st.header("📡 Escáner de Activos")
+    simbolos_escaner = tuple(dict.fromkeys(simbolo.strip() for simbolo in ESCANER_WATCHLIST.replace('\n', ',').split(',') if simbolo.strip()))
+    tabla_escaner, estadisticas_escaner = escanear_lista(simbolos_escaner, PERIODO, TIMEFRAME, ESCANER_ESTRATEGIA, ESCANER_PROCESOS, ESCANER_DESCARGAS)
+    st.caption(f"{estadisticas_escaner['simbolos']} activos en {estadisticas_escaner['segundos']:.1f} s ({estadisticas_escaner['simbolos_por_segundo']:.1f} activos/s).")
+    st.dataframe(tabla_escaner)
+
+historico_completo = cargar_datos_robusto(ACTIVO, PERIODO, TIMEFRAME)
+datos_historicos = None if historico_completo is None else recortar_periodo(historico_completo, PERIODO)
 
 if datos_historicos is not None:
     # --- 3. APLICAR ALGORITMOS Y SEÑALES ---
-    datos_historicos.ta.ema(length=20, append=True)
-    datos_historicos.ta.ema(length=50, append=True)
-    datos_historicos.ta.rsi(length=14, append=True)
-    datos_historicos.ta.macd(fast=12, slow=26, signal=9, append=True)
-    datos_historicos.ta.stoch(high='High', low='Low', close='Close', k=14, d=3, append=True)
-    datos_historicos.ta.vwap(append=True)
-    datos_historicos.ta.atr(length=14, append=True)
-    bb_length, bb_std = 20, 2
-    datos_historicos['BBM'] = datos_historicos['Close'].rolling(window=bb_length).mean()
-    datos_historicos['BBL'] = datos_historicos['BBM'] - (datos_historicos['Close'].rolling(window=bb_length).std() * bb_std)
-    datos_historicos['BBU'] = datos_historicos['BBM'] + (datos_historicos['Close'].rolling(window=bb_length).std() * bb_std)
-    datos_historicos['Volume_SMA'] = datos_historicos['Volume'].rolling(window=20).mean()
-    datos_historicos['volumen_alto'] = datos_historicos['Volume'] > datos_historicos['Volume_SMA'] * 1.2
-
-    datos_historicos['tendencia_alcista'] = (datos_historicos['Close'] > datos_historicos['EMA_20']) & (datos_historicos['Close'] > datos_historicos['EMA_50'])
-    datos_historicos['senal_momentum'] = (datos_historicos['Close'] > datos_historicos['EMA_20']) & (datos_historicos['Close'].shift(1) <= datos_historicos['EMA_20']) & datos_historicos['tendencia_alcista'] & (datos_historicos['RSI_14'] < 70) & datos_historicos['volumen_alto']
-    datos_historicos['senal_mean_reversion'] = (datos_historicos['Close'] < datos_historicos['BBL']) & (datos_historicos['RSI_14'] < 30) & datos_historicos['volumen_alto']
-    datos_historicos['senal_macd'] = (datos_historicos['MACD_12_26_9'] > datos_historicos['MACDs_12_26_9']) & (datos_historicos['MACD_12_26_9'].shift(1) <= datos_historicos['MACDs_12_26_9'].shift(1)) & (datos_historicos['MACD_12_26_9'] < 0)
-    datos_historicos['senal_stoch'] = (datos_historicos['STOCHk_14_3_3'] < 20) & (datos_historicos['STOCHk_14_3_3'] > datos_historicos['STOCHd_14_3_3'])
-    datos_historicos['senal_vwap'] = (datos_historicos['Close'] < datos_historicos['VWAP_D']) & (datos_historicos['Close'].shift(1) >= datos_historicos['VWAP_D'].shift(1)) & datos_historicos['volumen_alto']
-    datos_historicos['senal_venta'] = (datos_historicos['Close'] < datos_historicos['EMA_20']) & (datos_historicos['Close'].shift(1) >= datos_historicos['EMA_20'].shift(1)) & (datos_historicos['RSI_14'] > 30)
+    # Los indicadores se calculan sobre todo el histórico guardado: la huella es la de este, no la del período.
+    huella_velas = huella_datos(historico_completo)
+    datos_velas = datos_historicos
+    # Copia superficial: las columnas que añade esta sesión no llegan al resultado compartido.
+    datos_historicos = resultado_compartido('indicadores', lambda: aplicar_indicadores(datos_velas, obtener_motor_indicadores(ACTIVO, PERIODO, TIMEFRAME), compacto=True,
+                                                                                       historico=historico_completo),
+                                            huella_velas).copy(deep=False)
 
     datos_historicos['senal_ml'] = False
-    if ESTRATEGIA == 'Machine Learning (RF)':
-        st.subheader("🧠 Entrenando Modelo de Machine Learning...")
-        if MODO_BINARIAS:
-            timeframe_minutes = int(TIMEFRAME.replace('m', '').replace('h', '60').replace('d', '1440'))
-            expiracion_steps = EXPIRACION_MINUTOS // timeframe_minutes
-            prediction_horizon = expiracion_steps
-        else: prediction_horizon = 5
+    if ESTRATEGIA == ESTRATEGIA_ML:
+        st.subheader("🧠 Modelo de Machine Learning")
+        if MODO_BINARIAS: prediction_horizon = horizonte_prediccion(TIMEFRAME, modo_binarias=True, expiracion_minutos=EXPIRACION_MINUTOS)
+        else: prediction_horizon = horizonte_prediccion(TIMEFRAME)
         if prediction_horizon < 1: st.error(f"⚠️ Error de Configuración.")
         else:
-            features = ['EMA_20', 'EMA_50', 'RSI_14', 'ATRr_14', 'Volume_SMA', 'MACD_12_26_9', 'MACDh_12_26_9', 'STOCHk_14_3_3', 'VWAP_D']
-            df_ml = datos_historicos[features].copy()
-            df_ml.dropna(inplace=True)
-            df_ml['target'] = datos_historicos['Close'].shift(-prediction_horizon) > datos_historicos['Close']
-            df_ml.dropna(inplace=True)
+            df_ml = preparar_datos_ml(datos_historicos, prediction_horizon)
             if df_ml['target'].nunique() < 2: st.warning("⚠️ Advertencia: La variable objetivo para el modelo solo contiene una clase.")
+            elif ML_WALK_FORWARD:
+                probabilidades_wf, pliegues_wf = evaluar_walk_forward(df_ml, prediction_horizon, ML_REENTRENAR_CADA)
+                if pliegues_wf.empty: st.warning("⚠️ No hay suficientes datos para la evaluación walk-forward.")
+                else:
+                    paso_wf = paso_reentrenamiento(len(df_ml), prediction_horizon, ML_REENTRENAR_CADA)
+                    st.success(f"✅ Walk-forward: {len(pliegues_wf)} pliegues reentrenando cada {paso_wf} velas, {pliegues_wf['segundos'].sum():.1f} s de entrenamiento.")
+                    if paso_wf != ML_REENTRENAR_CADA: st.info(f"ℹ️ Para no pasar de {MAX_PLIEGUES} pliegues se reentrena cada {paso_wf} velas en lugar de cada {ML_REENTRENAR_CADA}.")
+                    datos_historicos = unir_prediccion_ml(datos_historicos, df_ml, probabilidades_wf, ML_THRESHOLD)
+                    st.info(f"Precisión fuera de muestra (sobre las {pliegues_wf['filas_evaluadas'].sum():,} velas evaluadas de todos los pliegues): {precision_global(pliegues_wf):.2f}")
+                    st.dataframe(pliegues_wf)
             else:
-                X = df_ml.drop('target', axis=1); y = df_ml['target']
-                split_index = int(len(X) * 0.8)
-                X_train, X_test = X[:split_index], X[split_index:]; y_train, y_test = y[:split_index], y[split_index:]
-                model = RandomForestClassifier(n_estimators=100, min_samples_leaf=10, random_state=42)
-                model.fit(X_train, y_train)
-                st.success("✅ Modelo entrenado con éxito.")
-                probabilidades = model.predict_proba(df_ml[features])[:, 1]
-                df_ml['probabilidad_subida'] = probabilidades
-                df_ml['senal_ml_pred'] = df_ml['probabilidad_subida'] > ML_THRESHOLD
-                datos_historicos = datos_historicos.join(df_ml[['senal_ml_pred', 'probabilidad_subida']], how='left')
-                datos_historicos['senal_ml'] = datos_historicos['senal_ml_pred'].fillna(False)
-                accuracy = model.score(X_test, y_test)
-                st.info(f"Precisión del modelo en datos de prueba: {accuracy:.2f}")
-
-    if ESTRATEGIA == 'Momentum': datos_historicos['senal_compra'] = datos_historicos['senal_momentum']
-    elif ESTRATEGIA == 'Mean Reversion': datos_historicos['senal_compra'] = datos_historicos['senal_mean_reversion']
-    elif ESTRATEGIA == 'MACD Crossover': datos_historicos['senal_compra'] = datos_historicos['senal_macd']
-    elif ESTRATEGIA == 'Stochastic Oscillator': datos_historicos['senal_compra'] = datos_historicos['senal_stoch']
-    elif ESTRATEGIA == 'VWAP Trading': datos_historicos['senal_compra'] = datos_historicos['senal_vwap']
-    else: datos_historicos['senal_compra'] = datos_historicos['senal_ml']
+                resultado_ml = obtener_registro_modelos().predecir(ACTIVO, TIMEFRAME, df_ml, prediction_horizon)
+                if resultado_ml['reentrenado']: st.success(f"✅ Modelo entrenado con éxito ({resultado_ml['motivo']}).")
+                else: st.success(f"✅ Modelo reutilizado del registro ({resultado_ml['motivo']}).")
+                datos_historicos = unir_prediccion_ml(datos_historicos, df_ml, resultado_ml['probabilidades'], ML_THRESHOLD)
+                st.info(f"Precisión del modelo en datos de prueba: {resultado_ml['precision']:.2f}")
+
+    datos_historicos['senal_compra'] = senal(datos_historicos, columna_estrategia(ESTRATEGIA))
+    st.caption(f"Histórico en memoria: {len(datos_historicos):,} velas, {huella_memoria(datos_historicos) / 1024 ** 2:.2f} MB.")
+    senal_compra_actual = datos_historicos['senal_compra'].to_numpy()
 
     # --- 4. BACKTESTER ---
     resultados_operaciones = []
     if MODO_BINARIAS:
         st.header("Resultados del Backtester (Modo Opciones Binarias)")
-        en_posicion, precio_ejecucion, fecha_ejecucion, direccion_prediccion = False, 0, None, None
-        timeframe_minutes = int(TIMEFRAME.replace('m', '').replace('h', '60').replace('d', '1440'))
-        expiracion_steps = EXPIRACION_MINUTOS // timeframe_minutes
-        for i in range(len(datos_historicos) - expiracion_steps):
-            if not en_posicion and datos_historicos.iloc[i]['senal_compra']: en_posicion, precio_ejecucion, fecha_ejecucion, direccion_prediccion = True, datos_historicos.iloc[i]['Close'], datos_historicos.index[i], 'CALL'
-            elif not en_posicion and datos_historicos.iloc[i]['senal_venta']: en_posicion, precio_ejecucion, fecha_ejecucion, direccion_prediccion = True, datos_historicos.iloc[i]['Close'], datos_historicos.index[i], 'PUT'
-            elif en_posicion:
-                fecha_expiracion, precio_en_expiracion = datos_historicos.index[i + expiracion_steps], datos_historicos.iloc[i + expiracion_steps]['Close']
-                gano = (direccion_prediccion == 'CALL' and precio_en_expiracion > precio_ejecucion) or (direccion_prediccion == 'PUT' and precio_en_expiracion < precio_ejecucion)
-                rentabilidad = PAYOUT_PCT if gano else -1.0
-                resultados_operaciones.append({'fecha_ejecucion': fecha_ejecucion, 'fecha_expiracion': fecha_expiracion, 'direccion': direccion_prediccion, 'precio_ejecucion': precio_ejecucion, 'precio_expiracion': precio_en_expiracion, 'resultado': 'GANA' if gano else 'PIERDE', 'rentabilidad': rentabilidad, 'beneficio': INVERSION_POR_OPERACION * rentabilidad})
-                en_posicion = False
+        resultados_operaciones = resultado_compartido('backtest_binario', lambda: backtest_binario(datos_historicos, pasos_expiracion(TIMEFRAME, EXPIRACION_MINUTOS), PAYOUT_PCT, INVERSION_POR_OPERACION),
+                                                      huella_velas, senal_compra_actual, expiracion=EXPIRACION_MINUTOS, payout=PAYOUT_PCT, inversion=INVERSION_POR_OPERACION)
     else:
         st.header("Resultados del Backtester (Modo Tradicional)")
-        en_posicion, precio_entrada, stop_loss_actual, take_profit_actual = False, 0, 0, 0
-        for i in range(1, len(datos_historicos)):
-            fila_actual = datos_historicos.iloc[i]
-            if not en_posicion and fila_actual['senal_compra']:
-                en_posicion = True; precio_entrada = fila_actual['Close']
-                atr_actual = fila_actual['ATRr_14']
-                stop_loss_actual = precio_entrada * (1 - max(STOP_LOSS_PCT, atr_actual * 2 if not np.isnan(atr_actual) else STOP_LOSS_PCT))
-                take_profit_actual = precio_entrada * (1 + TAKE_PROFIT_PCT)
-            elif en_posicion:
-                precio_salida = 0
-                if USE_TRAILING_STOP:
-                    nuevo_trailing_stop = fila_actual['Close'] * (1 - TRAILING_STOP_PCT)
-                    if nuevo_trailing_stop > stop_loss_actual: stop_loss_actual = nuevo_trailing_stop
-                if fila_actual['High'] >= take_profit_actual: precio_salida = take_profit_actual
-                elif fila_actual['Low'] <= stop_loss_actual: precio_salida = stop_loss_actual
-                if precio_salida > 0:
-                    rentabilidad = (precio_salida - precio_entrada) / precio_entrada
-                    resultados_operaciones.append({'entrada': precio_entrada, 'salida': precio_salida, 'rentabilidad': rentabilidad, 'fecha_entrada': datos_historicos.index[i-1], 'fecha_salida': datos_historicos.index[i]})
-                    en_posicion = False
+        resultados_operaciones = resultado_compartido('backtest_tradicional', lambda: backtest_tradicional(datos_historicos, STOP_LOSS_PCT, TAKE_PROFIT_PCT, USE_TRAILING_STOP, TRAILING_STOP_PCT),
+                                                      huella_velas, senal_compra_actual, stop_loss=STOP_LOSS_PCT, take_profit=TAKE_PROFIT_PCT,
+                                                      trailing=USE_TRAILING_STOP, trailing_pct=TRAILING_STOP_PCT)
 
     # --- 5. MOSTRAR RESULTADOS ---
     if not resultados_operaciones: st.warning("No se generaron operaciones en el período seleccionado con los parámetros actuales.")
     else:
         df_operaciones = pd.DataFrame(resultados_operaciones)
-        total_ops, ops_ganadoras = len(df_operaciones), sum(1 for r in df_operaciones['rentabilidad'] if r > 0)
-        porcentaje_aciertos = (ops_ganadoras / total_ops) * 100
         if MODO_BINARIAS:
-            beneficio_total, inversion_total = df_operaciones['beneficio'].sum(), total_ops * INVERSION_POR_OPERACION
-            roi_total = (beneficio_total / inversion_total) * 100 if inversion_total > 0 else 0
+            resumen = resumen_operaciones(resultados_operaciones, modo_binarias=True, inversion=INVERSION_POR_OPERACION)
             col1, col2, col3 = st.columns(3)
-            col1.metric("Total Operaciones", total_ops)
-            col2.metric("% Aciertos", f"{porcentaje_aciertos:.2f}%")
-            col3.metric("Beneficio Neto", f"${beneficio_total:.2f}", delta=f"{roi_total:.2f}%")
+            col1.metric("Total Operaciones", resumen['total_operaciones'])
+            col2.metric("% Aciertos", f"{resumen['porcentaje_aciertos']:.2f}%")
+            col3.metric("Beneficio Neto", f"${resumen['beneficio_total']:.2f}", delta=f"{resumen['roi_total']:.2f}%")
             with st.expander("Ver Detalles de Operaciones Binarias"): st.dataframe(df_operaciones)
         else:
-            rentabilidad_total, rentabilidad_media = df_operaciones['rentabilidad'].sum(), df_operaciones['rentabilidad'].mean()
-            max_ganancia, max_perdida = df_operaciones['rentabilidad'].max(), df_operaciones['rentabilidad'].min()
-            factor_beneficio = abs(df_operaciones[df_operaciones['rentabilidad'] > 0]['rentabilidad'].sum() / df_operaciones[df_operaciones['rentabilidad'] < 0]['rentabilidad'].sum()) if not df_operaciones[df_operaciones['rentabilidad'] < 0].empty else 0
+            resumen = resumen_operaciones(resultados_operaciones)
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Total Operaciones", total_ops); col2.metric("Ops. Ganadoras", ops_ganadoras)
-            col3.metric("% Aciertos", f"{porcentaje_aciertos:.2f}%"); col4.metric("Rentabilidad Total", f"{rentabilidad_total * 100:.2f}%", delta=f"{rentabilidad_total * 100:.2f}%")
+            col1.metric("Total Operaciones", resumen['total_operaciones']); col2.metric("Ops. Ganadoras", resumen['operaciones_ganadoras'])
+            col3.metric("% Aciertos", f"{resumen['porcentaje_aciertos']:.2f}%"); col4.metric("Rentabilidad Total", f"{resumen['rentabilidad_total'] * 100:.2f}%", delta=f"{resumen['rentabilidad_total'] * 100:.2f}%")
             col5, col6, col7, col8 = st.columns(4)
-            col5.metric("Rentabilidad Media", f"{rentabilidad_media * 100:.2f}%"); col6.metric("Máx. Ganancia", f"{max_ganancia * 100:.2f}%")
-            col7.metric("Máx. Pérdida", f"{max_perdida * 100:.2f}%"); col8.metric("Factor Beneficio", f"{factor_beneficio:.2f}")
+            col5.metric("Rentabilidad Media", f"{resumen['rentabilidad_media'] * 100:.2f}%"); col6.metric("Máx. Ganancia", f"{resumen['max_ganancia'] * 100:.2f}%")
+            col7.metric("Máx. Pérdida", f"{resumen['max_perdida'] * 100:.2f}%"); col8.metric("Factor Beneficio", f"{resumen['factor_beneficio']:.2f}")
             with st.expander("Ver Detalles de Operaciones"): st.dataframe(df_operaciones)
 
+    # --- NUEVO: OPTIMIZACIÓN DE PARÁMETROS ---
+    if MODO_OPTIMIZACION:
+        st.header("🔍 Optimización de Parámetros (Modo Tradicional)")
+        estrategias_opt = OPT_ESTRATEGIAS
+        if ESTRATEGIA_ML in estrategias_opt and 'probabilidad_subida' not in datos_historicos.columns:
+            st.warning("⚠️ La estrategia de Machine Learning solo se optimiza cuando es la estrategia seleccionada (el modelo debe estar entrenado).")
+            estrategias_opt = [e for e in estrategias_opt if e != ESTRATEGIA_ML]
+        if not estrategias_opt: st.info("Selecciona al menos una estrategia para optimizar.")
+        else:
+            rango_pct = lambda rango, paso=1: [valor / 100 for valor in range(rango[0], rango[1] + 1, paso)]
+            with st.spinner("Evaluando combinaciones de parámetros..."):
+                tabla_optimizacion = optimizar(datos_historicos, estrategias_opt, rango_pct(OPT_STOP_LOSS), rango_pct(OPT_TAKE_PROFIT), rango_pct(OPT_TRAILING_STOP),
+                                               ml_threshold=rango_pct(OPT_ML_THRESHOLD, 5), use_trailing_stop=(USE_TRAILING_STOP,))
+            st.caption(f"{len(tabla_optimizacion)} combinaciones evaluadas, ordenadas por rentabilidad total.")
+            st.dataframe(tabla_optimizacion.head(50))
+
     # --- NUEVO: SEÑAL EN VIVO - Cálculo y Visualización ---
     st.sidebar.subheader("Soportes y Resistencias")
     sr_window = st.sidebar.slider("Ventana para Fractales", 5, 21, 5, help="Número de velas para identificar un pico/valle.")
     sr_threshold = st.sidebar.slider("Umbral de Agrupación (%)", 0.1, 2.0, 0.5, step=0.1, help="Agrupa niveles cercanos. Valor más bajo = más niveles.")
-    support_levels, resistance_levels = calculate_support_resistance(datos_historicos, window=sr_window, threshold_pct=sr_threshold)
-    current_price = datos_historicos['Close'].iloc[-1]
-    price_filter_pct = 0.10
-    relevant_support = [level for level in support_levels if abs(level - current_price) / current_price < price_filter_pct]
-    relevant_resistance = [level for level in resistance_levels if abs(level - current_price) / current_price < price_filter_pct]
+    en_vivo = resultado_compartido('senal_en_vivo', lambda: senal_en_vivo(datos_historicos, sr_window, sr_threshold), huella_velas, senal_compra_actual,
+                                   sr_window=sr_window, sr_threshold=sr_threshold)
+    current_price, relevant_support, relevant_resistance = en_vivo['precio_actual'], en_vivo['soportes'], en_vivo['resistencias']
 
     # --- NUEVO: SEÑAL EN VIVO - Mostrar Recomendación ---
     st.header("🚨 Análisis y Señal en Vivo")
-    live_signal = analizar_senal_en_vivo(datos_historicos, relevant_support, relevant_resistance)
-    
-    col_signal, col_reason = st.columns(2)
-    with col_signal:
-        if "COMPRA" in live_signal['action']:
-            st.error(f"ACCIÓN RECOMENDADA: {live_signal['action']}")
-            st.metric("Fuerza de la Señal", live_signal['strength'])
-        elif "VENTA" in live_signal['action']:
-            st.warning(f"ACCIÓN RECOMENDADA: {live_signal['action']}")
-            st.metric("Fuerza de la Señal", live_signal['strength'])
+    if SENAL_STREAMING and ESTRATEGIA != ESTRATEGIA_ML:
+        mostrar_senal_streaming(obtener_servicio_senales(ACTIVO, PERIODO, TIMEFRAME, ESTRATEGIA, sr_window, sr_threshold, auto_refresh_interval, datos_historicos))
+    else:
+        if SENAL_STREAMING: st.info("ℹ️ El streaming de la señal no está disponible con la estrategia de Machine Learning; se usa el auto-refresh de la página.")
+        mostrar_senal(en_vivo['senal'], current_price)
+
+    # --- NUEVO: REPLAY DE LA SEÑAL EN VIVO ---
+    if MODO_REPLAY:
+        st.header("⏪ Replay de la Señal en Vivo")
+        if ESTRATEGIA == ESTRATEGIA_ML: st.warning("⚠️ El replay no está disponible con la estrategia de Machine Learning.")
         else:
-            st.info(f"ACCIÓN RECOMENDADA: {live_signal['action']}")
-            st.metric("Fuerza de la Señal", live_signal['strength'])
-            
-    with col_reason:
-        st.subheader("Razonamiento")
-        st.write(live_signal['reason'])
-        st.caption(f"Precio Actual: {current_price:.2f}")
+            inicio_replay = time.perf_counter()
+            recomendaciones_replay = replay(datos_historicos, ESTRATEGIA, sr_window, sr_threshold, REPLAY_VELAS_RESULTADO)
+            segundos_replay = time.perf_counter() - inicio_replay
+            st.caption(f"{len(datos_historicos):,} velas reproducidas en {segundos_replay:.2f} s ({len(datos_historicos) / segundos_replay:,.0f} velas/s), {len(recomendaciones_replay)} recomendaciones.")
+            st.dataframe(resumen_replay(recomendaciones_replay))
+            with st.expander("Ver todas las recomendaciones"): st.dataframe(recomendaciones_replay)
 
     st.error("⚠️ **ADVERTENCIA DE RIESGO EXTREMO:** Esta señal es una herramienta de apoyo basada en análisis técnico y algoritmos. NO es una garantía de profit. El mercado es impredecible y puedes perder todo tu capital. Opera bajo tu propio riesgo y nunca arriesgues más de lo que estás dispuesto a perder.")
 
     # --- 6. VISUALIZACIÓN ---
+    st.sidebar.subheader("Gráfico")
+    GRAFICO_RAPIDO = st.sidebar.checkbox("Gráfico Rápido (WebGL + Submuestreo)", value=True, help="Dibuja solo el rango visible y reduce las velas y líneas a un máximo de puntos sin perder máximos ni mínimos.")
+    if GRAFICO_RAPIDO:
+        GRAFICO_MAX_PUNTOS = st.sidebar.slider("Máximo de Puntos por Serie", 500, 5000, 2000, step=500)
+        # Con 50 velas o menos no hay rango que elegir (el slider exige mínimo < máximo): se dibujan todas.
+        GRAFICO_VELAS_VISIBLES = None
+        if len(datos_historicos) > 50: GRAFICO_VELAS_VISIBLES = st.sidebar.slider("Velas Visibles (las más recientes)", 50, len(datos_historicos), len(datos_historicos))
     st.header(f"Gráfico de {ACTIVO}")
-    fig = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.03, subplot_titles=('Precio', 'RSI / Stoch', 'MACD', 'Volumen'), row_heights=[0.5, 0.2, 0.2, 0.1])
-    fig.add_trace(go.Candlestick(x=datos_historicos.index, open=datos_historicos['Open'], high=datos_historicos['High'], low=datos_historicos['Low'], close=datos_historicos['Close'], name='Precio'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['EMA_20'], line=dict(color='orange', width=1), name='EMA 20'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['EMA_50'], line=dict(color='blue', width=1), name='EMA 50'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['VWAP_D'], line=dict(color='purple', width=1, dash='dash'), name='VWAP'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos[datos_historicos['senal_compra']].index, y=datos_historicos[datos_historicos['senal_compra']]['Close'], mode='markers', marker_symbol='triangle-up', marker_size=12, marker_color='lime', name='Señal Compra (CALL)'), row=1, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos[datos_historicos['senal_venta']].index, y=datos_historicos[datos_historicos['senal_venta']]['Close'], mode='markers', marker_symbol='triangle-down', marker_size=12, marker_color='red', name='Señal Venta (PUT)'), row=1, col=1)
-    for level in relevant_resistance:
-        fig.add_hline(y=level, line_width=1.5, line_dash="dot", line_color="red", opacity=0.8, row=1, col=1)
-        fig.add_annotation(x=datos_historicos.index[-1], y=level, text=f"R {level:.2f}", showarrow=False, xanchor='left', yanchor='middle', font=dict(color="red", size=10), row=1, col=1)
-    for level in relevant_support:
-        fig.add_hline(y=level, line_width=1.5, line_dash="dot", line_color="green", opacity=0.8, row=1, col=1)
-        fig.add_annotation(x=datos_historicos.index[-1], y=level, text=f"S {level:.2f}", showarrow=False, xanchor='left', yanchor='middle', font=dict(color="green", size=10), row=1, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['RSI_14'], line=dict(color='purple'), name='RSI 14'), row=2, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['STOCHk_14_3_3'], line=dict(color='blue'), name='Stoch %K'), row=2, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['STOCHd_14_3_3'], line=dict(color='red'), name='Stoch %D'), row=2, col=1)
-    fig.add_hline(y=70, line_width=1, line_dash="dash", line_color="red", row=2, col=1); fig.add_hline(y=30, line_width=1, line_dash="dash", line_color="green", row=2, col=1)
-    fig.add_hline(y=80, line_width=1, line_dash="dash", line_color="red", row=2, col=1); fig.add_hline(y=20, line_width=1, line_dash="dash", line_color="green", row=2, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['MACD_12_26_9'], line=dict(color='blue'), name='MACD'), row=3, col=1)
-    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['MACDs_12_26_9'], line=dict(color='red'), name='Señal MACD'), row=3, col=1)
-    fig.add_trace(go.Bar(x=datos_historicos.index, y=datos_historicos['MACDh_12_26_9'], name='Histograma MACD', marker_color='gray'), row=3, col=1)
-    fig.add_trace(go.Bar(x=datos_historicos.index, y=datos_historicos['Volume'], name='Volumen', marker_color='lightblue'), row=4, col=1)
-    fig.update_layout(xaxis_rangeslider_visible=False, height=1400, showlegend=False)
+    inicio_grafico = time.perf_counter()
+    if GRAFICO_RAPIDO: fig, puntos_grafico = construir_figura(datos_historicos, relevant_support, relevant_resistance, max_puntos=GRAFICO_MAX_PUNTOS, velas_visibles=GRAFICO_VELAS_VISIBLES)
+    else: fig, puntos_grafico = construir_figura(datos_historicos, relevant_support, relevant_resistance, rapido=False)
+    st.caption(f"{puntos_grafico:,} puntos dibujados, figura construida en {(time.perf_counter() - inicio_grafico) * 1000:.0f} ms.")
     st.plotly_chart(fig, use_container_width=True)
 
+    # --- NUEVO: CACHÉ COMPARTIDA ENTRE SESIONES ---
+    estadisticas_cache = obtener_cache_resultados().estadisticas()
+    with st.sidebar.expander(f"🗄️ Caché Compartida ({estadisticas_cache['tasa_aciertos']:.0%} de aciertos)"):
+        st.caption(f"{estadisticas_cache['entradas']} resultados, {estadisticas_cache['bytes'] / 1024 ** 2:.1f} MB, {estadisticas_cache['desalojos']} desalojos, "
+                   f"{estadisticas_cache['esperas']} cálculos compartidos con otra sesión en curso.")
+        st.dataframe(pd.DataFrame(estadisticas_cache['por_etapa']).T)
+
 html_code = f"""
 <script>
     var refresh_button = document.querySelector('[data-testid="stButton"] button');
@@ -391,4 +315,5 @@ html_code = f"""
     setInterval(function() {{ var button_to_click = document.querySelector('[data-refresh-button="true"]'); if (button_to_click) {{ button_to_click.click(); }} }}, {auto_refresh_interval * 1000});
 </script>
 """
-components.html(html_code, height=0)
+# Con el streaming activo solo se actualiza la señal; no hace falta recargar toda la página.
+if not (SENAL_STREAMING and ESTRATEGIA != ESTRATEGIA_ML): components.html(html_code, height=0)
@@ -0,0 +1,70 @@
+"""Compara la descarga completa en cada refresco con el almacén Parquet incremental.
+
+Usa una fuente de datos local que simula yfinance (columnas MultiIndex incluidas) y
+contabiliza los bytes que entrega, así que no necesita conexión.
+Uso: python -m benchmarks.bench_almacen
+"""
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.almacen import AlmacenOHLCV, inicio_periodo
+
+
+class FuenteLocal:
+    """Fuente que sirve un histórico fijo hasta un instante 'actual' que se puede avanzar."""
+
+    def __init__(self, historico, simbolos_validos, latencia_por_mb=0.5):
+        self.historico = historico
+        self.simbolos_validos = simbolos_validos
+        self.latencia_por_mb = latencia_por_mb
+        self.ahora = historico.index[len(historico) // 2]
+        self.bytes_servidos = 0
+
+    def __call__(self, simbolo, intervalo, periodo=None, inicio=None):
+        if simbolo not in self.simbolos_validos: return pd.DataFrame()
+        visibles = self.historico[self.historico.index <= self.ahora]
+        if inicio is None: inicio = inicio_periodo(self.ahora, periodo)
+        datos = visibles[visibles.index >= inicio].copy()
+        megas = datos.memory_usage(index=True).sum()
+        self.bytes_servidos += megas
+        time.sleep(self.latencia_por_mb * megas / 1e6)
+        datos.columns = pd.MultiIndex.from_product([datos.columns, [simbolo]])
+        return datos
+
+
+def main():
+    historico = generar_ohlcv(2 * 60 * 78, intervalo='5m')  # ~120 sesiones de 5m
+    print(f"{'escenario':>28} {'tiempo (s)':>11} {'bytes descargados':>18}")
+    with tempfile.TemporaryDirectory() as directorio:
+        # 'BTC-USD' no existe en la fuente: se ejercita la alternativa '=X'.
+        fuente = FuenteLocal(historico, simbolos_validos={'BTC=X'})
+        almacen = AlmacenOHLCV(directorio, descargar=fuente)
+
+        inicio = time.perf_counter()
+        completo, simbolo = almacen.cargar('BTC-USD', '60d', '5m')
+        print(f"{'primera carga (completa)':>28} {time.perf_counter() - inicio:>11.4f} {fuente.bytes_servidos:>18,}")
+        assert simbolo == 'BTC=X' and list(completo.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+        for refresco in range(3):
+            fuente.ahora += pd.Timedelta(minutes=5)
+            fuente.bytes_servidos = 0
+            inicio = time.perf_counter()
+            incremental, _ = almacen.cargar('BTC-USD', '60d', '5m')
+            duracion_incremental = time.perf_counter() - inicio
+            bytes_incremental = fuente.bytes_servidos
+
+            fuente.bytes_servidos = 0
+            inicio = time.perf_counter()
+            referencia = fuente('BTC=X', '5m', periodo='60d')
+            duracion_completa = time.perf_counter() - inicio
+            referencia.columns = referencia.columns.get_level_values(0)
+            pd.testing.assert_frame_equal(incremental, referencia, check_freq=False)
+            print(f"{f'refresco {refresco + 1} (completo)':>28} {duracion_completa:>11.4f} {fuente.bytes_servidos:>18,}")
+            print(f"{f'refresco {refresco + 1} (incremental)':>28} {duracion_incremental:>11.4f} {bytes_incremental:>18,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Mide el arranque en frío de la línea de comandos frente a las importaciones de la app Streamlit.
+
+Cada medida es un proceso nuevo; los datos salen de un almacén local sintético, sin red.
+
+Uso: python -m benchmarks.bench_arranque
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.almacen import AlmacenOHLCV
+
+REPETICIONES = 3
+
+
+def _cronometrar_proceso(argumentos, entorno):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, *argumentos], env=entorno, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        for simbolo, n_velas, intervalo in [('DIARIO', 260, '1d'), ('INTRADIA', 9_800, '5m')]:
+            datos = generar_ohlcv(n_velas, intervalo=intervalo)
+            datos.attrs['inicio_cubierto'] = 'max'
+            AlmacenOHLCV(directorio).guardar(simbolo, intervalo, datos)
+        entorno = {**os.environ, 'TRADING_DATOS_DIR': directorio, 'TRADING_MODELOS_DIR': os.path.join(directorio, 'modelos')}
+        entorno.pop('TRADING_JIT', None)
+
+        escenarios = [
+            ("import motor", ['-c', 'import motor']),
+            ("import streamlit, plotly, sklearn (app)", ['-c', 'import streamlit, plotly.graph_objects, sklearn.ensemble']),
+            ("CLI 1y diario", ['-m', 'motor', 'DIARIO', '--sin-descarga']),
+            ("CLI 1y diario --jit", ['-m', 'motor', 'DIARIO', '--sin-descarga', '--jit']),
+            ("CLI 6mo 5m", ['-m', 'motor', 'INTRADIA', '--intervalo', '5m', '--periodo', '6mo', '--sin-descarga']),
+            ("CLI 6mo 5m --jit", ['-m', 'motor', 'INTRADIA', '--intervalo', '5m', '--periodo', '6mo', '--sin-descarga', '--jit']),
+        ]
+        print(f"{'escenario':>42} {'mediana (s)':>12}")
+        for escenario, argumentos in escenarios:
+            print(f"{escenario:>42} {_cronometrar_proceso(argumentos, entorno):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
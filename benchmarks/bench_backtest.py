@@ -0,0 +1,104 @@
+"""Compara el núcleo de backtest sobre arrays con los bucles originales fila a fila.
+
+Verifica que las listas de operaciones son idénticas en ambos modos y mide la aceleración.
+Uso: python -m benchmarks.bench_backtest
+"""
+import pickle
+import time
+
+import numpy as np
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.backtest import backtest_binario, backtest_tradicional
+
+
+def backtest_tradicional_bucle(datos_historicos, STOP_LOSS_PCT, TAKE_PROFIT_PCT, USE_TRAILING_STOP, TRAILING_STOP_PCT):
+    """Bucle original del modo tradicional de app.py, conservado como referencia."""
+    resultados_operaciones = []
+    en_posicion, precio_entrada, stop_loss_actual, take_profit_actual = False, 0, 0, 0
+    for i in range(1, len(datos_historicos)):
+        fila_actual = datos_historicos.iloc[i]
+        if not en_posicion and fila_actual['senal_compra']:
+            en_posicion = True; precio_entrada = fila_actual['Close']
+            atr_actual = fila_actual['ATRr_14']
+            stop_loss_actual = precio_entrada * (1 - max(STOP_LOSS_PCT, atr_actual * 2 if not np.isnan(atr_actual) else STOP_LOSS_PCT))
+            take_profit_actual = precio_entrada * (1 + TAKE_PROFIT_PCT)
+        elif en_posicion:
+            precio_salida = 0
+            if USE_TRAILING_STOP:
+                nuevo_trailing_stop = fila_actual['Close'] * (1 - TRAILING_STOP_PCT)
+                if nuevo_trailing_stop > stop_loss_actual: stop_loss_actual = nuevo_trailing_stop
+            if fila_actual['High'] >= take_profit_actual: precio_salida = take_profit_actual
+            elif fila_actual['Low'] <= stop_loss_actual: precio_salida = stop_loss_actual
+            if precio_salida > 0:
+                rentabilidad = (precio_salida - precio_entrada) / precio_entrada
+                resultados_operaciones.append({'entrada': precio_entrada, 'salida': precio_salida, 'rentabilidad': rentabilidad, 'fecha_entrada': datos_historicos.index[i-1], 'fecha_salida': datos_historicos.index[i]})
+                en_posicion = False
+    return resultados_operaciones
+
+
+def backtest_binario_bucle(datos_historicos, expiracion_steps, PAYOUT_PCT, INVERSION_POR_OPERACION):
+    """Bucle original del modo de opciones binarias de app.py, conservado como referencia."""
+    resultados_operaciones = []
+    en_posicion, precio_ejecucion, fecha_ejecucion, direccion_prediccion = False, 0, None, None
+    for i in range(len(datos_historicos) - expiracion_steps):
+        if not en_posicion and datos_historicos.iloc[i]['senal_compra']: en_posicion, precio_ejecucion, fecha_ejecucion, direccion_prediccion = True, datos_historicos.iloc[i]['Close'], datos_historicos.index[i], 'CALL'
+        elif not en_posicion and datos_historicos.iloc[i]['senal_venta']: en_posicion, precio_ejecucion, fecha_ejecucion, direccion_prediccion = True, datos_historicos.iloc[i]['Close'], datos_historicos.index[i], 'PUT'
+        elif en_posicion:
+            fecha_expiracion, precio_en_expiracion = datos_historicos.index[i + expiracion_steps], datos_historicos.iloc[i + expiracion_steps]['Close']
+            gano = (direccion_prediccion == 'CALL' and precio_en_expiracion > precio_ejecucion) or (direccion_prediccion == 'PUT' and precio_en_expiracion < precio_ejecucion)
+            rentabilidad = PAYOUT_PCT if gano else -1.0
+            resultados_operaciones.append({'fecha_ejecucion': fecha_ejecucion, 'fecha_expiracion': fecha_expiracion, 'direccion': direccion_prediccion, 'precio_ejecucion': precio_ejecucion, 'precio_expiracion': precio_en_expiracion, 'resultado': 'GANA' if gano else 'PIERDE', 'rentabilidad': rentabilidad, 'beneficio': INVERSION_POR_OPERACION * rentabilidad})
+            en_posicion = False
+    return resultados_operaciones
+
+
+def preparar_datos(n_velas, semilla=42):
+    """OHLCV sintético con un ATR relativo aproximado y señales aleatorias reproducibles."""
+    df = generar_ohlcv(n_velas, semilla=semilla)
+    rng = np.random.default_rng(semilla)
+    df['ATRr_14'] = ((df['High'] - df['Low']) / df['Close']).rolling(14).mean()
+    df['senal_compra'] = rng.random(n_velas) < 0.05
+    df['senal_venta'] = rng.random(n_velas) < 0.05
+    df['volumen_alto'] = df['Volume'] > df['Volume'].rolling(20).mean() * 1.2
+    return df
+
+
+def _cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def _verificar(referencia, nuevo, descripcion):
+    assert pickle.dumps(referencia) == pickle.dumps(nuevo), f"Operaciones distintas: {descripcion}"
+
+
+def main():
+    # Primera llamada fuera de la medición para no contar la compilación JIT si numba está disponible.
+    calentamiento = preparar_datos(100)
+    backtest_tradicional(calentamiento, 0.05, 0.1, True, 0.03); backtest_binario(calentamiento, 1, 0.85, 100)
+
+    print(f"{'modo':>12} {'velas':>8} {'bucle (s)':>11} {'arrays (s)':>11} {'aceleración':>12} {'ops':>6}")
+    for n_velas in (2_000, 8_760, 20_000):
+        for semilla in range(3):
+            df = preparar_datos(n_velas, semilla)
+            for parametros in ((0.05, 0.10, True, 0.03), (0.01, 0.02, False, 0.03), (0.20, 0.30, True, 0.01)):
+                referencia = backtest_tradicional_bucle(df, *parametros)
+                _verificar(referencia, backtest_tradicional(df, *parametros), f"tradicional {n_velas} velas {parametros}")
+            for expiracion_steps in (0, 1, 3, 48):
+                referencia = backtest_binario_bucle(df, expiracion_steps, 0.85, 100)
+                _verificar(referencia, backtest_binario(df, expiracion_steps, 0.85, 100), f"binario {n_velas} velas {expiracion_steps} pasos")
+
+        df = preparar_datos(n_velas)
+        referencia, t_bucle = _cronometrar(backtest_tradicional_bucle, df, 0.05, 0.10, True, 0.03)
+        nuevo, t_arrays = _cronometrar(backtest_tradicional, df, 0.05, 0.10, True, 0.03)
+        print(f"{'tradicional':>12} {n_velas:>8} {t_bucle:>11.4f} {t_arrays:>11.5f} {t_bucle / t_arrays:>11.0f}x {len(nuevo):>6}")
+        referencia, t_bucle = _cronometrar(backtest_binario_bucle, df, 1, 0.85, 100)
+        nuevo, t_arrays = _cronometrar(backtest_binario, df, 1, 0.85, 100)
+        print(f"{'binario':>12} {n_velas:>8} {t_bucle:>11.4f} {t_arrays:>11.5f} {t_bucle / t_arrays:>11.0f}x {len(nuevo):>6}")
+    print("Listas de operaciones idénticas a los bucles originales en todos los casos.")
+
+
+if __name__ == '__main__':
+    main()
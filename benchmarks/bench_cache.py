@@ -0,0 +1,103 @@
+"""Caché compartida de resultados con varias sesiones simultáneas sobre el mismo activo.
+
+Simula `SESIONES` sesiones (hilos, como en el servidor de Streamlit) que ejecutan a la vez
+el pipeline de la app sobre las mismas velas: indicadores y señales, backtest y señal en vivo.
+Comprueba que cada etapa se calcula una sola vez, que todas las sesiones reciben el mismo
+resultado que sin caché, que una vela nueva cambia la clave y que el límite de bytes desaloja
+las entradas menos usadas. Mide el tiempo total con y sin la caché.
+
+Uso: python -m benchmarks.bench_cache
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_escenario
+from motor.backtest import backtest_tradicional
+from motor.cache_resultados import CacheResultados, clave_resultado, tamano_bytes
+from motor.memoria import senal
+from motor.modelo import huella_datos
+from motor.pipeline import aplicar_indicadores, senal_en_vivo
+
+SESIONES = 10
+ESCENARIO = '6mo_5m'
+
+
+def sesion(velas, cache, calculos):
+    """Pipeline de una sesión; `calculos` cuenta las etapas que se han calculado de verdad."""
+    def calcular(etapa, funcion):
+        def contado():
+            calculos[etapa] += 1
+            return funcion()
+        return contado
+
+    if cache is None: obtener = lambda etapa, funcion, *contenido, **parametros: funcion()
+    else: obtener = lambda etapa, funcion, *contenido, **parametros: cache.obtener(clave_resultado('SINT', '5m', '6mo', etapa, *contenido, **parametros), calcular(etapa, funcion))
+    huella = huella_datos(velas)
+    datos = obtener('indicadores', lambda: aplicar_indicadores(velas.copy(), compacto=True), huella).copy(deep=False)
+    datos['senal_compra'] = senal(datos, 'senal_momentum')
+    compra = datos['senal_compra'].to_numpy()
+    operaciones = obtener('backtest_tradicional', lambda: backtest_tradicional(datos, 0.05, 0.10, True, 0.02), huella, compra, stop_loss=0.05)
+    en_vivo = obtener('senal_en_vivo', lambda: senal_en_vivo(datos), huella, compra, sr_window=5, sr_threshold=0.5)
+    return datos, operaciones, en_vivo
+
+
+def concurrentes(velas, cache):
+    calculos = Counter()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(SESIONES) as pool:
+        resultados = list(pool.map(lambda _: sesion(velas, cache, calculos), range(SESIONES)))
+    return resultados, calculos, time.perf_counter() - inicio
+
+
+def main():
+    velas = generar_escenario(ESCENARIO)
+    sesion(velas, None, Counter())  # carga los kernels compilados antes de medir
+
+    referencia, _, segundos_sin_cache = concurrentes(velas, None)
+    cache = CacheResultados()
+    resultados, calculos, segundos_con_cache = concurrentes(velas, cache)
+    assert set(calculos.values()) == {1}, f"cada etapa debe calcularse una sola vez: {dict(calculos)}"
+    for (datos, operaciones, en_vivo), (datos_ref, operaciones_ref, en_vivo_ref) in zip(resultados, referencia):
+        pd.testing.assert_frame_equal(datos, datos_ref)
+        assert operaciones == operaciones_ref and en_vivo == en_vivo_ref
+    print(f"{SESIONES} sesiones simultáneas sobre {len(velas):,} velas: {segundos_sin_cache * 1000:.0f} ms sin caché, {segundos_con_cache * 1000:.0f} ms con caché")
+    print(f"etapas calculadas: {dict(calculos)}")
+
+    # Una vela nueva cambia la huella de los datos: se recalcula todo.
+    calculos = Counter()
+    sesion(velas.iloc[:-1], cache, calculos)
+    assert sum(calculos.values()) == 3, "con otras velas la clave debe ser otra"
+
+    # Límite de bytes: solo caben dos históricos con indicadores; se desaloja el menos usado.
+    tamano = tamano_bytes(resultados[0][0])
+    pequena = CacheResultados(max_bytes=int(tamano * 2.5))
+    for corte in (0, 1, 2, 0):
+        sesion(velas.iloc[:len(velas) - corte], pequena, Counter())
+    estadisticas = pequena.estadisticas()
+    assert estadisticas['desalojos'] > 0 and estadisticas['bytes'] <= pequena.max_bytes
+
+    # Un error se propaga a todas las peticiones en espera y no se guarda.
+    fallida, inicio = CacheResultados(), threading.Barrier(SESIONES)
+    def fallar():
+        time.sleep(0.05)
+        raise ValueError("fallo")
+    def pedir(_):
+        inicio.wait()
+        try: fallida.obtener('clave', fallar)
+        except ValueError: return True
+    with ThreadPoolExecutor(SESIONES) as pool: assert all(pool.map(pedir, range(SESIONES)))
+    assert fallida.estadisticas()['entradas'] == 0
+
+    estadisticas = cache.estadisticas()
+    print(f"caché: {estadisticas['entradas']} entradas, {estadisticas['bytes'] / 1024 ** 2:.2f} MB, tasa de aciertos {estadisticas['tasa_aciertos']:.0%} "
+          f"({estadisticas['aciertos']} aciertos, {estadisticas['esperas']} esperas, {estadisticas['fallos']} fallos)")
+    print(pd.DataFrame(estadisticas['por_etapa']).T.to_string())
+    print(f"caché limitada a {pequena.max_bytes / 1024 ** 2:.2f} MB: {pequena.estadisticas()['desalojos']} desalojos")
+
+
+if __name__ == '__main__':
+    main()
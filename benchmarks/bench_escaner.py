@@ -0,0 +1,69 @@
+"""Mide el rendimiento del escáner (símbolos por segundo) con una fuente de datos local.
+
+La fuente genera OHLCV sintético por símbolo y simula la latencia de red, así que se
+ejecuta sin conexión.
+Uso: python -m benchmarks.bench_escaner
+"""
+import os
+import tempfile
+import time
+import zlib
+
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.almacen import AlmacenOHLCV
+from motor.escaner import escanear
+
+
+class FuenteSintetica:
+    """Fuente local: cada símbolo tiene su propia serie determinista; los que empiezan por 'FALLA' no existen.
+
+    Se puede usar símbolo a símbolo o por lotes (`lote`, columnas precio × símbolo como
+    yfinance); cada petición, sea de uno o de varios símbolos, cuesta `latencia` segundos.
+    """
+
+    def __init__(self, n_velas=2_000, latencia=0.05):
+        self.n_velas = n_velas
+        self.latencia = latencia
+        self.peticiones = 0
+
+    def _velas(self, simbolo, intervalo, inicio):
+        datos = generar_ohlcv(self.n_velas, intervalo=intervalo, semilla=zlib.crc32(simbolo.encode()))
+        if simbolo.startswith('FALLA'): return datos.iloc[:0]
+        return datos if inicio is None else datos[datos.index >= inicio]
+
+    def __call__(self, simbolo, intervalo, periodo=None, inicio=None):
+        self.peticiones += 1
+        time.sleep(self.latencia)
+        return self._velas(simbolo, intervalo, inicio)
+
+    def lote(self, simbolos, intervalo, periodo=None, inicio=None):
+        self.peticiones += 1
+        time.sleep(self.latencia)
+        # Como yfinance, los símbolos sin datos aparecen con columnas vacías.
+        datos = pd.concat({simbolo: self._velas(simbolo, intervalo, inicio) for simbolo in simbolos}, axis=1)
+        return datos.swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+
+def main():
+    watchlist = [f"SIM{i:03d}" for i in range(100)] + ['FALLA']
+    print(f"{'procesos':>9} {'descargas':>10} {'por lotes':>10} {'peticiones':>11} {'tiempo (s)':>11} {'símbolos/s':>11}")
+    procesos = 1
+    while procesos <= (os.cpu_count() or 1):
+        for max_descargas in (1, 8):
+            for por_lotes in (False, True):
+                fuente = FuenteSintetica()
+                with tempfile.TemporaryDirectory() as directorio:
+                    almacen = AlmacenOHLCV(directorio, descargar=fuente, descargar_lote=fuente.lote if por_lotes else None)
+                    tabla, estadisticas = escanear(watchlist, '60d', '5m', estrategia='Momentum', almacen=almacen, max_workers=procesos, max_descargas=max_descargas)
+                assert len(tabla) == len(watchlist) and tabla['error'].notna().sum() == 1
+                print(f"{procesos:>9} {max_descargas:>10} {'sí' if por_lotes else 'no':>10} {fuente.peticiones:>11} "
+                      f"{estadisticas['segundos']:>11.2f} {estadisticas['simbolos_por_segundo']:>11.1f}")
+        procesos *= 2
+    print()
+    print(tabla.head(10).to_string())
+
+
+if __name__ == '__main__':
+    main()
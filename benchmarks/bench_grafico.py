@@ -0,0 +1,80 @@
+"""Compara el gráfico completo (SVG, todas las velas) con el modo rápido (WebGL + submuestreo).
+
+Mide el tiempo de construir la figura y serializarla, y el tamaño del JSON que se envía al
+navegador. Comprueba que el modo completo produce el mismo JSON que el código original de
+app.py y que el submuestreo conserva el máximo y el mínimo del precio.
+
+Uso: python -m benchmarks.bench_grafico
+"""
+import json
+import time
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.grafico import MAX_PUNTOS_POR_DEFECTO, construir_figura
+from motor.pipeline import aplicar_indicadores, senal_en_vivo
+
+ESCENARIOS = [("1 año diario", 252, '1d'), ("60 días 5m", 3_276, '5m'), ("6 meses 5m", 9_800, '5m'), ("3 meses 1m", 24_570, '1m')]
+
+
+def figura_original(datos_historicos, relevant_support, relevant_resistance):
+    """Sección de visualización de app.py antes del modo rápido."""
+    fig = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.03, subplot_titles=('Precio', 'RSI / Stoch', 'MACD', 'Volumen'), row_heights=[0.5, 0.2, 0.2, 0.1])
+    fig.add_trace(go.Candlestick(x=datos_historicos.index, open=datos_historicos['Open'], high=datos_historicos['High'], low=datos_historicos['Low'], close=datos_historicos['Close'], name='Precio'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['EMA_20'], line=dict(color='orange', width=1), name='EMA 20'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['EMA_50'], line=dict(color='blue', width=1), name='EMA 50'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['VWAP_D'], line=dict(color='purple', width=1, dash='dash'), name='VWAP'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos[datos_historicos['senal_compra']].index, y=datos_historicos[datos_historicos['senal_compra']]['Close'], mode='markers', marker_symbol='triangle-up', marker_size=12, marker_color='lime', name='Señal Compra (CALL)'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos[datos_historicos['senal_venta']].index, y=datos_historicos[datos_historicos['senal_venta']]['Close'], mode='markers', marker_symbol='triangle-down', marker_size=12, marker_color='red', name='Señal Venta (PUT)'), row=1, col=1)
+    for level in relevant_resistance:
+        fig.add_hline(y=level, line_width=1.5, line_dash="dot", line_color="red", opacity=0.8, row=1, col=1)
+        fig.add_annotation(x=datos_historicos.index[-1], y=level, text=f"R {level:.2f}", showarrow=False, xanchor='left', yanchor='middle', font=dict(color="red", size=10), row=1, col=1)
+    for level in relevant_support:
+        fig.add_hline(y=level, line_width=1.5, line_dash="dot", line_color="green", opacity=0.8, row=1, col=1)
+        fig.add_annotation(x=datos_historicos.index[-1], y=level, text=f"S {level:.2f}", showarrow=False, xanchor='left', yanchor='middle', font=dict(color="green", size=10), row=1, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['RSI_14'], line=dict(color='purple'), name='RSI 14'), row=2, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['STOCHk_14_3_3'], line=dict(color='blue'), name='Stoch %K'), row=2, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['STOCHd_14_3_3'], line=dict(color='red'), name='Stoch %D'), row=2, col=1)
+    fig.add_hline(y=70, line_width=1, line_dash="dash", line_color="red", row=2, col=1); fig.add_hline(y=30, line_width=1, line_dash="dash", line_color="green", row=2, col=1)
+    fig.add_hline(y=80, line_width=1, line_dash="dash", line_color="red", row=2, col=1); fig.add_hline(y=20, line_width=1, line_dash="dash", line_color="green", row=2, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['MACD_12_26_9'], line=dict(color='blue'), name='MACD'), row=3, col=1)
+    fig.add_trace(go.Scatter(x=datos_historicos.index, y=datos_historicos['MACDs_12_26_9'], line=dict(color='red'), name='Señal MACD'), row=3, col=1)
+    fig.add_trace(go.Bar(x=datos_historicos.index, y=datos_historicos['MACDh_12_26_9'], name='Histograma MACD', marker_color='gray'), row=3, col=1)
+    fig.add_trace(go.Bar(x=datos_historicos.index, y=datos_historicos['Volume'], name='Volumen', marker_color='lightblue'), row=4, col=1)
+    fig.update_layout(xaxis_rangeslider_visible=False, height=1400, showlegend=False)
+    return fig
+
+
+def _medir(datos, en_vivo, **opciones):
+    inicio = time.perf_counter()
+    if opciones.get('original'): fig = figura_original(datos, en_vivo['soportes'], en_vivo['resistencias'])
+    else: fig, _ = construir_figura(datos, en_vivo['soportes'], en_vivo['resistencias'], **opciones)
+    construccion = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    carga_util = pio.to_json(fig, validate=False)
+    serializacion = time.perf_counter() - inicio
+    return fig, carga_util, sum(len(traza.x) for traza in fig.data), construccion, serializacion
+
+
+def main():
+    # La primera llamada carga los kernels compilados; no se cuenta.
+    construir_figura(aplicar_indicadores(generar_ohlcv(3_000, intervalo='5m')).assign(senal_compra=False), [], [], max_puntos=500)
+    print(f"{'escenario':>14} {'modo':>8} {'puntos':>9} {'figura (ms)':>12} {'JSON (ms)':>10} {'JSON (KB)':>10}")
+    for descripcion, n_velas, intervalo in ESCENARIOS:
+        datos = aplicar_indicadores(generar_ohlcv(n_velas, intervalo=intervalo))
+        datos['senal_compra'] = datos['senal_momentum']
+        en_vivo = senal_en_vivo(datos)
+        cargas = {}
+        for modo, opciones in [("original", {'original': True}), ("completo", {'rapido': False}), ("rápido", {'max_puntos': MAX_PUNTOS_POR_DEFECTO})]:
+            fig, cargas[modo], puntos, construccion, serializacion = _medir(datos, en_vivo, **opciones)
+            print(f"{descripcion:>14} {modo:>8} {puntos:>9,} {construccion * 1000:>12.1f} {serializacion * 1000:>10.1f} {len(cargas[modo].encode()) / 1024:>10.0f}")
+        assert json.loads(cargas['original']) == json.loads(cargas['completo']), "El modo completo debe dibujar exactamente la figura original"
+        velas = fig.data[0]
+        assert max(velas.high) == datos['High'].max() and min(velas.low) == datos['Low'].min(), "El submuestreo debe conservar los extremos del precio"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Verifica el motor de indicadores incremental y mide el coste por refresco según crece el histórico.
+
+La referencia reproduce con pandas las fórmulas de pandas-ta (y usa pandas-ta directamente
+si está instalado) junto con las bandas de Bollinger y la media de volumen de la app.
+El coste por refresco se mide con `actualizar` (solo las velas nuevas, como el servicio de
+streaming) y con `calcular` sobre el histórico completo, que es lo que hace la app.
+Uso: python -m benchmarks.bench_indicadores
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.indicadores import COLUMNAS_INDICADORES, MotorIndicadores
+
+TOLERANCIA = 1e-9
+
+
+def _ema(close, length):
+    close = close.copy()
+    sma_nth = close[0:length].mean()
+    close[:length - 1] = np.nan
+    close.iloc[length - 1] = sma_nth
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def _rma(serie, length):
+    return serie.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def _non_zero_range(high, low):
+    diff = high - low
+    if diff.eq(0).any().any(): diff += sys.float_info.epsilon
+    return diff
+
+
+def indicadores_referencia(df):
+    """Indicadores de la app calculados sobre todo el histórico, como hace pandas-ta."""
+    try:
+        import pandas_ta  # noqa: F401
+    except ImportError:
+        pandas_ta = None
+    close, high, low, volume = df['Close'], df['High'], df['Low'], df['Volume']
+    ref = pd.DataFrame(index=df.index)
+    if pandas_ta is not None:
+        datos = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+        datos.ta.ema(length=20, append=True); datos.ta.ema(length=50, append=True); datos.ta.rsi(length=14, append=True)
+        datos.ta.macd(fast=12, slow=26, signal=9, append=True); datos.ta.stoch(high='High', low='Low', close='Close', k=14, d=3, append=True)
+        datos.ta.vwap(append=True); datos.ta.atr(length=14, append=True)
+        ref = datos.drop(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+    else:
+        ref['EMA_20'], ref['EMA_50'] = _ema(close, 20), _ema(close, 50)
+        negative = close.diff(1); positive = negative.copy()
+        positive[positive < 0] = 0; negative[negative > 0] = 0
+        positive_avg, negative_avg = _rma(positive, 14), _rma(negative, 14)
+        ref['RSI_14'] = 100 * positive_avg / (positive_avg + negative_avg.abs())
+        macd = _ema(close, 12) - _ema(close, 26)
+        signalma = _ema(macd.loc[macd.first_valid_index():], 9)
+        ref['MACD_12_26_9'], ref['MACDh_12_26_9'], ref['MACDs_12_26_9'] = macd, macd - signalma, signalma
+        stoch = 100 * (close - low.rolling(14).min()) / _non_zero_range(high.rolling(14).max(), low.rolling(14).min())
+        stoch_k = stoch.loc[stoch.first_valid_index():].rolling(3).mean()
+        ref['STOCHk_14_3_3'], ref['STOCHd_14_3_3'] = stoch_k, stoch_k.loc[stoch_k.first_valid_index():].rolling(3).mean()
+        wp = (high + low + close) / 3.0 * volume
+        periodos = df.index.tz_localize(None).to_period('D') if df.index.tz is not None else df.index.to_period('D')
+        ref['VWAP_D'] = wp.groupby(periodos).cumsum() / volume.groupby(periodos).cumsum()
+        prev_close = close.shift(1)
+        tr = pd.concat([_non_zero_range(high, low), high - prev_close, prev_close - low], axis=1).abs().max(axis=1)
+        tr.iloc[:1] = np.nan
+        ref['ATRr_14'] = _rma(tr, 14)
+    ref['BBM'] = close.rolling(window=20).mean()
+    ref['BBL'] = ref['BBM'] - (close.rolling(window=20).std() * 2)
+    ref['BBU'] = ref['BBM'] + (close.rolling(window=20).std() * 2)
+    ref['Volume_SMA'] = volume.rolling(window=20).mean()
+    return ref[COLUMNAS_INDICADORES]
+
+
+def comprobar(resultado, referencia, descripcion):
+    for columna in COLUMNAS_INDICADORES:
+        a, b = resultado[columna].to_numpy(dtype=np.float64), referencia[columna].to_numpy(dtype=np.float64)
+        assert np.array_equal(np.isnan(a), np.isnan(b)), f"{descripcion}: NaN distintos en {columna}"
+        error = np.nanmax(np.abs(a - b) / np.maximum(np.abs(b), 1.0), initial=0.0)
+        assert error < TOLERANCIA, f"{descripcion}: {columna} difiere en {error:.2e}"
+
+
+def main():
+    df = generar_ohlcv(3_000, intervalo='5m')
+    df.index = df.index.tz_localize('America/New_York')
+    df.iloc[500, df.columns.get_loc('High')] = df['Low'].iloc[500]  # rango cero
+    referencia = indicadores_referencia(df)
+
+    comprobar(MotorIndicadores().calcular(df), referencia, "cálculo completo")
+    motor = MotorIndicadores()
+    motor.calcular(df.iloc[:1_000])
+    for fin in range(1_001, len(df) + 1, 37):
+        # La última vela llega primero a medio formar y después con sus valores definitivos.
+        parcial = df.iloc[:fin].copy()
+        parcial.iloc[-1, parcial.columns.get_loc('Close')] *= 1.01
+        motor.calcular(parcial)
+        motor.calcular(df.iloc[:fin])
+    comprobar(motor.calcular(df), referencia, "actualización incremental")
+    print(f"Indicadores dentro de la tolerancia {TOLERANCIA:g} respecto a la referencia de pandas-ta.\n")
+
+    print(f"{'velas':>9} {'recálculo (ms)':>15} {'actualizar (ms)':>16} {'calcular (ms)':>14}")
+    for n_velas in (10_000, 50_000, 200_000):
+        df = generar_ohlcv(n_velas + 10, intervalo='5m')
+        inicio = time.perf_counter()
+        indicadores_referencia(df.iloc[:n_velas + 1])
+        recalculo = time.perf_counter() - inicio
+
+        motor = MotorIndicadores()
+        motor.actualizar(df.iloc[:n_velas])
+        inicio = time.perf_counter()
+        for fin in range(n_velas + 1, n_velas + 11):
+            motor.actualizar(df.iloc[fin - 1:fin])
+        incremental = (time.perf_counter() - inicio) / 10
+
+        motor = MotorIndicadores()
+        motor.calcular(df.iloc[:n_velas])
+        inicio = time.perf_counter()
+        for fin in range(n_velas + 1, n_velas + 11):
+            motor.calcular(df.iloc[:fin])
+        completo = (time.perf_counter() - inicio) / 10
+        print(f"{n_velas:>9} {recalculo * 1000:>15.1f} {incremental * 1000:>16.2f} {completo * 1000:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
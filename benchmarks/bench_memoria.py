@@ -0,0 +1,83 @@
+"""Memoria del histórico de una sesión con la disposición compacta y equivalencia de resultados.
+
+Reproduce el flujo de la app (indicadores, señales, modelo ML, señal de compra) con la
+disposición anterior (todo en float64, una columna booleana por señal y la predicción del
+modelo unida con `join`) y con `aplicar_indicadores(..., compacto=True)`. Compara la memoria
+de ambos y comprueba que el backtest tradicional y de binarias, la señal en vivo, el replay,
+la optimización y las predicciones del RandomForest son idénticos.
+
+Uso: python -m benchmarks.bench_memoria
+"""
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_escenario
+from motor.backtest import backtest_binario, backtest_tradicional
+from motor.estrategias import ESTRATEGIA_ML, ESTRATEGIAS, columna_estrategia
+from motor.memoria import huella_memoria, senal
+from motor.modelo import FEATURES_ML, PROPORCION_ENTRENAMIENTO, entrenar_random_forest, preparar_datos_ml
+from motor.optimizacion import optimizar
+from motor.pipeline import aplicar_indicadores, senal_en_vivo, unir_prediccion_ml
+from motor.replay import replay
+
+ESCENARIOS = ['60d_5m', '6mo_5m']
+PREDICTION_HORIZON = 5
+ML_THRESHOLD = 0.55
+
+
+def _unir_con_join(datos, df_ml, probabilidades, ml_threshold):
+    """`unir_prediccion_ml` antes de la disposición compacta."""
+    df_ml = df_ml.copy()
+    df_ml['probabilidad_subida'] = probabilidades
+    df_ml['senal_ml_pred'] = df_ml['probabilidad_subida'] > ml_threshold
+    datos = datos.join(df_ml[['senal_ml_pred', 'probabilidad_subida']], how='left')
+    datos['senal_ml'] = datos['senal_ml_pred'].fillna(False)
+    return datos
+
+
+def sesion(velas, estrategia, compacto):
+    """Histórico de la sesión tal como queda en la app y probabilidades del modelo (si aplica)."""
+    datos = aplicar_indicadores(velas.copy(), compacto=compacto)
+    datos['senal_ml'] = False
+    probabilidades = None
+    if estrategia == ESTRATEGIA_ML:
+        df_ml = preparar_datos_ml(datos, PREDICTION_HORIZON)
+        X, y = df_ml[FEATURES_ML].to_numpy(), df_ml['target'].to_numpy()
+        corte = int(len(X) * PROPORCION_ENTRENAMIENTO)
+        probabilidades = entrenar_random_forest(X[:corte], y[:corte]).predict_proba(X)[:, 1]
+        datos = (unir_prediccion_ml if compacto else _unir_con_join)(datos, df_ml, probabilidades, ML_THRESHOLD)
+    datos['senal_compra'] = senal(datos, columna_estrategia(estrategia))
+    return datos, probabilidades
+
+
+def resultados(datos, estrategia):
+    tabla = {'tradicional': backtest_tradicional(datos, 0.05, 0.10, True, 0.02), 'binario': backtest_binario(datos, 1, 0.85, 100),
+             'en_vivo': senal_en_vivo(datos)}
+    if estrategia != ESTRATEGIA_ML: tabla['replay'] = replay(datos, estrategia)
+    tabla['optimizacion'] = optimizar(datos, [estrategia], [0.02, 0.05], [0.05, 0.10], [0.02], ml_threshold=[0.5, 0.6], max_workers=1)
+    return tabla
+
+
+def comprobar(anterior, compacto):
+    for clave, valor in anterior.items():
+        if isinstance(valor, pd.DataFrame): pd.testing.assert_frame_equal(valor, compacto[clave])
+        else: assert valor == compacto[clave], clave
+
+
+def main():
+    print(f"{'escenario':>9} {'estrategia':>22} {'velas':>8} {'anterior MB':>12} {'compacto MB':>12} {'ahorro':>7}")
+    for escenario in ESCENARIOS:
+        velas = generar_escenario(escenario)
+        for estrategia in ESTRATEGIAS:
+            anterior, probabilidades_anterior = sesion(velas, estrategia, compacto=False)
+            compacto, probabilidades_compacto = sesion(velas, estrategia, compacto=True)
+            if probabilidades_anterior is not None: assert np.array_equal(probabilidades_anterior, probabilidades_compacto), "predicciones del modelo distintas"
+            comprobar(resultados(anterior, estrategia), resultados(compacto, estrategia))
+            bytes_anterior, bytes_compacto = huella_memoria(anterior), huella_memoria(compacto)
+            print(f"{escenario:>9} {estrategia:>22} {len(velas):>8,} {bytes_anterior / 1024 ** 2:>12.2f} {bytes_compacto / 1024 ** 2:>12.2f} "
+                  f"{1 - bytes_compacto / bytes_anterior:>7.0%}", flush=True)
+    print("Resultados idénticos con la disposición compacta.")
+
+
+if __name__ == '__main__':
+    main()
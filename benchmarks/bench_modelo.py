@@ -0,0 +1,76 @@
+"""Mide la latencia de la estrategia ML con el registro de modelos frente a reentrenar en cada ejecución.
+
+Uso: python -m benchmarks.bench_modelo
+"""
+import tempfile
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.modelo import FEATURES_ML, PARAMETROS_RF, RegistroModelos, preparar_datos_ml
+
+
+def _cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    df = generar_ohlcv(8_010, intervalo='1h')
+    df[COLUMNAS_INDICADORES] = calcular_indicadores(df)
+    completo = preparar_datos_ml(df, 5)
+    df_ml = completo.iloc[:-10]
+
+    def reentrenar_siempre(df_ml):
+        """Lo que hacía la app en cada ejecución."""
+        split_index = int(len(df_ml) * 0.8)
+        model = RandomForestClassifier(**PARAMETROS_RF).fit(df_ml[FEATURES_ML][:split_index], df_ml['target'][:split_index])
+        return model.predict_proba(df_ml[FEATURES_ML])[:, 1]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = RegistroModelos(directorio)
+        referencia, t_original = _cronometrar(reentrenar_siempre, df_ml)
+        resultado, t_primero = _cronometrar(registro.predecir, 'SIM', '1h', df_ml, 5)
+        assert np.array_equal(resultado['probabilidades'].to_numpy(), referencia), "El entrenamiento en paralelo debe dar el mismo modelo"
+
+        filas = [("reentrenar en cada ejecución (original)", t_original, "siempre"),
+                 ("primer entrenamiento (n_jobs=-1)", t_primero, resultado['motivo'])]
+        resultado, duracion = _cronometrar(registro.predecir, 'SIM', '1h', df_ml, 5)
+        filas.append(("misma ejecución repetida", duracion, resultado['motivo']))
+        resultado, duracion = _cronometrar(registro.predecir, 'SIM', '1h', completo.iloc[:-9], 5)
+        filas.append(("una vela nueva", duracion, resultado['motivo']))
+        resultado, duracion = _cronometrar(RegistroModelos(directorio).predecir, 'SIM', '1h', completo.iloc[:-9], 5)
+        filas.append(("reinicio del proceso", duracion, resultado['motivo']))
+        registro_programado = RegistroModelos(directorio, reentrenar_cada=5)
+        resultado, duracion = _cronometrar(registro_programado.predecir, 'SIM', '1h', completo, 5)
+        filas.append(("reentrenamiento programado", duracion, resultado['motivo']))
+
+        # El almacén recorta el período a una ventana de longitud fija que avanza con cada vela nueva.
+        registro_ventana = RegistroModelos(directorio, reentrenar_cada=100)
+        ventana = 1_500
+        motivos = []
+        for desplazamiento in range(0, 400, 50):
+            resultado, duracion = _cronometrar(registro_ventana.predecir, 'VENTANA', '1h', completo.iloc[desplazamiento:desplazamiento + ventana], 5)
+            motivos.append(resultado['reentrenado'])
+            filas.append((f"ventana deslizante +{desplazamiento} velas", duracion, resultado['motivo']))
+        assert motivos == [True, False, True, False, True, False, True, False], "la ventana deslizante debe reentrenar cada 100 velas nuevas"
+
+        # Los precios pasados reajustados (split con auto_adjust) cambian las filas de entrenamiento.
+        reajustado = df.copy()
+        reajustado[['Open', 'High', 'Low', 'Close']] /= 4
+        reajustado[COLUMNAS_INDICADORES] = calcular_indicadores(reajustado)
+        resultado, duracion = _cronometrar(registro_ventana.predecir, 'VENTANA', '1h', preparar_datos_ml(reajustado, 5).iloc[350:350 + ventana], 5)
+        assert resultado['reentrenado'], "con los datos de entrenamiento cambiados se debe reentrenar"
+        filas.append(("precios reajustados", duracion, resultado['motivo']))
+
+    print(f"{'escenario':>42} {'tiempo (ms)':>12}  motivo")
+    for escenario, duracion, motivo in filas:
+        print(f"{escenario:>42} {duracion * 1000:>12.1f}  {motivo}")
+
+
+if __name__ == '__main__':
+    main()
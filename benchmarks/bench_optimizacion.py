@@ -0,0 +1,57 @@
+"""Mide el escalado de la optimización por rejilla con el número de procesos.
+
+Uso: python -m benchmarks.bench_optimizacion
+"""
+import os
+import time
+
+import numpy as np
+
+from benchmarks.bench_backtest import preparar_datos
+from motor.backtest import backtest_tradicional, metricas_operaciones
+from motor.estrategias import ESTRATEGIAS, columna_estrategia
+from motor.optimizacion import generar_rejilla, optimizar
+
+
+def preparar_datos_estrategias(n_velas, semilla=42):
+    """Datos sintéticos con una columna de señal por estrategia y una probabilidad de subida."""
+    df = preparar_datos(n_velas, semilla)
+    rng = np.random.default_rng(semilla)
+    for estrategia in ESTRATEGIAS:
+        df[columna_estrategia(estrategia)] = rng.random(n_velas) < 0.03
+    df['probabilidad_subida'] = rng.random(n_velas)
+    df.loc[df.index[:50], 'probabilidad_subida'] = np.nan
+    return df
+
+
+def main():
+    df = preparar_datos_estrategias(8_760)
+    rango = lambda inicio, fin: [x / 100 for x in range(inicio, fin + 1)]
+    parametros = dict(estrategias=ESTRATEGIAS, stop_loss_pct=rango(1, 12), take_profit_pct=rango(2, 21), trailing_stop_pct=rango(1, 5),
+                      ml_threshold=[u / 100 for u in range(50, 90, 5)], use_trailing_stop=(True, False))
+    n_combinaciones = len(generar_rejilla(**parametros))
+
+    # Comprobación cruzada de la mejor combinación contra el backtest sobre el DataFrame.
+    tabla = optimizar(df, max_workers=1, **parametros)
+    mejor = tabla.iloc[0]
+    df['senal_compra'] = df['probabilidad_subida'] > mejor['ml_threshold'] if mejor['estrategia'] == 'Machine Learning (RF)' else df[columna_estrategia(mejor['estrategia'])]
+    operaciones = backtest_tradicional(df, mejor['stop_loss_pct'], mejor['take_profit_pct'], mejor['use_trailing_stop'], mejor['trailing_stop_pct'])
+    esperado = metricas_operaciones([op['rentabilidad'] for op in operaciones])
+    assert all(np.isclose(mejor[clave], valor) for clave, valor in esperado.items()), (mejor, esperado)
+    print(tabla.head(5).to_string())
+
+    print(f"\n{n_combinaciones} combinaciones sobre {len(df)} velas")
+    print(f"{'procesos':>9} {'tiempo (s)':>11} {'comb./s':>9} {'aceleración':>12}")
+    referencia = None
+    procesos = 1
+    while procesos <= (os.cpu_count() or 1):
+        inicio = time.perf_counter()
+        optimizar(df, max_workers=procesos, **parametros)
+        duracion = time.perf_counter() - inicio
+        referencia = referencia or duracion
+        print(f"{procesos:>9} {duracion:>11.2f} {n_combinaciones / duracion:>9.0f} {referencia / duracion:>11.2f}x")
+        procesos *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Velocidad del replay de la señal en vivo y equivalencia con el servicio vela a vela.
+
+Comprueba que cada recomendación del replay es la que publica `ServicioSenales` al recibir
+las velas una a una con `FuenteReplay`, para todas las estrategias, y mide las velas por
+segundo del replay sobre un año de velas de 5m (sesión bursátil y 24/7).
+
+Uso: python -m benchmarks.bench_replay
+"""
+import asyncio
+import time
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.estrategias import ESTRATEGIA_ML, ESTRATEGIAS
+from motor.replay import replay, resumen_replay
+from motor.servicio import FuenteReplay, ServicioSenales
+
+ESCENARIOS = [("1 año 5m (bolsa)", 19_656, '5m'), ("1 año 5m (24/7)", 105_120, '5m'), ("2 años 1m (bolsa)", 196_560, '1m')]
+VELAS_CALENTAMIENTO = 30
+
+
+def comprobar_equivalencia(velas, estrategia):
+    servicio = ServicioSenales(velas.iloc[:VELAS_CALENTAMIENTO], estrategia=estrategia)
+    eventos = []
+    servicio.suscribir(eventos.append)
+    asyncio.run(servicio.ejecutar(FuenteReplay(velas.iloc[VELAS_CALENTAMIENTO:])))
+    en_vivo = {evento['vela']: evento['senal'] for evento in eventos if evento['senal']['action'] != 'ESPERAR'}
+    recomendaciones = replay(velas, estrategia)
+    recomendaciones = recomendaciones[recomendaciones.index >= velas.index[VELAS_CALENTAMIENTO]]
+    assert list(en_vivo) == list(recomendaciones.index), f"{estrategia}: el replay debe recomendar en las mismas velas que el servicio"
+    for vela, fila in recomendaciones.iterrows():
+        assert en_vivo[vela] == {'action': fila['accion'], 'strength': fila['fuerza'], 'reason': fila['razon']}, f"{estrategia}: recomendación distinta en {vela}"
+    return len(recomendaciones)
+
+
+def main():
+    velas = generar_ohlcv(1_000, intervalo='5m', semilla=3)
+    for estrategia in ESTRATEGIAS:
+        if estrategia != ESTRATEGIA_ML: print(f"{estrategia}: {comprobar_equivalencia(velas, estrategia)} recomendaciones idénticas al servicio en vivo")
+
+    replay(velas)  # carga los kernels compilados antes de medir
+    print(f"\n{'escenario':>18} {'velas':>9} {'recomendaciones':>16} {'segundos':>9} {'velas/s':>9}")
+    for descripcion, n_velas, intervalo in ESCENARIOS:
+        velas = generar_ohlcv(n_velas, intervalo=intervalo)
+        inicio = time.perf_counter()
+        recomendaciones = replay(velas)
+        segundos = time.perf_counter() - inicio
+        print(f"{descripcion:>18} {n_velas:>9,} {len(recomendaciones):>16,} {segundos:>9.2f} {n_velas / segundos:>9,.0f}")
+    print(resumen_replay(recomendaciones).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Latencia vela → señal del servicio en vivo frente a recalcular todo el histórico con cada vela.
+
+Las velas se reproducen con `FuenteReplay` sobre un histórico sintético. Comprueba que cada
+evento coincide con la señal en vivo calculada desde cero sobre el histórico hasta esa vela
+(también cuando la última vela llega revisada) y que los soportes/resistencias incrementales
+coinciden con `calculate_support_resistance` en todas las velas.
+
+Uso: python -m benchmarks.bench_servicio
+"""
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.estrategias import columna_estrategia
+from motor.pipeline import aplicar_indicadores, senal_en_vivo
+from motor.servicio import FuenteReplay, ServicioSenales
+from motor.soportes_resistencias import SoportesResistenciasIncrementales, calculate_support_resistance
+
+# (descripción, velas de histórico, velas reproducidas, intervalo)
+ESCENARIOS = [("1 año diario", 252, 250, '1d'), ("60 días 5m", 3_276, 500, '5m'), ("6 meses 5m", 9_800, 500, '5m')]
+ESTRATEGIA = 'Stochastic Oscillator'
+CADA_COMPROBACION = 25
+
+
+def senal_completa(velas):
+    datos = aplicar_indicadores(velas.copy())
+    datos['senal_compra'] = datos[columna_estrategia(ESTRATEGIA)]
+    return senal_en_vivo(datos)
+
+
+def comprobar_evento(evento, esperado):
+    assert evento['senal'] == esperado['senal'], "La señal del servicio debe coincidir con la recalculada"
+    assert evento['soportes'] == esperado['soportes'] and evento['resistencias'] == esperado['resistencias'], "Los niveles deben coincidir"
+
+
+def comprobar_soportes_resistencias(velas):
+    incremental = SoportesResistenciasIncrementales()
+    highs, lows = velas['High'].to_numpy(), velas['Low'].to_numpy()
+    for n in range(1, len(velas) + 1, 7):
+        assert incremental.actualizar(highs[:n], lows[:n]) == calculate_support_resistance(velas.iloc[:n]), "Los niveles incrementales deben coincidir"
+
+
+def comprobar_revision(velas):
+    servicio = ServicioSenales(velas.iloc[:-1], estrategia=ESTRATEGIA)
+    revisada = velas.iloc[-2:-1].copy()
+    revisada[['High', 'Close']] *= 1.01
+    servicio.procesar(revisada)
+    evento = servicio.procesar(velas.iloc[-1:])
+    comprobar_evento(evento, senal_completa(pd.concat([velas.iloc[:-2], revisada, velas.iloc[-1:]])))
+
+
+def main():
+    print(f"{'escenario':>14} {'eventos':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'máx (ms)':>9} {'velas/s':>8} {'recarga completa (ms)':>22}")
+    for descripcion, n_historico, n_reproducidas, intervalo in ESCENARIOS:
+        velas = generar_ohlcv(n_historico + n_reproducidas, intervalo=intervalo)
+        servicio = ServicioSenales(velas.iloc[:n_historico], estrategia=ESTRATEGIA)
+        eventos = []
+        servicio.suscribir(eventos.append)
+        inicio = time.perf_counter()
+        asyncio.run(servicio.ejecutar(FuenteReplay(velas.iloc[n_historico:])))
+        segundos = time.perf_counter() - inicio
+        estadisticas = servicio.estadisticas()
+
+        recargas = []
+        for i in range(0, n_reproducidas, CADA_COMPROBACION):
+            inicio = time.perf_counter()
+            esperado = senal_completa(velas.iloc[:n_historico + i + 1])
+            recargas.append((time.perf_counter() - inicio) * 1000)
+            comprobar_evento(eventos[i], esperado)
+        print(f"{descripcion:>14} {estadisticas['eventos']:>8} {estadisticas['p50_ms']:>9.1f} {estadisticas['p95_ms']:>9.1f} {estadisticas['max_ms']:>9.1f} "
+              f"{n_reproducidas / segundos:>8.0f} {np.median(recargas):>22.1f}")
+    comprobar_revision(generar_ohlcv(600, intervalo='5m'))
+    comprobar_soportes_resistencias(generar_ohlcv(3_000, intervalo='5m'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Compara el motor vectorizado de soportes/resistencias con el bucle original por vela.
+
+Uso: python -m benchmarks.bench_soportes_resistencias
+"""
+import time
+
+import numpy as np
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.soportes_resistencias import calculate_support_resistance
+
+
+def cluster_levels_bucle(levels, threshold_pct=0.5):
+    """Agrupación de niveles de la implementación original, sacada de la función para poder probarla aparte."""
+    levels_array = np.array(levels)
+    if levels_array.size == 0: return []
+    levels_array.sort()
+    clustered = []
+    current_cluster = [levels_array[0]]
+
+    for i in range(1, len(levels_array)):
+        cluster_mean = np.mean(current_cluster)
+        if cluster_mean == 0:
+             if abs(levels_array[i] - cluster_mean) < (threshold_pct / 100):
+                 current_cluster.append(levels_array[i])
+             else:
+                 clustered.append(cluster_mean)
+                 current_cluster = [levels_array[i]]
+        else:
+             if abs(levels_array[i] - cluster_mean) / cluster_mean * 100 < threshold_pct:
+                 current_cluster.append(levels_array[i])
+             else:
+                 clustered.append(cluster_mean)
+                 current_cluster = [levels_array[i]]
+
+    if current_cluster: clustered.append(np.mean(current_cluster))
+    return clustered
+
+
+def fractales_bucle(highs, lows, window=5):
+    """Índices de los fractales de máximos y de mínimos con el bucle original por vela."""
+    fractal_highs_idx = []
+    fractal_lows_idx = []
+
+    for i in range(window // 2, len(highs) - window // 2):
+        is_high_fractal = True
+        is_low_fractal = True
+        current_high = highs.iloc[i]
+        current_low = lows.iloc[i]
+
+        for j in range(i - window // 2, i + window // 2 + 1):
+            if j == i: continue
+            if highs.iloc[j] >= current_high: is_high_fractal = False
+            if lows.iloc[j] <= current_low: is_low_fractal = False
+
+        if is_high_fractal: fractal_highs_idx.append(i)
+        if is_low_fractal: fractal_lows_idx.append(i)
+    return fractal_highs_idx, fractal_lows_idx
+
+
+def calculate_support_resistance_bucle(df, window=5, threshold_pct=0.5):
+    """Implementación original de app.py, conservada como referencia."""
+    fractal_highs_idx, fractal_lows_idx = fractales_bucle(df['High'], df['Low'], window)
+    fractal_highs = df['High'].iloc[fractal_highs_idx].values
+    fractal_lows = df['Low'].iloc[fractal_lows_idx].values
+
+    resistance_levels = cluster_levels_bucle(fractal_highs, threshold_pct)
+    support_levels = cluster_levels_bucle(fractal_lows, threshold_pct)
+    return support_levels, resistance_levels
+
+
+def _cronometrar(funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    print(f"{'velas':>8} {'ventana':>8} {'bucle (s)':>11} {'vectorizado (s)':>16} {'aceleración':>12}")
+    for n_velas in (1_000, 5_000, 10_000):
+        df = generar_ohlcv(n_velas)
+        for window in (5, 11, 21):
+            for threshold_pct in (0.1, 0.5, 2.0):
+                referencia, t_bucle = _cronometrar(calculate_support_resistance_bucle, df, window, threshold_pct)
+                nuevo, t_vector = _cronometrar(calculate_support_resistance, df, window, threshold_pct)
+                assert [list(map(float, n)) for n in nuevo] == [list(map(float, r)) for r in referencia], \
+                    f"Niveles distintos con {n_velas} velas, ventana {window}, umbral {threshold_pct}"
+            print(f"{n_velas:>8} {window:>8} {t_bucle:>11.4f} {t_vector:>16.5f} {t_bucle / t_vector:>11.0f}x")
+
+
+if __name__ == '__main__':
+    main()
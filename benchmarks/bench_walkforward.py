@@ -0,0 +1,52 @@
+"""Mide el coste por pliegue de la evaluación walk-forward y comprueba que no hay fuga de datos.
+
+Cada pliegue se reproduce en secuencia entrenando solo con filas anteriores al hueco de
+`prediction_horizon` filas; las probabilidades en paralelo deben coincidir exactamente.
+
+Uso: python -m benchmarks.bench_walkforward
+"""
+import os
+import time
+
+import numpy as np
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.modelo import FEATURES_ML, entrenar_random_forest, preparar_datos_ml
+from motor.walkforward import generar_pliegues, precision_global, walk_forward
+
+# (descripción, velas, intervalo, horizonte, reentrenar_cada)
+ESCENARIOS = [
+    ("5 años diario", 1_260, '1d', 5, 60),
+    ("6 meses 5m", 9_800, '5m', 3, 250),
+]
+
+
+def comprobar_sin_fuga(df_ml, prediction_horizon, reentrenar_cada, probabilidades):
+    for inicio_entrenamiento, fin_entrenamiento, inicio_prueba, fin_prueba in generar_pliegues(len(df_ml), prediction_horizon, reentrenar_cada):
+        assert fin_entrenamiento + prediction_horizon <= inicio_prueba, "El entrenamiento no puede ver etiquetas del pliegue"
+        X, y = df_ml[FEATURES_ML].to_numpy(), df_ml['target'].to_numpy()
+        model = entrenar_random_forest(X[inicio_entrenamiento:fin_entrenamiento], y[inicio_entrenamiento:fin_entrenamiento], n_jobs=1)
+        esperadas = model.predict_proba(X[inicio_prueba:fin_prueba])[:, 1]
+        assert np.array_equal(probabilidades.iloc[inicio_prueba:fin_prueba].to_numpy(), esperadas), "El pliegue en paralelo debe coincidir con el secuencial"
+
+
+def main():
+    print(f"CPUs disponibles: {os.cpu_count()}")
+    print(f"{'escenario':>16} {'filas':>7} {'pliegues':>9} {'s/pliegue':>10} {'total (s)':>10} {'precisión':>10}")
+    for descripcion, n_velas, intervalo, horizonte, reentrenar_cada in ESCENARIOS:
+        df = generar_ohlcv(n_velas, intervalo=intervalo)
+        df[COLUMNAS_INDICADORES] = calcular_indicadores(df)
+        df_ml = preparar_datos_ml(df, horizonte)
+
+        inicio = time.perf_counter()
+        probabilidades, pliegues = walk_forward(df_ml, horizonte, reentrenar_cada=reentrenar_cada)
+        total = time.perf_counter() - inicio
+        comprobar_sin_fuga(df_ml, horizonte, reentrenar_cada, probabilidades)
+        assert probabilidades.iloc[:generar_pliegues(len(df_ml), horizonte, reentrenar_cada)[0][2]].isna().all(), "Sin predicciones dentro de muestra"
+
+        print(f"{descripcion:>16} {len(df_ml):>7} {len(pliegues):>9} {pliegues['segundos'].mean():>10.3f} {total:>10.2f} {precision_global(pliegues):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
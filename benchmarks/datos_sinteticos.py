@@ -0,0 +1,54 @@
+"""Generador determinista de velas OHLCV sintéticas para los benchmarks.
+
+`ESCENARIOS` reúne los tamaños habituales de la app con sesiones bursátiles reales (252
+sesiones al año, de 09:30 a 16:00): un año diario, 60 días y 6 meses de 5m y varios años
+de 1m. Todo se genera en local, sin descargar nada.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+MINUTOS_SESION = 390
+
+# nombre → (velas, intervalo)
+ESCENARIOS = {
+    '1y_1d': (252, '1d'),
+    '60d_5m': (42 * 78, '5m'),
+    '6mo_5m': (126 * 78, '5m'),
+    '2y_1m': (2 * 252 * MINUTOS_SESION, '1m'),
+}
+
+
+def indice_sesion(n_velas, intervalo):
+    """Marcas de tiempo de lunes a viernes dentro de la sesión de 09:30 a 16:00."""
+    if intervalo == '1d': return pd.bdate_range('2024-01-02', periods=n_velas)
+    minutos = pd.Timedelta(intervalo.replace('m', 'min')) // pd.Timedelta(minutes=1)
+    por_sesion = math.ceil(MINUTOS_SESION / minutos)
+    dias = pd.bdate_range('2024-01-02', periods=math.ceil(n_velas / por_sesion))
+    desplazamientos = pd.to_timedelta(9 * 60 + 30 + np.arange(por_sesion) * minutos, unit='min')
+    return pd.DatetimeIndex((dias.to_numpy()[:, None] + desplazamientos.to_numpy()[None, :]).ravel()[:n_velas])
+
+
+def generar_ohlcv(n_velas, intervalo='5m', semilla=42, precio_inicial=100.0, solo_sesion=False):
+    """Devuelve un DataFrame OHLCV con paseo aleatorio geométrico y precios redondeados a 2 decimales.
+
+    Por defecto las velas son continuas; con `solo_sesion` caen dentro de la sesión bursátil.
+    """
+    rng = np.random.default_rng(semilla)
+    retornos = rng.normal(0, 0.002, n_velas)
+    close = np.round(precio_inicial * np.exp(np.cumsum(retornos)), 2)
+    open_ = np.round(np.concatenate(([precio_inicial], close[:-1])), 2)
+    rango = np.abs(rng.normal(0, 0.0015, n_velas)) * close
+    high = np.round(np.maximum(open_, close) + rango, 2)
+    low = np.round(np.minimum(open_, close) - rango, 2)
+    volume = rng.integers(1_000, 100_000, n_velas).astype(np.int64)
+    if solo_sesion: indice = indice_sesion(n_velas, intervalo)
+    else: indice = pd.date_range('2024-01-02 09:30', periods=n_velas, freq=intervalo.replace('m', 'min'))
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=indice)
+
+
+def generar_escenario(nombre, semilla=42):
+    """Velas del escenario `nombre` de `ESCENARIOS` dentro de la sesión bursátil."""
+    n_velas, intervalo = ESCENARIOS[nombre]
+    return generar_ohlcv(n_velas, intervalo=intervalo, semilla=semilla, solo_sesion=True)
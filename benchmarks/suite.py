@@ -0,0 +1,187 @@
+"""Suite de rendimiento por etapas del pipeline con referencia guardada y control de regresiones.
+
+Para cada escenario sintético de `datos_sinteticos.ESCENARIOS` cronometra las etapas del
+pipeline de la app: indicadores, columnas de señal, backtest tradicional y de opciones
+binarias, soportes/resistencias, ajuste y predicción del RandomForest, construcción y
+serialización del gráfico y replay de la señal en vivo. De cada etapa se guarda el mejor
+tiempo de al menos `--repeticiones` ejecuciones (la primera, que carga los kernels
+compilados, no cuenta); las etapas rápidas se repiten hasta sumar `TIEMPO_MINIMO` segundos.
+
+Con --guardar los tiempos se escriben en la referencia (benchmarks/referencia.json). Sin él se
+comparan con ella y el programa termina con código 1 si alguna etapa es más de un `--umbral`
+más lenta. Las etapas que superan el umbral se vuelven a medir hasta `--reintentos` veces
+y se queda el mejor tiempo, para que una ralentización pasajera de la máquina (otros
+procesos, frecuencia variable) no se confunda con una regresión. Los tiempos dependen de la
+máquina: la referencia se genera en la misma máquina en la que se comprueba. No usa la red.
+
+Uso:
+    python -m benchmarks.suite                      # compara con la referencia
+    python -m benchmarks.suite --guardar            # regenera la referencia
+    python -m benchmarks.suite --escenarios 1y_1d 6mo_5m --etapas indicadores backtest_tradicional
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos_sinteticos import ESCENARIOS, generar_escenario
+from motor import compilacion
+from motor.backtest import backtest_binario, backtest_tradicional
+from motor.grafico import construir_figura
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.modelo import FEATURES_ML, PROPORCION_ENTRENAMIENTO, entrenar_random_forest, preparar_datos_ml
+from motor.replay import replay
+from motor.senales import calcular_senales
+from motor.soportes_resistencias import calculate_support_resistance
+
+REFERENCIA = os.path.join(os.path.dirname(__file__), 'referencia.json')
+UMBRAL_REGRESION = 0.25
+# Por debajo de esta diferencia el ruido del sistema pesa más que cualquier regresión.
+HOLGURA_SEGUNDOS = 0.002
+# El RandomForest no se entrena con más filas: la app solo descarga unos días de velas de 1m.
+MAX_FILAS_MODELO = 50_000
+PREDICTION_HORIZON = 5
+TIEMPO_MINIMO = 0.3
+MAX_REPETICIONES = 50
+
+ETAPAS = ['indicadores', 'senales', 'backtest_tradicional', 'backtest_binario', 'soportes_resistencias',
+          'rf_entrenamiento', 'rf_prediccion', 'figura', 'replay']
+
+
+def _preparar(velas):
+    """Datos de entrada de cada etapa, calculados una vez fuera del cronómetro."""
+    datos = velas.copy()
+    datos[COLUMNAS_INDICADORES] = calcular_indicadores(datos)
+    calcular_senales(datos)
+    datos['senal_compra'] = datos['senal_momentum']
+    soportes, resistencias = calculate_support_resistance(datos)
+    contexto = {'velas': velas, 'datos': datos, 'soportes': soportes, 'resistencias': resistencias}
+    if len(datos) <= MAX_FILAS_MODELO:
+        df_ml = preparar_datos_ml(datos, PREDICTION_HORIZON)
+        X, y = df_ml[FEATURES_ML].to_numpy(), df_ml['target'].to_numpy()
+        corte = int(len(X) * PROPORCION_ENTRENAMIENTO)
+        contexto.update({'X_train': X[:corte], 'y_train': y[:corte], 'X_test': X[corte:]})
+        contexto['modelo'] = entrenar_random_forest(contexto['X_train'], contexto['y_train'])
+    return contexto
+
+
+def _figura(contexto):
+    import plotly.io as pio
+    fig, _ = construir_figura(contexto['datos'], contexto['soportes'], contexto['resistencias'])
+    return pio.to_json(fig, validate=False)
+
+
+FUNCIONES = {
+    'indicadores': lambda c: calcular_indicadores(c['velas']),
+    'senales': lambda c: calcular_senales(c['datos']),
+    'backtest_tradicional': lambda c: backtest_tradicional(c['datos'], 0.05, 0.10, True, 0.03),
+    'backtest_binario': lambda c: backtest_binario(c['datos'], 1, 0.85, 100),
+    'soportes_resistencias': lambda c: calculate_support_resistance(c['datos']),
+    'rf_entrenamiento': lambda c: entrenar_random_forest(c['X_train'], c['y_train']),
+    'rf_prediccion': lambda c: c['modelo'].predict_proba(c['X_test']),
+    'figura': _figura,
+    'replay': lambda c: replay(c['datos']),
+}
+
+
+def cronometrar(funcion, contexto, repeticiones):
+    """Mejor tiempo tras una ejecución de calentamiento; al menos `repeticiones` y hasta sumar `TIEMPO_MINIMO`."""
+    funcion(contexto)
+    tiempos = []
+    while len(tiempos) < repeticiones or (sum(tiempos) < TIEMPO_MINIMO and len(tiempos) < MAX_REPETICIONES):
+        inicio = time.perf_counter()
+        funcion(contexto)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def ejecutar(etapas_por_escenario, repeticiones):
+    """Tiempos en segundos de las etapas de cada escenario; las de ML se omiten en escenarios grandes."""
+    resultados = {}
+    for escenario, etapas in etapas_por_escenario.items():
+        contexto = _preparar(generar_escenario(escenario))
+        resultados[escenario] = {}
+        for etapa in etapas:
+            if etapa.startswith('rf_') and 'modelo' not in contexto: continue
+            resultados[escenario][etapa] = cronometrar(FUNCIONES[etapa], contexto, repeticiones)
+            print(f"{escenario:>8} {etapa:>22} {resultados[escenario][etapa] * 1000:>10.1f} ms", flush=True)
+    return resultados
+
+
+def entorno():
+    """Máquina y versiones con las que se midió, para saber si la referencia es comparable."""
+    import sklearn
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+            'jit': compilacion.njit is not compilacion._sin_compilar, 'cpus': os.cpu_count(), 'plataforma': platform.platform()}
+
+
+def comparar(resultados, referencia, umbral=UMBRAL_REGRESION):
+    """Tabla de tiempos frente a la referencia y etapas (escenario, etapa) que han empeorado más de `umbral`."""
+    filas, regresiones = [], []
+    for escenario, etapas in resultados.items():
+        for etapa, segundos in etapas.items():
+            base = referencia.get(escenario, {}).get(etapa)
+            cambio = segundos / base - 1 if base else float('nan')
+            regresion = base is not None and cambio > umbral and segundos - base > HOLGURA_SEGUNDOS
+            if regresion: regresiones.append((escenario, etapa))
+            filas.append({'escenario': escenario, 'etapa': etapa, 'ms': segundos * 1000, 'referencia_ms': base * 1000 if base else float('nan'),
+                          'cambio_pct': cambio * 100, 'regresion': regresion})
+    return pd.DataFrame(filas), regresiones
+
+
+def _argumentos(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description="Tiempos por etapa del pipeline con control de regresiones.")
+    parser.add_argument('--escenarios', nargs='+', default=list(ESCENARIOS), choices=list(ESCENARIOS))
+    parser.add_argument('--etapas', nargs='+', default=ETAPAS, choices=ETAPAS)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION, help="Empeoramiento relativo tolerado (0.25 = 25%%).")
+    parser.add_argument('--reintentos', type=int, default=2, help="Veces que se vuelven a medir las etapas que superan el umbral.")
+    parser.add_argument('--referencia', default=REFERENCIA)
+    parser.add_argument('--guardar', action='store_true', help="Guarda los tiempos como nueva referencia en lugar de comparar.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    resultados = ejecutar({escenario: args.etapas for escenario in args.escenarios}, args.repeticiones)
+    if args.guardar:
+        previa = {}
+        if os.path.exists(args.referencia):
+            with open(args.referencia, encoding='utf-8') as archivo: previa = json.load(archivo)['resultados']
+        # Se conservan los escenarios y etapas que no se han vuelto a medir.
+        for escenario, etapas in resultados.items(): previa.setdefault(escenario, {}).update(etapas)
+        with open(args.referencia, 'w', encoding='utf-8') as archivo:
+            json.dump({'entorno': entorno(), 'resultados': previa}, archivo, indent=2, sort_keys=True)
+            archivo.write('\n')
+        print(f"Referencia guardada en {args.referencia}")
+        return 0
+
+    if not os.path.exists(args.referencia):
+        print(f"No existe la referencia {args.referencia}; genérala con --guardar.", file=sys.stderr)
+        return 2
+    with open(args.referencia, encoding='utf-8') as archivo: referencia = json.load(archivo)
+    if referencia['entorno'] != entorno(): print(f"Aviso: la referencia se midió en otro entorno: {referencia['entorno']}", file=sys.stderr)
+    tabla, regresiones = comparar(resultados, referencia['resultados'], args.umbral)
+    for _ in range(args.reintentos):
+        if not regresiones: break
+        pendientes = {}
+        for escenario, etapa in regresiones: pendientes.setdefault(escenario, []).append(etapa)
+        print(f"Volviendo a medir {len(regresiones)} etapas por encima del umbral...", flush=True)
+        for escenario, etapas in ejecutar(pendientes, args.repeticiones).items():
+            for etapa, segundos in etapas.items(): resultados[escenario][etapa] = min(resultados[escenario][etapa], segundos)
+        tabla, regresiones = comparar(resultados, referencia['resultados'], args.umbral)
+    print(tabla.to_string(index=False, float_format=lambda valor: f"{valor:.1f}"))
+    if regresiones:
+        print(f"Regresiones de más del {args.umbral:.0%}: {', '.join(f'{escenario}/{etapa}' for escenario, etapa in regresiones)}", file=sys.stderr)
+        return 1
+    print(f"Sin regresiones de más del {args.umbral:.0%}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Motor de cálculo de la herramienta de trading, independiente de la interfaz Streamlit.
+
+Los nombres públicos se importan bajo demanda para que `import motor` (y `python -m motor`)
+solo cargue los módulos que realmente se usan.
+"""
+import importlib
+
+_MODULOS = {
+    'AlmacenOHLCV': 'almacen',
+    'backtest_binario': 'backtest', 'backtest_tradicional': 'backtest', 'metricas_operaciones': 'backtest',
+    'CacheResultados': 'cache_resultados', 'clave_resultado': 'cache_resultados',
+    'escanear': 'escaner',
+    'COLUMNAS_ESTRATEGIA': 'estrategias', 'ESTRATEGIA_ML': 'estrategias', 'ESTRATEGIAS': 'estrategias', 'columna_estrategia': 'estrategias',
+    'COLUMNAS_INDICADORES': 'indicadores', 'MotorIndicadores': 'indicadores', 'calcular_indicadores': 'indicadores',
+    'huella_memoria': 'memoria',
+    'FEATURES_ML': 'modelo', 'RegistroModelos': 'modelo', 'preparar_datos_ml': 'modelo',
+    'optimizar': 'optimizacion',
+    'analizar': 'pipeline', 'analizar_activo': 'pipeline',
+    'replay': 'replay', 'resumen_replay': 'replay',
+    'analizar_senal_en_vivo': 'senales', 'calcular_senales': 'senales', 'graduar_senal': 'senales', 'niveles_relevantes': 'senales', 'senales_arrays': 'senales',
+    'FuenteAlmacen': 'servicio', 'FuenteReplay': 'servicio', 'ServicioSenales': 'servicio', 'iniciar_en_segundo_plano': 'servicio',
+    'SoportesResistenciasIncrementales': 'soportes_resistencias', 'calculate_support_resistance': 'soportes_resistencias',
+    'cluster_levels': 'soportes_resistencias', 'fractales': 'soportes_resistencias',
+    'walk_forward': 'walkforward',
+}
+
+__all__ = [
+    'AlmacenOHLCV', 'COLUMNAS_ESTRATEGIA', 'COLUMNAS_INDICADORES', 'ESTRATEGIAS', 'ESTRATEGIA_ML', 'FEATURES_ML', 'FuenteAlmacen', 'FuenteReplay',
+    'CacheResultados', 'MotorIndicadores', 'RegistroModelos', 'ServicioSenales', 'SoportesResistenciasIncrementales',
+    'analizar', 'analizar_activo', 'analizar_senal_en_vivo', 'backtest_binario', 'backtest_tradicional', 'calcular_indicadores', 'calcular_senales',
+    'calculate_support_resistance', 'clave_resultado', 'cluster_levels', 'columna_estrategia', 'escanear', 'fractales', 'graduar_senal', 'huella_memoria',
+    'iniciar_en_segundo_plano', 'metricas_operaciones', 'niveles_relevantes', 'optimizar', 'preparar_datos_ml', 'replay', 'resumen_replay', 'senales_arrays', 'walk_forward',
+]
+
+
+def __getattr__(nombre):
+    if nombre not in _MODULOS: raise AttributeError(f"module 'motor' has no attribute '{nombre}'")
+    valor = getattr(importlib.import_module(f"motor.{_MODULOS[nombre]}"), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
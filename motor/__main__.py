@@ -0,0 +1,92 @@
+"""Línea de comandos del pipeline sin Streamlit.
+
+Ejemplos:
+    python -m motor AAPL --intervalo 1h --periodo 6mo --estrategia "MACD Crossover"
+    python -m motor BTC-USD --intervalo 5m --periodo 60d --binarias --salida operaciones --formato csv
+    python -m motor AAPL --intervalo 5m --periodo 60d --salida replay --velas-resultado 3
+
+Con --sin-descarga se usa solo el histórico guardado en disco. numba solo se carga con
+--jit, que compensa su coste de arranque con históricos largos.
+"""
+import argparse
+import json
+import os
+import sys
+
+from motor.estrategias import ESTRATEGIA_ML, ESTRATEGIAS
+
+SALIDAS = ['resumen', 'operaciones', 'datos', 'replay']
+
+
+def _argumentos(argv):
+    parser = argparse.ArgumentParser(prog='python -m motor', description="Backtest y señal en vivo de un activo sin la interfaz web.")
+    parser.add_argument('activo', help="Símbolo de yfinance, por ejemplo AAPL o BTC-USD.")
+    parser.add_argument('--intervalo', default='1d', help="Timeframe de las velas (por defecto 1d).")
+    parser.add_argument('--periodo', default='1y', help="Período de datos (por defecto 1y).")
+    parser.add_argument('--estrategia', default='Momentum', choices=ESTRATEGIAS)
+    parser.add_argument('--binarias', action='store_true', help="Usa el simulador de opciones binarias.")
+    parser.add_argument('--stop-loss', type=float, default=5, help="Stop-loss en %% (modo tradicional).")
+    parser.add_argument('--take-profit', type=float, default=10, help="Take-profit en %% (modo tradicional).")
+    parser.add_argument('--trailing-stop', type=float, default=3, help="Trailing stop en %% (por defecto 3, como en la app); 0 lo desactiva.")
+    parser.add_argument('--expiracion', type=int, default=5, help="Expiración en minutos (modo binarias).")
+    parser.add_argument('--payout', type=float, default=85, help="Porcentaje de pago en %% (modo binarias).")
+    parser.add_argument('--inversion', type=float, default=100, help="Inversión por operación (modo binarias).")
+    parser.add_argument('--umbral-ml', type=float, default=60, help="Umbral de confianza del modelo ML en %%.")
+    parser.add_argument('--sr-ventana', type=int, default=5, help="Ventana de los fractales de soportes y resistencias.")
+    parser.add_argument('--sr-umbral', type=float, default=0.5, help="Umbral de agrupación de niveles en %%.")
+    parser.add_argument('--salida', default='resumen', choices=SALIDAS, help="Qué imprimir: resumen y señal, operaciones, datos con indicadores o el replay de la señal en vivo.")
+    parser.add_argument('--velas-resultado', type=int, default=5, help="Velas hasta el resultado de cada recomendación (--salida replay).")
+    parser.add_argument('--formato', default='json', choices=['json', 'csv'])
+    parser.add_argument('--sin-descarga', action='store_true', help="Usa solo el histórico guardado en disco, sin consultar yfinance.")
+    parser.add_argument('--jit', action='store_true', help="Compila los kernels con numba (más lento al arrancar, más rápido con muchas velas).")
+    parser.add_argument('--tiempos', action='store_true', help="Escribe en stderr el tiempo de cada etapa.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    if args.salida == 'replay' and args.estrategia == ESTRATEGIA_ML:
+        print("El replay no admite la estrategia de Machine Learning.", file=sys.stderr)
+        return 2
+    # La decisión sobre numba debe tomarse antes de importar los módulos con kernels.
+    if args.jit: os.environ['TRADING_JIT'] = '1'
+    else: os.environ.setdefault('TRADING_JIT', '0')
+    from motor.almacen import AlmacenOHLCV
+    from motor.pipeline import analizar_activo
+
+    almacen = AlmacenOHLCV(descargar=lambda *args, **kwargs: None) if args.sin_descarga else None
+    resultado = analizar_activo(args.activo, args.periodo, args.intervalo, almacen=almacen, estrategia=args.estrategia, modo_binarias=args.binarias,
+                                stop_loss_pct=args.stop_loss / 100, take_profit_pct=args.take_profit / 100,
+                                use_trailing_stop=args.trailing_stop > 0, trailing_stop_pct=args.trailing_stop / 100,
+                                expiracion_minutos=args.expiracion, payout=args.payout / 100, inversion=args.inversion,
+                                ml_threshold=args.umbral_ml / 100, sr_window=args.sr_ventana, sr_threshold=args.sr_umbral)
+    if resultado is None:
+        print(f"No se pudieron descargar los datos de '{args.activo}'.", file=sys.stderr)
+        return 1
+
+    import pandas as pd
+    if args.salida == 'resumen':
+        tabla = {'simbolo': resultado['simbolo'], 'ultima_vela': str(resultado['datos'].index[-1]), 'estrategia': args.estrategia,
+                 **(resultado['resumen'] or {'total_operaciones': 0}), **resultado['en_vivo']}
+        if resultado['ml'] is not None: tabla['precision_ml'] = resultado['ml']['precision']
+        if args.formato == 'json': print(json.dumps(tabla, ensure_ascii=False, indent=2, default=str))
+        else:
+            senal = tabla.pop('senal')
+            tabla.update({'accion': senal['action'], 'fuerza': senal['strength'], 'razon': senal['reason'],
+                          'soportes': ' '.join(f"{nivel:.4f}" for nivel in tabla['soportes']), 'resistencias': ' '.join(f"{nivel:.4f}" for nivel in tabla['resistencias'])})
+            pd.DataFrame([tabla]).to_csv(sys.stdout, index=False)
+    else:
+        if args.salida == 'replay':
+            from motor.replay import replay
+            tabla = replay(resultado['datos'], args.estrategia, args.sr_ventana, args.sr_umbral, args.velas_resultado).reset_index()
+        else: tabla = pd.DataFrame(resultado['operaciones']) if args.salida == 'operaciones' else resultado['datos']
+        if args.formato == 'json': print(tabla.to_json(orient='records', date_format='iso', force_ascii=False))
+        else: tabla.to_csv(sys.stdout, index=args.salida == 'datos')
+
+    if args.tiempos:
+        for etapa, segundos in resultado['tiempos'].items(): print(f"{etapa}: {segundos * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
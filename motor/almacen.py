@@ -0,0 +1,251 @@
+"""Almacén OHLCV persistente en Parquet con descarga incremental de las velas nuevas.
+
+Cada símbolo e intervalo se guarda en su propio fichero; `cargar_lote` actualiza varios
+símbolos con una sola descarga conjunta. Al pedir datos se carga el
+histórico desde disco y solo se solicitan a la fuente las velas a partir de las últimas
+guardadas: la última podía estar todavía en formación y las cerradas anteriores sirven para
+detectar que la fuente ha reajustado los precios pasados (yfinance con auto_adjust los
+reescribe tras un split o un dividendo), en cuyo caso se vuelve a descargar el período entero.
+"""
+import os
+import re
+import tempfile
+import threading
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+DIRECTORIO_POR_DEFECTO = os.environ.get('TRADING_DATOS_DIR', '.datos_ohlcv')
+# Margen para fines de semana y festivos al comprobar si el histórico cubre el período pedido.
+MARGEN_COBERTURA = pd.Timedelta(days=7)
+_UNIDADES_PERIODO = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+# Velas guardadas que se vuelven a pedir: la última, que podía estar en formación, y dos cerradas.
+VELAS_SOLAPE = 3
+_COLUMNAS_PRECIO = ['Open', 'High', 'Low', 'Close']
+# Un cerrojo por fichero, compartido por todas las instancias del proceso (sesiones, escáner, streaming).
+_cerrojos = {}
+_cerrojo_cerrojos = threading.Lock()
+
+
+def _cerrojo(ruta):
+    with _cerrojo_cerrojos:
+        return _cerrojos.setdefault(os.path.abspath(ruta), threading.Lock())
+
+
+def simbolos_candidatos(activo):
+    """Símbolos a probar en orden: el pedido y, para pares '-USD', su equivalente de divisa '=X'."""
+    simbolos_a_probar = [activo]
+    if activo.endswith('-USD'): simbolos_a_probar.append(activo.replace('-USD', '=X'))
+    return simbolos_a_probar
+
+
+def normalizar_columnas(datos, simbolo):
+    """Aplana las columnas MultiIndex de yfinance a Open/High/Low/Close/Adj Close/Volume."""
+    if isinstance(datos.columns, pd.MultiIndex):
+        datos.columns = ['_'.join(col).strip() for col in datos.columns.values]
+        rename_dict = {f'Open_{simbolo}': 'Open', f'High_{simbolo}': 'High', f'Low_{simbolo}': 'Low', f'Close_{simbolo}': 'Close', f'Adj Close_{simbolo}': 'Adj Close', f'Volume_{simbolo}': 'Volume'}
+        datos = datos.rename(columns=rename_dict)
+    return datos
+
+
+def inicio_periodo(fin, periodo):
+    """Fecha de inicio de un período de yfinance ('60d', '6mo', '1y'...) contado hacia atrás desde `fin`; None para 'max'."""
+    coincidencia = re.fullmatch(r'(\d+)(d|wk|mo|y)', periodo)
+    if coincidencia is None: return None
+    cantidad, unidad = coincidencia.groups()
+    return fin - pd.DateOffset(**{_UNIDADES_PERIODO[unidad]: int(cantidad)})
+
+
+def recortar_periodo(datos, periodo):
+    """Las velas de `datos` dentro de `periodo` contado desde la última."""
+    inicio = inicio_periodo(datos.index[-1], periodo)
+    return datos if inicio is None else datos[datos.index >= inicio]
+
+
+def descargar_yfinance(simbolo, intervalo, periodo=None, inicio=None):
+    """Fuente de datos por defecto: yfinance, por período completo o desde una fecha."""
+    import yfinance as yf
+    if inicio is not None: return yf.download(simbolo, start=inicio, interval=intervalo, progress=False)
+    return yf.download(simbolo, period=periodo, interval=intervalo, progress=False)
+
+
+def descargar_lote_yfinance(simbolos, intervalo, periodo=None, inicio=None):
+    """Descarga por lotes por defecto: una sola llamada a yfinance con todos los símbolos (columnas precio × símbolo)."""
+    import yfinance as yf
+    if inicio is not None: return yf.download(list(simbolos), start=inicio, interval=intervalo, group_by='column', progress=False)
+    return yf.download(list(simbolos), period=periodo, interval=intervalo, group_by='column', progress=False)
+
+
+def separar_lote(datos, simbolo):
+    """Velas de `simbolo` en una descarga por lotes (columnas precio × símbolo), o None si no trae ninguna."""
+    if datos is None or datos.empty or not isinstance(datos.columns, pd.MultiIndex) or simbolo not in datos.columns.get_level_values(1): return None
+    # Las velas de todos los símbolos comparten índice: las que no son de este quedan vacías.
+    velas = datos.xs(simbolo, axis=1, level=1).dropna(how='all')
+    if velas.empty: return None
+    velas.columns.name = None
+    # Sin huecos el volumen vuelve a ser entero, como en la descarga de un solo símbolo.
+    if 'Volume' in velas.columns and (velas['Volume'] % 1 == 0).all(): velas = velas.astype({'Volume': np.int64})
+    return velas
+
+
+class AlmacenOHLCV:
+    """Histórico OHLCV en disco, indexado por símbolo e intervalo."""
+
+    def __init__(self, directorio=DIRECTORIO_POR_DEFECTO, descargar=descargar_yfinance, descargar_lote=None):
+        self.directorio = directorio
+        self.descargar = descargar
+        # Con una fuente propia y sin descarga por lotes, `cargar_lote` usa la fuente símbolo a símbolo.
+        if descargar_lote is None and descargar is descargar_yfinance: descargar_lote = descargar_lote_yfinance
+        self.descargar_lote = descargar_lote
+
+    def ruta(self, simbolo, intervalo):
+        return os.path.join(self.directorio, f"{quote(simbolo, safe='')}_{intervalo}.parquet")
+
+    def leer(self, simbolo, intervalo):
+        """Histórico guardado, o None si todavía no hay nada en disco."""
+        ruta = self.ruta(simbolo, intervalo)
+        if not os.path.exists(ruta): return None
+        try:
+            return pd.read_parquet(ruta)
+        except (OSError, ValueError):
+            # Un fichero dañado se trata como ausente y se vuelve a descargar.
+            return None
+
+    def guardar(self, simbolo, intervalo, datos):
+        """Escribe el histórico de forma atómica para no dejar ficheros a medias.
+
+        Cada escritura usa su propio temporal y las del mismo fichero se hacen de una en una,
+        aunque vengan de hilos distintos del proceso.
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self.ruta(simbolo, intervalo)
+        with _cerrojo(ruta):
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio, prefix=f"{os.path.basename(ruta)}.", suffix='.tmp')
+            os.close(descriptor)
+            try:
+                datos.to_parquet(temporal)
+                os.replace(temporal, ruta)
+            except BaseException:
+                os.remove(temporal)
+                raise
+
+    def _descargar(self, simbolo, intervalo, **kwargs):
+        datos = self.descargar(simbolo, intervalo, **kwargs)
+        if datos is None or datos.empty: return None
+        return normalizar_columnas(datos, simbolo)
+
+    @staticmethod
+    def _cubre_periodo(guardados, periodo):
+        """Indica si el histórico guardado abarca `periodo` contado desde su última vela.
+
+        Además de mirar la primera vela se consulta el inicio pedido en la última descarga
+        completa, porque un activo con poco histórico nunca llega al inicio del período.
+        """
+        inicio = inicio_periodo(guardados.index[-1], periodo)
+        cubierto = guardados.attrs.get('inicio_cubierto')
+        if cubierto == 'max': return True
+        if inicio is None: return False
+        if cubierto is not None and pd.Timestamp(cubierto) <= inicio + MARGEN_COBERTURA: return True
+        return guardados.index[0] <= inicio + MARGEN_COBERTURA
+
+    @staticmethod
+    def _precios_reajustados(guardados, nuevos):
+        """Indica si la fuente ha cambiado alguna vela cerrada ya guardada (o no devuelve ninguna con la que comparar)."""
+        cerradas = guardados.index[:-1].intersection(nuevos.index)
+        columnas = [columna for columna in _COLUMNAS_PRECIO if columna in guardados.columns and columna in nuevos.columns]
+        if cerradas.empty or not columnas: return True
+        return not np.allclose(guardados.loc[cerradas, columnas].to_numpy(dtype=np.float64), nuevos.loc[cerradas, columnas].to_numpy(dtype=np.float64),
+                               rtol=1e-6, atol=0, equal_nan=True)
+
+    def _desde(self, guardados, periodo):
+        """Vela desde la que pedir las nuevas, o None si hay que descargar el período entero."""
+        if guardados is not None and len(guardados) >= VELAS_SOLAPE and self._cubre_periodo(guardados, periodo): return guardados.index[-VELAS_SOLAPE]
+        return None
+
+    def _unir(self, simbolo, intervalo, guardados, nuevos):
+        """Añade `nuevos` al histórico guardado y lo escribe; None si la fuente ha reajustado los precios."""
+        if self._precios_reajustados(guardados, nuevos): return None
+        datos = pd.concat([guardados, nuevos[guardados.columns.intersection(nuevos.columns)]])
+        datos = datos[~datos.index.duplicated(keep='last')].sort_index()
+        datos.attrs = dict(guardados.attrs)
+        self.guardar(simbolo, intervalo, datos)
+        return datos
+
+    def _guardar_periodo(self, simbolo, periodo, intervalo, datos):
+        """Guarda la descarga completa de un período anotando desde dónde lo cubre."""
+        inicio = inicio_periodo(datos.index[-1], periodo)
+        datos.attrs['inicio_cubierto'] = 'max' if inicio is None else str(inicio)
+        self.guardar(simbolo, intervalo, datos)
+
+    def _actualizar(self, simbolo, periodo, intervalo, guardados):
+        """Completa el histórico guardado con las velas nuevas, o lo descarga entero si no cubre el período o se han reajustado los precios."""
+        desde = self._desde(guardados, periodo)
+        if desde is not None:
+            try:
+                nuevos = self._descargar(simbolo, intervalo, inicio=desde)
+            except Exception:
+                # Sin conexión se sirve el histórico guardado en lugar de descartarlo.
+                return guardados
+            if nuevos is None: return guardados
+            datos = self._unir(simbolo, intervalo, guardados, nuevos)
+            if datos is not None: return datos
+        datos = self._descargar(simbolo, intervalo, periodo=periodo)
+        if datos is not None: self._guardar_periodo(simbolo, periodo, intervalo, datos)
+        return datos
+
+    def cargar(self, activo, periodo, intervalo, completo=False):
+        """Devuelve (datos del período, símbolo usado), o (None, None) si ningún símbolo candidato tiene datos.
+
+        Se da preferencia al primer candidato que ya tenga histórico en disco para no repetir
+        descargas que fallaron en ejecuciones anteriores. Con `completo` se devuelve todo el
+        histórico guardado, que empieza en la misma vela de un refresco a otro; recórtalo con
+        `recortar_periodo`.
+        """
+        candidatos = simbolos_candidatos(activo)
+        guardados = {simbolo: self.leer(simbolo, intervalo) for simbolo in candidatos}
+        orden = [s for s in candidatos if guardados[s] is not None] + [s for s in candidatos if guardados[s] is None]
+        for simbolo in orden:
+            try:
+                datos = self._actualizar(simbolo, periodo, intervalo, guardados[simbolo])
+            except Exception:
+                continue
+            if datos is None or datos.empty: continue
+            return (datos if completo else recortar_periodo(datos, periodo)), simbolo
+        return None, None
+
+    def _descargar_lote(self, simbolos, intervalo, **kwargs):
+        try:
+            return self.descargar_lote(simbolos, intervalo, **kwargs)
+        except Exception:
+            return None
+
+    def cargar_lote(self, activos, periodo, intervalo, completo=False):
+        """Como `cargar` para varios activos a la vez: {activo: (datos, símbolo usado)}.
+
+        Se hacen como mucho dos peticiones a la fuente: una con los activos cuyo histórico
+        cubre el período, desde la más antigua de sus últimas velas guardadas, y otra con el
+        período entero de los demás. Los que no vienen en esas descargas o cuyos precios se
+        han reajustado se cargan de uno en uno con `cargar`, que además prueba los símbolos
+        alternativos. Sin `descargar_lote` todos se cargan de uno en uno.
+        """
+        resultados = {}
+        if self.descargar_lote is not None and activos:
+            guardados = {activo: self.leer(activo, intervalo) for activo in activos}
+            desde = {activo: self._desde(guardados[activo], periodo) for activo in activos}
+            incrementales = [activo for activo in activos if desde[activo] is not None]
+            nuevos = self._descargar_lote(incrementales, intervalo, inicio=min(desde[activo] for activo in incrementales)) if incrementales else None
+            for activo in incrementales:
+                velas = separar_lote(nuevos, activo)
+                datos = None if velas is None else self._unir(activo, intervalo, guardados[activo], velas)
+                if datos is not None: resultados[activo] = (datos, activo)
+            completos = [activo for activo in activos if desde[activo] is None]
+            nuevos = self._descargar_lote(completos, intervalo, periodo=periodo) if completos else None
+            for activo in completos:
+                datos = separar_lote(nuevos, activo)
+                if datos is None: continue
+                self._guardar_periodo(activo, periodo, intervalo, datos)
+                resultados[activo] = (datos, activo)
+        for activo in activos:
+            if activo not in resultados: resultados[activo] = self.cargar(activo, periodo, intervalo, completo=True)
+        return {activo: (datos if datos is None or completo else recortar_periodo(datos, periodo), simbolo) for activo, (datos, simbolo) in resultados.items()}
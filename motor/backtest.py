@@ -0,0 +1,109 @@
+"""Núcleo del backtester sobre arrays de NumPy para los modos tradicional y de opciones binarias.
+
+Los bucles recorren arrays en lugar de filas de pandas. Si numba está instalado se compilan
+con JIT; si no, se ejecutan como Python puro sobre los mismos arrays.
+"""
+import numpy as np
+
+from motor.compilacion import njit
+
+CALL, PUT = 1, -1
+
+
+@njit(cache=True)
+def _kernel_tradicional(close, high, low, atr, senal_compra, stop_loss_pct, take_profit_pct, use_trailing_stop, trailing_stop_pct):
+    n = len(close)
+    salidas = np.empty(n, dtype=np.int64)
+    entradas = np.empty(n, dtype=np.float64)
+    precios_salida = np.empty(n, dtype=np.float64)
+    n_ops = 0
+    en_posicion, precio_entrada, stop_loss_actual, take_profit_actual = False, 0.0, 0.0, 0.0
+    for i in range(1, n):
+        if not en_posicion and senal_compra[i]:
+            en_posicion = True; precio_entrada = close[i]
+            atr_actual = atr[i]
+            stop_pct = stop_loss_pct if np.isnan(atr_actual) else max(stop_loss_pct, atr_actual * 2)
+            stop_loss_actual = precio_entrada * (1 - stop_pct)
+            take_profit_actual = precio_entrada * (1 + take_profit_pct)
+        elif en_posicion:
+            precio_salida = 0.0
+            if use_trailing_stop:
+                nuevo_trailing_stop = close[i] * (1 - trailing_stop_pct)
+                if nuevo_trailing_stop > stop_loss_actual: stop_loss_actual = nuevo_trailing_stop
+            if high[i] >= take_profit_actual: precio_salida = take_profit_actual
+            elif low[i] <= stop_loss_actual: precio_salida = stop_loss_actual
+            if precio_salida > 0:
+                salidas[n_ops] = i; entradas[n_ops] = precio_entrada; precios_salida[n_ops] = precio_salida
+                n_ops += 1
+                en_posicion = False
+    return salidas[:n_ops], entradas[:n_ops], precios_salida[:n_ops]
+
+
+@njit(cache=True)
+def _kernel_binario(close, senal_compra, senal_venta, expiracion_steps):
+    n = len(close)
+    ejecuciones = np.empty(n, dtype=np.int64)
+    direcciones = np.empty(n, dtype=np.int64)
+    n_ops = 0
+    en_posicion, indice_ejecucion, direccion = False, 0, 0
+    for i in range(n - expiracion_steps):
+        if not en_posicion and senal_compra[i]: en_posicion, indice_ejecucion, direccion = True, i, CALL
+        elif not en_posicion and senal_venta[i]: en_posicion, indice_ejecucion, direccion = True, i, PUT
+        elif en_posicion:
+            # La expiración se mide desde la vela en la que se resuelve la operación, como en el bucle original.
+            ejecuciones[n_ops] = indice_ejecucion; direcciones[n_ops] = direccion
+            n_ops += 1
+            en_posicion = False
+    return ejecuciones[:n_ops], direcciones[:n_ops]
+
+
+def _serie(df, columna, dtype=np.float64):
+    return np.ascontiguousarray(df[columna].to_numpy(dtype=dtype))
+
+
+def backtest_tradicional(df, stop_loss_pct, take_profit_pct, use_trailing_stop, trailing_stop_pct):
+    """Simula operaciones con stop inicial por ATR, trailing stop y take profit; devuelve la lista de operaciones."""
+    salidas, entradas, precios_salida = _kernel_tradicional(
+        _serie(df, 'Close'), _serie(df, 'High'), _serie(df, 'Low'), _serie(df, 'ATRr_14'), _serie(df, 'senal_compra', bool),
+        float(stop_loss_pct), float(take_profit_pct), bool(use_trailing_stop), float(trailing_stop_pct))
+    resultados_operaciones = []
+    for i, precio_entrada, precio_salida in zip(salidas.tolist(), entradas, precios_salida):
+        rentabilidad = (precio_salida - precio_entrada) / precio_entrada
+        # fecha_entrada es la vela anterior a la salida, igual que en el backtester original.
+        resultados_operaciones.append({'entrada': precio_entrada, 'salida': precio_salida, 'rentabilidad': rentabilidad, 'fecha_entrada': df.index[i - 1], 'fecha_salida': df.index[i]})
+    return resultados_operaciones
+
+
+def rentabilidades_tradicional(close, high, low, atr, senal_compra, stop_loss_pct, take_profit_pct, use_trailing_stop, trailing_stop_pct):
+    """Rentabilidad de cada operación del modo tradicional, trabajando solo con arrays."""
+    _, entradas, precios_salida = _kernel_tradicional(close, high, low, atr, senal_compra, float(stop_loss_pct), float(take_profit_pct), bool(use_trailing_stop), float(trailing_stop_pct))
+    return (precios_salida - entradas) / entradas
+
+
+def metricas_operaciones(rentabilidades):
+    """Resume un backtest con las mismas fórmulas que el panel de resultados de la app."""
+    rentabilidades = np.asarray(rentabilidades, dtype=np.float64)
+    total_ops = len(rentabilidades)
+    if total_ops == 0:
+        return {'total_operaciones': 0, 'rentabilidad_total': 0.0, 'porcentaje_aciertos': 0.0, 'factor_beneficio': 0.0}
+    ganancias, perdidas = rentabilidades[rentabilidades > 0], rentabilidades[rentabilidades < 0]
+    factor_beneficio = abs(ganancias.sum() / perdidas.sum()) if len(perdidas) else 0.0
+    return {'total_operaciones': total_ops, 'rentabilidad_total': float(rentabilidades.sum()),
+            'porcentaje_aciertos': len(ganancias) / total_ops * 100, 'factor_beneficio': float(factor_beneficio)}
+
+
+def backtest_binario(df, expiracion_steps, payout_pct, inversion_por_operacion):
+    """Simula opciones binarias con expiración fija de `expiracion_steps` velas; devuelve la lista de operaciones."""
+    close = _serie(df, 'Close')
+    ejecuciones, direcciones = _kernel_binario(close, _serie(df, 'senal_compra', bool), _serie(df, 'senal_venta', bool), int(expiracion_steps))
+    resultados_operaciones = []
+    if len(ejecuciones) == 0: return resultados_operaciones
+    # Cada operación se resuelve en la vela siguiente a su ejecución, así que su expiración es ejecución + 1 + pasos.
+    expiraciones = ejecuciones + 1 + expiracion_steps
+    for indice_ejecucion, indice_expiracion, direccion in zip(ejecuciones.tolist(), expiraciones.tolist(), direcciones.tolist()):
+        precio_ejecucion, precio_en_expiracion = close[indice_ejecucion], close[indice_expiracion]
+        direccion_prediccion = 'CALL' if direccion == CALL else 'PUT'
+        gano = (direccion_prediccion == 'CALL' and precio_en_expiracion > precio_ejecucion) or (direccion_prediccion == 'PUT' and precio_en_expiracion < precio_ejecucion)
+        rentabilidad = payout_pct if gano else -1.0
+        resultados_operaciones.append({'fecha_ejecucion': df.index[indice_ejecucion], 'fecha_expiracion': df.index[indice_expiracion], 'direccion': direccion_prediccion, 'precio_ejecucion': precio_ejecucion, 'precio_expiracion': precio_en_expiracion, 'resultado': 'GANA' if gano else 'PIERDE', 'rentabilidad': rentabilidad, 'beneficio': inversion_por_operacion * rentabilidad})
+    return resultados_operaciones
@@ -0,0 +1,144 @@
+"""Caché de resultados derivados compartida entre sesiones, direccionada por contenido.
+
+Cada resultado (histórico con indicadores y señales, soportes/resistencias y señal en vivo,
+operaciones del backtest) se guarda bajo una clave con el símbolo, el intervalo, el período,
+la etapa y un hash de los datos de entrada y los parámetros: si llegan velas nuevas o cambia
+un parámetro la clave es otra y no hace falta invalidar nada. Las entradas menos usadas se
+desalojan cuando se supera el número de entradas o de bytes. Las peticiones simultáneas de
+la misma clave se calculan una sola vez: las demás esperan al resultado de la primera.
+
+Los resultados se comparten entre sesiones y no deben modificarse; copia un DataFrame antes
+de añadirle columnas.
+"""
+import hashlib
+import sys
+import threading
+from collections import Counter, OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+ClaveResultado = namedtuple('ClaveResultado', ['simbolo', 'intervalo', 'periodo', 'etapa', 'huella'])
+
+
+def _bytes_contenido(valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)): return pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes()
+    if isinstance(valor, np.ndarray): return str((valor.dtype, valor.shape)).encode() + np.ascontiguousarray(valor).tobytes()
+    return repr(valor).encode()
+
+
+def clave_resultado(simbolo, intervalo, periodo, etapa, *contenido, **parametros):
+    """Clave de un resultado: `contenido` son los datos de entrada (DataFrames, arrays o hashes ya calculados)."""
+    huella = hashlib.sha1()
+    for valor in contenido: huella.update(_bytes_contenido(valor))
+    huella.update(repr(sorted(parametros.items())).encode())
+    return ClaveResultado(simbolo, intervalo, periodo, etapa, huella.hexdigest()[:20])
+
+
+def tamano_bytes(valor):
+    """Memoria aproximada de un resultado: exacta para DataFrames y arrays, recursiva en listas y diccionarios."""
+    if isinstance(valor, (pd.DataFrame, pd.Series)): return int(np.sum(valor.memory_usage(deep=True)))
+    if isinstance(valor, np.ndarray): return valor.nbytes
+    if isinstance(valor, dict): return sys.getsizeof(valor) + sum(tamano_bytes(k) + tamano_bytes(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)): return sys.getsizeof(valor) + sum(tamano_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class _Calculo:
+    """Cálculo en curso de una clave, al que esperan las peticiones repetidas."""
+
+    def __init__(self):
+        self.terminado = threading.Event()
+        self.valor = self.error = None
+        self.interrumpido = False
+
+
+class CacheResultados:
+    """Caché LRU limitada en entradas y bytes con deduplicación de cálculos simultáneos (single-flight)."""
+
+    def __init__(self, max_entradas=256, max_bytes=512 * 1024 ** 2):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._en_curso = {}
+        self._bytes = 0
+        self._contadores = Counter()
+        self._por_etapa = {}
+        self._cerrojo = threading.Lock()
+
+    def _contar(self, clave, evento):
+        self._contadores[evento] += 1
+        self._por_etapa.setdefault(getattr(clave, 'etapa', ''), Counter())[evento] += 1
+
+    def obtener(self, clave, calcular):
+        """Resultado de `clave`; si no está se calcula con `calcular()` una sola vez aunque lo pidan varios hilos.
+
+        Si el cálculo falla con una `Exception`, todas las peticiones que lo esperaban reciben
+        el mismo error. Las demás excepciones (KeyboardInterrupt, o las que usa Streamlit para
+        detener o volver a ejecutar la sesión que calculaba) son de esa sesión y solo le llegan
+        a ella: las que esperaban vuelven a pedir el resultado y una de ellas lo calcula.
+        """
+        while True:
+            with self._cerrojo:
+                if clave in self._entradas:
+                    self._entradas.move_to_end(clave)
+                    self._contar(clave, 'aciertos')
+                    return self._entradas[clave][0]
+                calculo = self._en_curso.get(clave)
+                if calculo is None:
+                    calculo = self._en_curso[clave] = _Calculo()
+                    self._contar(clave, 'fallos')
+                    break
+            calculo.terminado.wait()
+            if calculo.interrumpido: continue
+            with self._cerrojo: self._contar(clave, 'esperas')
+            if calculo.error is not None: raise calculo.error
+            return calculo.valor
+
+        try:
+            calculo.valor = calcular()
+        except Exception as error:
+            calculo.error = error
+            raise
+        except BaseException:
+            calculo.interrumpido = True
+            raise
+        else:
+            self._guardar(clave, calculo.valor)
+        finally:
+            with self._cerrojo: del self._en_curso[clave]
+            calculo.terminado.set()
+        return calculo.valor
+
+    def _guardar(self, clave, valor):
+        tamano = tamano_bytes(valor)
+        with self._cerrojo:
+            # Un resultado mayor que la caché entera solo desalojaría a todos los demás.
+            if tamano > self.max_bytes:
+                self._contar(clave, 'descartados')
+                return
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                clave_desalojada, (_, tamano_desalojado) = self._entradas.popitem(last=False)
+                self._bytes -= tamano_desalojado
+                self._contar(clave_desalojada, 'desalojos')
+
+    def limpiar(self):
+        """Vacía la caché; los contadores se conservan."""
+        with self._cerrojo:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        """Entradas, bytes, contadores (aciertos, fallos, esperas, desalojos, descartados) y tasa de aciertos global y por etapa.
+
+        Las esperas son peticiones que encontraron el mismo cálculo en curso y reutilizaron su resultado.
+        """
+        tasa = lambda contadores: (contadores['aciertos'] + contadores['esperas']) / max(sum(contadores[evento] for evento in ('aciertos', 'fallos', 'esperas')), 1)
+        with self._cerrojo:
+            return {'entradas': len(self._entradas), 'bytes': self._bytes,
+                    **{evento: self._contadores[evento] for evento in ('aciertos', 'fallos', 'esperas', 'desalojos', 'descartados')},
+                    'tasa_aciertos': tasa(self._contadores),
+                    'por_etapa': {etapa: {'aciertos': contadores['aciertos'] + contadores['esperas'], 'fallos': contadores['fallos'], 'desalojos': contadores['desalojos'],
+                                          'tasa_aciertos': tasa(contadores)} for etapa, contadores in self._por_etapa.items()}}
@@ -0,0 +1,21 @@
+"""Compilación JIT opcional: usa numba si está instalado y, si no, deja las funciones en Python puro.
+
+Con la variable de entorno TRADING_JIT=0 no se importa numba: cargar numba y los kernels
+compilados cuesta alrededor de un segundo, más de lo que tardan en Python puro ejecuciones
+cortas como las de la línea de comandos sobre unos pocos miles de velas.
+"""
+import os
+
+
+def _sin_compilar(*args, **kwargs):
+    if len(args) == 1 and callable(args[0]): return args[0]
+    return lambda funcion: funcion
+
+
+if os.environ.get('TRADING_JIT', '1') == '0':
+    njit = _sin_compilar
+else:
+    try:
+        from numba import njit
+    except ImportError:  # numba es opcional
+        njit = _sin_compilar
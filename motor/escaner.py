@@ -0,0 +1,104 @@
+"""Escáner de una lista de activos: descarga por lotes y análisis de la señal en vivo en paralelo.
+
+Cada lote de símbolos se descarga de una vez (`AlmacenOHLCV.cargar_lote`) en un pool de
+hilos con concurrencia limitada y, a medida que termina cada lote, sus símbolos pasan a un
+pool de procesos que calcula indicadores, señales, soportes/resistencias y la recomendación
+en vivo de la última vela.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from motor.almacen import AlmacenOHLCV
+from motor.estrategias import ESTRATEGIA_ML, columna_estrategia
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.senales import analizar_senal_en_vivo, calcular_senales, niveles_relevantes
+from motor.soportes_resistencias import calculate_support_resistance
+
+ORDEN_FUERZA = {'FUERTE': 0, 'MODERADA': 1, 'DÉBIL': 2, 'N/A': 3}
+COLUMNAS_ESCANER = ['simbolo', 'simbolo_datos', 'accion', 'fuerza', 'razon', 'precio', 'ultima_vela', 'error']
+
+
+def analizar_simbolo(simbolo, datos, estrategia, sr_window=5, sr_threshold=0.5):
+    """Fila del escáner con la recomendación en vivo de un símbolo a partir de su OHLCV."""
+    df = datos.copy()
+    df[COLUMNAS_INDICADORES] = calcular_indicadores(df)
+    calcular_senales(df)
+    df['senal_compra'] = df[columna_estrategia(estrategia)]
+    support_levels, resistance_levels = calculate_support_resistance(df, window=sr_window, threshold_pct=sr_threshold)
+    current_price = df['Close'].iloc[-1]
+    relevant_support, relevant_resistance = niveles_relevantes(support_levels, resistance_levels, current_price)
+    live_signal = analizar_senal_en_vivo(df, relevant_support, relevant_resistance)
+    return {'simbolo': simbolo, 'accion': live_signal['action'], 'fuerza': live_signal['strength'], 'razon': live_signal['reason'],
+            'precio': float(current_price), 'ultima_vela': df.index[-1]}
+
+
+def _analizar_en_trabajador(simbolo, simbolo_datos, datos, estrategia, sr_window, sr_threshold):
+    try:
+        fila = analizar_simbolo(simbolo, datos, estrategia, sr_window, sr_threshold)
+    except Exception as e:
+        fila = {'simbolo': simbolo, 'error': f"Error en el análisis: {e}"}
+    fila['simbolo_datos'] = simbolo_datos
+    return fila
+
+
+def _descargar_lote(almacen, lote, periodo, intervalo):
+    """Carga los símbolos de `lote` con una descarga conjunta y devuelve [(símbolo, símbolo de los datos, datos)] en su orden."""
+    try:
+        cargados = almacen.cargar_lote(lote, periodo, intervalo)
+    except Exception:
+        cargados = {}
+    resultados = []
+    for simbolo in lote:
+        datos, simbolo_datos = cargados.get(simbolo, (None, None))
+        resultados.append((simbolo, simbolo_datos, datos))
+    return resultados
+
+
+def _lanzar(descargas, analisis, almacen, lotes, periodo, intervalo, estrategia, sr_window, sr_threshold):
+    """Descarga los lotes y envía cada símbolo al pool de análisis en cuanto su lote está listo."""
+    filas, pendientes = [], []
+    for resultados in descargas.map(lambda lote: _descargar_lote(almacen, lote, periodo, intervalo), lotes):
+        for simbolo, simbolo_datos, datos in resultados:
+            if datos is None or datos.empty:
+                filas.append({'simbolo': simbolo, 'simbolo_datos': simbolo_datos, 'error': "No se pudieron descargar los datos."})
+            else:
+                pendientes.append(analisis.submit(_analizar_en_trabajador, simbolo, simbolo_datos, datos, estrategia, sr_window, sr_threshold))
+    return filas, pendientes
+
+
+def ordenar_por_fuerza(tabla):
+    """Ordena las filas del escáner de la señal más fuerte a la más débil; los errores quedan al final."""
+    orden = tabla['fuerza'].map(ORDEN_FUERZA).fillna(len(ORDEN_FUERZA))
+    return tabla.assign(_orden=orden).sort_values(['_orden', 'simbolo'], kind='stable').drop(columns='_orden').reset_index(drop=True)
+
+
+def escanear(watchlist, periodo, intervalo, estrategia='Momentum', almacen=None, max_workers=None, max_descargas=4, tamano_lote=10, sr_window=5, sr_threshold=0.5):
+    """Analiza todos los símbolos de `watchlist` y devuelve (tabla ordenada por fuerza de la señal, estadísticas).
+
+    `almacen` es la fuente de datos (un `AlmacenOHLCV`, con la descarga que se quiera enchufar).
+    Las estadísticas incluyen el rendimiento en símbolos por segundo.
+    """
+    if estrategia == ESTRATEGIA_ML:
+        raise ValueError("El escáner no entrena modelos: elige una estrategia técnica.")
+    almacen = almacen or AlmacenOHLCV()
+    simbolos = list(dict.fromkeys(simbolo.strip() for simbolo in watchlist if simbolo.strip()))
+    lotes = [simbolos[i:i + tamano_lote] for i in range(0, len(simbolos), tamano_lote)]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as analisis:
+        # Los procesos se crean antes que los hilos de descarga: bifurcar mientras un hilo tiene
+        # tomado un cerrojo (red, Parquet, logging) puede dejar bloqueado al proceso hijo.
+        analisis.submit(int).result()
+        with ThreadPoolExecutor(max_workers=max_descargas) as descargas:
+            filas, pendientes = _lanzar(descargas, analisis, almacen, lotes, periodo, intervalo, estrategia, sr_window, sr_threshold)
+            filas.extend(futuro.result() for futuro in pendientes)
+    duracion = time.perf_counter() - inicio
+
+    tabla = ordenar_por_fuerza(pd.DataFrame(filas, columns=COLUMNAS_ESCANER))
+    estadisticas = {'simbolos': len(simbolos), 'segundos': duracion, 'simbolos_por_segundo': len(simbolos) / duracion if duracion > 0 else float('inf'),
+                    'procesos': max_workers, 'descargas_concurrentes': max_descargas}
+    return tabla, estadisticas
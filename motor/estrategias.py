@@ -0,0 +1,19 @@
+"""Correspondencia entre las estrategias de la barra lateral y sus columnas de señal."""
+
+ESTRATEGIA_ML = 'Machine Learning (RF)'
+
+COLUMNAS_ESTRATEGIA = {
+    'Momentum': 'senal_momentum',
+    'Mean Reversion': 'senal_mean_reversion',
+    'MACD Crossover': 'senal_macd',
+    'Stochastic Oscillator': 'senal_stoch',
+    'VWAP Trading': 'senal_vwap',
+    ESTRATEGIA_ML: 'senal_ml',
+}
+
+ESTRATEGIAS = list(COLUMNAS_ESTRATEGIA)
+
+
+def columna_estrategia(estrategia):
+    """Columna de señal de compra de una estrategia; cualquier otra opción usa la del modelo ML."""
+    return COLUMNAS_ESTRATEGIA.get(estrategia, COLUMNAS_ESTRATEGIA[ESTRATEGIA_ML])
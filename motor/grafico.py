@@ -0,0 +1,137 @@
+"""Gráfico de 4 paneles de la app (precio, RSI/Stoch, MACD y volumen) con modo rápido.
+
+En modo rápido solo se dibuja el rango visible y, si tiene más velas que `max_puntos`, se
+submuestrea: las velas y las barras se agregan por cubetas (apertura, máximo, mínimo y
+cierre de cada cubeta, de modo que no se pierden extremos) y las líneas se reducen con
+LTTB (Largest-Triangle-Three-Buckets) y se dibujan con `Scattergl` (WebGL). Las
+máscaras de las señales se calculan una sola vez. plotly se importa al construir la figura.
+"""
+import math
+
+import numpy as np
+
+from motor.compilacion import njit
+
+MAX_PUNTOS_POR_DEFECTO = 2000
+
+# (columna, nombre, estilo de línea, fila)
+_LINEAS = [
+    ('EMA_20', 'EMA 20', dict(color='orange', width=1), 1),
+    ('EMA_50', 'EMA 50', dict(color='blue', width=1), 1),
+    ('VWAP_D', 'VWAP', dict(color='purple', width=1, dash='dash'), 1),
+    ('RSI_14', 'RSI 14', dict(color='purple'), 2),
+    ('STOCHk_14_3_3', 'Stoch %K', dict(color='blue'), 2),
+    ('STOCHd_14_3_3', 'Stoch %D', dict(color='red'), 2),
+    ('MACD_12_26_9', 'MACD', dict(color='blue'), 3),
+    ('MACDs_12_26_9', 'Señal MACD', dict(color='red'), 3),
+]
+
+
+@njit(cache=True)
+def _kernel_lttb(x, y, n_puntos):
+    """Índices elegidos por LTTB: en cada cubeta, el punto que forma el triángulo de mayor área."""
+    n = len(x)
+    indices = np.empty(n_puntos, dtype=np.int64)
+    indices[0], indices[n_puntos - 1] = 0, n - 1
+    tamano = (n - 2) / (n_puntos - 2)
+    anterior = 0
+    for i in range(n_puntos - 2):
+        inicio, fin = int(i * tamano) + 1, int((i + 1) * tamano) + 1
+        inicio_siguiente, fin_siguiente = fin, min(int((i + 2) * tamano) + 1, n)
+        media_x, media_y = 0.0, 0.0
+        for j in range(inicio_siguiente, fin_siguiente):
+            media_x += x[j]; media_y += y[j]
+        media_x /= fin_siguiente - inicio_siguiente; media_y /= fin_siguiente - inicio_siguiente
+        mejor, mejor_area = inicio, -1.0
+        for j in range(inicio, fin):
+            area = abs((x[anterior] - media_x) * (y[j] - y[anterior]) - (x[anterior] - x[j]) * (media_y - y[anterior]))
+            if area > mejor_area: mejor, mejor_area = j, area
+        indices[i + 1] = mejor
+        anterior = mejor
+    return indices
+
+
+def lttb(y, n_puntos):
+    """Posiciones de `y` que conservan su forma con como mucho `n_puntos` puntos; los NaN se descartan."""
+    y = np.asarray(y, dtype=np.float64)
+    validos = np.flatnonzero(~np.isnan(y))
+    if len(validos) <= max(n_puntos, 2): return validos
+    return validos[_kernel_lttb(validos.astype(np.float64), y[validos], max(n_puntos, 3))]
+
+
+def inicios_cubetas(n_filas, max_puntos):
+    """Primera fila de cada cubeta de agregación; una cubeta por fila si caben todas."""
+    return np.arange(0, n_filas, max(1, math.ceil(n_filas / max_puntos)))
+
+
+def agregar_velas(datos, inicios):
+    """OHLCV por cubeta: apertura de la primera vela, máximo, mínimo, cierre de la última y volumen total."""
+    finales = np.append(inicios[1:], len(datos)) - 1
+    return {'x': datos.index[inicios],
+            'Open': datos['Open'].to_numpy()[inicios], 'Close': datos['Close'].to_numpy()[finales],
+            'High': np.maximum.reduceat(datos['High'].to_numpy(), inicios), 'Low': np.minimum.reduceat(datos['Low'].to_numpy(), inicios),
+            'Volume': np.add.reduceat(datos['Volume'].to_numpy(dtype=np.float64), inicios)}
+
+
+def extremo_por_cubeta(valores, inicios):
+    """El valor de mayor magnitud de cada cubeta (con su signo), para barras como el histograma MACD."""
+    valores = np.nan_to_num(np.asarray(valores, dtype=np.float64))
+    maximos, minimos = np.maximum.reduceat(valores, inicios), np.minimum.reduceat(valores, inicios)
+    return np.where(np.abs(maximos) >= np.abs(minimos), maximos, minimos)
+
+
+def _linea_horizontal(y, fila, linea, **opciones):
+    """Forma equivalente a `fig.add_hline(y, row=fila, col=1)` en la rejilla de 4 filas."""
+    eje = '' if fila == 1 else fila
+    return dict(type='line', xref=f'x{eje} domain', x0=0, x1=1, yref=f'y{eje}', y0=y, y1=y, line=linea, **opciones)
+
+
+def construir_figura(datos, soportes, resistencias, rapido=True, max_puntos=MAX_PUNTOS_POR_DEFECTO, velas_visibles=None):
+    """Figura de la app; con `rapido` se limita a las últimas `velas_visibles` velas y se submuestrea.
+
+    Devuelve (figura, puntos dibujados en todas las trazas).
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    if rapido and velas_visibles is not None: datos = datos.iloc[-velas_visibles:]
+    compra, venta = datos['senal_compra'].to_numpy(dtype=bool), datos['senal_venta'].to_numpy(dtype=bool)
+    fig = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.03, subplot_titles=('Precio', 'RSI / Stoch', 'MACD', 'Volumen'), row_heights=[0.5, 0.2, 0.2, 0.1])
+
+    if rapido:
+        inicios = inicios_cubetas(len(datos), max_puntos)
+        velas = agregar_velas(datos, inicios)
+        fig.add_trace(go.Candlestick(x=velas['x'], open=velas['Open'], high=velas['High'], low=velas['Low'], close=velas['Close'], name='Precio'), row=1, col=1)
+    else:
+        fig.add_trace(go.Candlestick(x=datos.index, open=datos['Open'], high=datos['High'], low=datos['Low'], close=datos['Close'], name='Precio'), row=1, col=1)
+
+    for columna, nombre, linea, fila in _LINEAS:
+        if rapido:
+            posiciones = lttb(datos[columna].to_numpy(), max_puntos)
+            fig.add_trace(go.Scattergl(x=datos.index[posiciones], y=datos[columna].to_numpy()[posiciones], line=linea, name=nombre), row=fila, col=1)
+        else:
+            fig.add_trace(go.Scatter(x=datos.index, y=datos[columna], line=linea, name=nombre), row=fila, col=1)
+        if columna == 'VWAP_D':
+            # Marcadores de las señales: pocas velas, se dibujan todas.
+            marcador = go.Scattergl if rapido else go.Scatter
+            fig.add_trace(marcador(x=datos.index[compra], y=datos['Close'].to_numpy()[compra], mode='markers', marker_symbol='triangle-up', marker_size=12, marker_color='lime', name='Señal Compra (CALL)'), row=1, col=1)
+            fig.add_trace(marcador(x=datos.index[venta], y=datos['Close'].to_numpy()[venta], mode='markers', marker_symbol='triangle-down', marker_size=12, marker_color='red', name='Señal Venta (PUT)'), row=1, col=1)
+
+    # Las líneas de nivel se añaden de una vez: add_hline/add_annotation revalidan todas las formas en cada llamada.
+    formas, anotaciones = [], []
+    for niveles, prefijo, color in [(resistencias, 'R', 'red'), (soportes, 'S', 'green')]:
+        for level in niveles:
+            formas.append(_linea_horizontal(level, 1, dict(color=color, width=1.5, dash='dot'), opacity=0.8))
+            anotaciones.append(dict(x=datos.index[-1], y=level, xref='x', yref='y', text=f"{prefijo} {level:.2f}", showarrow=False, xanchor='left', yanchor='middle', font=dict(color=color, size=10)))
+    for level, color in [(70, 'red'), (30, 'green'), (80, 'red'), (20, 'green')]:
+        formas.append(_linea_horizontal(level, 2, dict(color=color, width=1, dash='dash')))
+    fig.update_layout(shapes=formas, annotations=list(fig.layout.annotations) + anotaciones)
+
+    if rapido:
+        fig.add_trace(go.Bar(x=velas['x'], y=extremo_por_cubeta(datos['MACDh_12_26_9'], inicios), name='Histograma MACD', marker_color='gray'), row=3, col=1)
+        fig.add_trace(go.Bar(x=velas['x'], y=velas['Volume'], name='Volumen', marker_color='lightblue'), row=4, col=1)
+    else:
+        fig.add_trace(go.Bar(x=datos.index, y=datos['MACDh_12_26_9'], name='Histograma MACD', marker_color='gray'), row=3, col=1)
+        fig.add_trace(go.Bar(x=datos.index, y=datos['Volume'], name='Volumen', marker_color='lightblue'), row=4, col=1)
+    fig.update_layout(xaxis_rangeslider_visible=False, height=1400, showlegend=False)
+    return fig, sum(len(traza.x) for traza in fig.data)
@@ -0,0 +1,284 @@
+"""Indicadores técnicos incrementales con los mismos resultados que pandas-ta.
+
+Cada indicador guarda su estado recursivo (acumuladores EWM, ventanas móviles, anclas
+diarias del VWAP), de modo que al añadir N velas nuevas el coste es O(N) y no depende
+de la longitud del histórico. Las medias exponenciales replican el bucle de
+`pandas.Series.ewm` operación por operación; las ventanas móviles se recalculan sobre
+sus últimos valores y coinciden con pandas salvo redondeo.
+"""
+import copy
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from motor.compilacion import njit
+
+COLUMNAS_INDICADORES = ['EMA_20', 'EMA_50', 'RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9', 'STOCHk_14_3_3', 'STOCHd_14_3_3',
+                        'VWAP_D', 'ATRr_14', 'BBM', 'BBL', 'BBU', 'Volume_SMA']
+
+
+@njit(cache=True)
+def _kernel_ewm(valores, alpha, adjust, min_periods, ponderado, peso_anterior, observaciones):
+    """Bucle de `Series.ewm(...).mean()` de pandas (ignore_na=False) a partir de un estado dado."""
+    salida = np.empty(len(valores))
+    peso_nuevo = 1.0 if adjust else alpha
+    factor_anterior = 1.0 - alpha
+    for i in range(len(valores)):
+        actual = valores[i]
+        es_observacion = actual == actual
+        observaciones += es_observacion
+        if ponderado == ponderado:
+            peso_anterior *= factor_anterior
+            if es_observacion:
+                if ponderado != actual:
+                    ponderado = peso_anterior * ponderado + peso_nuevo * actual
+                    ponderado /= peso_anterior + peso_nuevo
+                if adjust: peso_anterior += peso_nuevo
+                else: peso_anterior = 1.0
+        elif es_observacion:
+            ponderado = actual
+        salida[i] = ponderado if observaciones >= min_periods else np.nan
+    return salida, ponderado, peso_anterior, observaciones
+
+
+@njit(cache=True)
+def _kernel_vwap(precio_volumen, volumen, claves, clave, suma_precio_volumen, suma_volumen):
+    """Suma acumulada por día como `groupby(...).cumsum()`: los NaN dan NaN sin romper la suma."""
+    salida = np.empty(len(volumen))
+    for i in range(len(volumen)):
+        if claves[i] != clave:
+            clave, suma_precio_volumen, suma_volumen = claves[i], 0.0, 0.0
+        pv, v = precio_volumen[i], volumen[i]
+        if pv == pv: suma_precio_volumen += pv
+        if v == v: suma_volumen += v
+        salida[i] = suma_precio_volumen / suma_volumen if pv == pv and v == v else np.nan
+    return salida, clave, suma_precio_volumen, suma_volumen
+
+
+def _no_cero(rango):
+    # pandas-ta suma epsilon al rango cuando hay ceros; solo cambia el resultado en esas velas.
+    return np.where(rango == 0, sys.float_info.epsilon, rango)
+
+
+class _EWM:
+    """Media exponencial de pandas con estado."""
+
+    def __init__(self, alpha, adjust, min_periods=0):
+        self.alpha, self.adjust, self.min_periods = alpha, adjust, min_periods
+        self.ponderado, self.peso_anterior, self.observaciones = np.nan, 1.0, 0
+
+    def actualizar(self, valores):
+        salida, self.ponderado, self.peso_anterior, self.observaciones = _kernel_ewm(
+            np.ascontiguousarray(valores, dtype=np.float64), self.alpha, self.adjust, self.min_periods,
+            self.ponderado, self.peso_anterior, self.observaciones)
+        return salida
+
+
+class _EMA:
+    """EMA de pandas-ta: semilla con la media simple de las primeras `longitud` velas y luego ewm(span, adjust=False)."""
+
+    def __init__(self, longitud):
+        self.longitud = longitud
+        self.iniciales = []
+        self.ewm = _EWM(2 / (longitud + 1), adjust=False)
+
+    def actualizar(self, valores):
+        salida = np.full(len(valores), np.nan)
+        inicio = 0
+        faltan = self.longitud - len(self.iniciales)
+        if faltan > 0:
+            tomados = valores[:faltan]
+            self.iniciales.extend(tomados.tolist())
+            inicio = len(tomados)
+            if len(self.iniciales) == self.longitud:
+                iniciales = np.array(self.iniciales)
+                validos = ~np.isnan(iniciales)
+                semilla = np.where(validos, iniciales, 0.0).sum() / validos.sum() if validos.any() else np.nan
+                salida[inicio - 1] = self.ewm.actualizar(np.array([semilla]))[0]
+        if inicio < len(valores) and len(self.iniciales) == self.longitud:
+            salida[inicio:] = self.ewm.actualizar(valores[inicio:])
+        return salida
+
+
+class _RMA(_EWM):
+    """Media de Wilder de pandas-ta: ewm(alpha=1/longitud, min_periods=longitud) con adjust=True."""
+
+    def __init__(self, longitud):
+        super().__init__(1.0 / longitud, adjust=True, min_periods=longitud)
+
+
+class _Ventana:
+    """Últimos `longitud - 1` valores de una serie para calcular ventanas móviles de pandas (min_periods=longitud)."""
+
+    def __init__(self, longitud):
+        self.longitud = longitud
+        self.cola = np.full(longitud - 1, np.nan)
+
+    def ventanas(self, valores):
+        """Matriz (N, longitud) con la ventana que termina en cada valor nuevo y un indicador de ventana completa."""
+        serie = np.concatenate((self.cola, valores))
+        self.cola = serie[len(serie) - (self.longitud - 1):].copy()
+        ventanas = sliding_window_view(serie, self.longitud)
+        return ventanas, ~np.isnan(ventanas).any(axis=1)
+
+    def media(self, valores):
+        ventanas, completas = self.ventanas(valores)
+        return np.where(completas, ventanas.mean(axis=1), np.nan)
+
+
+class _EstadoIndicadores:
+    """Estado de todos los indicadores de la app; se copia entero para poder revisar la última vela."""
+
+    def __init__(self):
+        self.ema_20, self.ema_50 = _EMA(20), _EMA(50)
+        self.macd_rapida, self.macd_lenta, self.macd_senal = _EMA(12), _EMA(26), _EMA(9)
+        self.macd_iniciado = False
+        self.rsi_subidas, self.rsi_bajadas = _RMA(14), _RMA(14)
+        self.atr = _RMA(14)
+        self.cierre_anterior = np.nan
+        self.primera_vela = True
+        self.stoch_minimos, self.stoch_maximos = _Ventana(14), _Ventana(14)
+        self.stoch_k, self.stoch_d = _Ventana(3), _Ventana(3)
+        self.bb = _Ventana(20)
+        self.volumen_sma = _Ventana(20)
+        self.vwap_clave, self.vwap_precio_volumen, self.vwap_volumen = np.iinfo(np.int64).min, 0.0, 0.0
+
+    def procesar(self, velas):
+        close = velas['Close'].to_numpy(dtype=np.float64)
+        high = velas['High'].to_numpy(dtype=np.float64)
+        low = velas['Low'].to_numpy(dtype=np.float64)
+        volume = velas['Volume'].to_numpy(dtype=np.float64)
+        cierre_previo = np.concatenate(([self.cierre_anterior], close[:-1]))
+        self.cierre_anterior = close[-1]
+        columnas = {'EMA_20': self.ema_20.actualizar(close), 'EMA_50': self.ema_50.actualizar(close)}
+
+        # RSI: medias de Wilder de subidas y bajadas.
+        diferencia = close - cierre_previo
+        subidas = np.where(diferencia < 0, 0.0, diferencia)
+        bajadas = np.where(diferencia > 0, 0.0, diferencia)
+        media_subidas, media_bajadas = self.rsi_subidas.actualizar(subidas), self.rsi_bajadas.actualizar(bajadas)
+        columnas['RSI_14'] = 100 * media_subidas / (media_subidas + np.abs(media_bajadas))
+
+        # MACD: la línea de señal empieza en el primer valor válido del MACD.
+        macd = self.macd_rapida.actualizar(close) - self.macd_lenta.actualizar(close)
+        senal = np.full(len(macd), np.nan)
+        inicio = 0
+        if not self.macd_iniciado:
+            validos = np.flatnonzero(~np.isnan(macd))
+            inicio = validos[0] if len(validos) else len(macd)
+            self.macd_iniciado = len(validos) > 0
+        if self.macd_iniciado: senal[inicio:] = self.macd_senal.actualizar(macd[inicio:])
+        columnas.update({'MACD_12_26_9': macd, 'MACDh_12_26_9': macd - senal, 'MACDs_12_26_9': senal})
+
+        # Estocástico 14/3/3 con medias simples.
+        ventanas_low, completas_low = self.stoch_minimos.ventanas(low)
+        ventanas_high, completas_high = self.stoch_maximos.ventanas(high)
+        minimo = np.where(completas_low, ventanas_low.min(axis=1), np.nan)
+        maximo = np.where(completas_high, ventanas_high.max(axis=1), np.nan)
+        stoch = 100 * (close - minimo) / _no_cero(maximo - minimo)
+        stoch_k = self.stoch_k.media(stoch)
+        columnas.update({'STOCHk_14_3_3': stoch_k, 'STOCHd_14_3_3': self.stoch_d.media(stoch_k)})
+
+        # VWAP anclado al día natural de cada vela.
+        indice = velas.index
+        dias = (indice.tz_localize(None) if indice.tz is not None else indice).normalize().asi8
+        precio_tipico = (high + low + close) / 3.0
+        columnas['VWAP_D'], self.vwap_clave, self.vwap_precio_volumen, self.vwap_volumen = _kernel_vwap(
+            precio_tipico * volume, volume, dias, self.vwap_clave, self.vwap_precio_volumen, self.vwap_volumen)
+
+        # ATR de Wilder sobre el rango verdadero.
+        rangos = np.abs(np.vstack((_no_cero(high - low), high - cierre_previo, cierre_previo - low)))
+        rango_verdadero = np.fmax.reduce(rangos, axis=0)
+        if self.primera_vela: rango_verdadero[0] = np.nan
+        self.primera_vela = False
+        columnas['ATRr_14'] = self.atr.actualizar(rango_verdadero)
+
+        # Bandas de Bollinger (20, 2) y media de volumen, como en la app.
+        ventanas_bb, completas_bb = self.bb.ventanas(close)
+        bbm = np.where(completas_bb, ventanas_bb.mean(axis=1), np.nan)
+        desviacion = np.where(completas_bb, ventanas_bb.std(axis=1, ddof=1), np.nan)
+        columnas.update({'BBM': bbm, 'BBL': bbm - desviacion * 2, 'BBU': bbm + desviacion * 2, 'Volume_SMA': self.volumen_sma.media(volume)})
+        return pd.DataFrame(columnas, index=indice, columns=COLUMNAS_INDICADORES)
+
+
+class MotorIndicadores:
+    """Mantiene los indicadores de un histórico y los actualiza solo con las velas nuevas.
+
+    La última vela procesada puede seguir formándose, así que se guarda el estado previo a
+    ella: si vuelve a llegar con otros valores se deshace y se recalcula solo esa vela.
+    Con `max_filas` solo se conservan los indicadores de las últimas filas (el estado de los
+    indicadores no depende de las anteriores); úsalo con `actualizar`, no con `calcular`.
+    """
+
+    def __init__(self, max_filas=None):
+        self.max_filas = max_filas
+        self._cerrojo = threading.Lock()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._estado = _EstadoIndicadores()
+        self._estado_previo = None
+        self._bloques = []
+        self._filas = 0
+        self._indicadores = None
+
+    @property
+    def ultimo_indice(self):
+        return self._bloques[-1].index[-1] if self._bloques else None
+
+    def actualizar(self, velas):
+        """Procesa las velas posteriores a la última procesada (incluida esta, si se revisa) y devuelve sus indicadores."""
+        with self._cerrojo:
+            return self._actualizar(velas)
+
+    def _actualizar(self, velas):
+        ultimo = self.ultimo_indice
+        if ultimo is not None:
+            velas = velas[velas.index >= ultimo]
+            if len(velas) and velas.index[0] == ultimo:
+                self._estado = self._estado_previo
+                self._bloques[-1] = self._bloques[-1].iloc[:-1]
+                self._filas -= 1
+                if self._bloques[-1].empty: self._bloques.pop()
+        if velas.empty: return pd.DataFrame(columns=COLUMNAS_INDICADORES, dtype=np.float64)
+        nuevos = []
+        if len(velas) > 1: nuevos.append(self._estado.procesar(velas.iloc[:-1]))
+        self._estado_previo = copy.deepcopy(self._estado)
+        nuevos.append(self._estado.procesar(velas.iloc[-1:]))
+        self._bloques.extend(nuevos)
+        self._filas += len(velas)
+        if self.max_filas is not None and self._filas > 2 * self.max_filas:
+            self._bloques = [pd.concat(self._bloques).iloc[-self.max_filas:]]
+            self._filas = len(self._bloques[0])
+        self._indicadores = None
+        return pd.concat(nuevos) if len(nuevos) > 1 else nuevos[0]
+
+    def indicadores(self):
+        """Todos los indicadores calculados hasta ahora."""
+        if self._indicadores is None:
+            self._indicadores = pd.concat(self._bloques) if self._bloques else pd.DataFrame(columns=COLUMNAS_INDICADORES, dtype=np.float64)
+            self._bloques = [self._indicadores] if self._bloques else []
+        return self._indicadores
+
+    def calcular(self, df):
+        """Indicadores alineados con `df`, procesando solo lo que no se había visto.
+
+        Si `df` no continúa el histórico ya procesado (otro activo, huecos o datos reescritos) o
+        empieza en otra vela, se empieza de cero: los indicadores recursivos dependen de la
+        primera vela. Para que el cálculo sea incremental pasa siempre un histórico que empiece
+        en la misma vela (el completo del almacén) y recorta el resultado al período.
+        """
+        with self._cerrojo:
+            ultimo = self.ultimo_indice
+            if ultimo is not None and (ultimo not in df.index or df.index[0] != self._bloques[0].index[0]):
+                self._reiniciar()
+            self._actualizar(df)
+            return self.indicadores().reindex(df.index)
+
+
+def calcular_indicadores(df):
+    """Calcula de una vez todos los indicadores de la app para `df`."""
+    return MotorIndicadores().calcular(df)
@@ -0,0 +1,56 @@
+"""Disposición compacta en memoria del histórico de una sesión de la app.
+
+Las señales se calculan siempre sobre los indicadores en float64; después los indicadores
+que solo se dibujan o alimentan el RandomForest (que trabaja en float32) se guardan en
+float32. EMA_20 y ATRr_14 siguen en float64 porque la pendiente de la señal en vivo y los
+stops del backtest operan con ellos. Las señales de las estrategias y la tendencia se
+empaquetan en una máscara de bits de un byte por vela; solo quedan como columnas booleanas
+las que leen el backtest, el gráfico y la señal en vivo.
+"""
+import numpy as np
+
+from motor.indicadores import COLUMNAS_INDICADORES
+
+COLUMNAS_FLOAT64 = ['EMA_20', 'ATRr_14']
+COLUMNAS_FLOAT32 = [columna for columna in COLUMNAS_INDICADORES if columna not in COLUMNAS_FLOAT64]
+COLUMNA_MASCARA = 'senales'
+# Posición de cada señal en la máscara de bits.
+BITS_SENALES = ['tendencia_alcista', 'senal_momentum', 'senal_mean_reversion', 'senal_macd', 'senal_stoch', 'senal_vwap']
+COLUMNAS_BOOL = ['volumen_alto', 'senal_venta']
+
+
+def empaquetar_senales(senales):
+    """Máscara uint8 con un bit por señal de `BITS_SENALES`."""
+    mascara = np.zeros(len(senales[COLUMNAS_BOOL[0]]), dtype=np.uint8)
+    for bit, columna in enumerate(BITS_SENALES):
+        mascara |= np.asarray(senales[columna], dtype=np.uint8) << bit
+    return mascara
+
+
+def senal(df, columna):
+    """Array booleano de una señal, tanto si es una columna como si está en la máscara de bits."""
+    if columna in df.columns: return df[columna].fillna(False).to_numpy(dtype=bool)
+    if columna in BITS_SENALES and COLUMNA_MASCARA in df.columns:
+        return (df[COLUMNA_MASCARA].to_numpy() >> BITS_SENALES.index(columna)) & 1 == 1
+    raise KeyError(columna)
+
+
+def senales_guardadas(df):
+    """Las señales de `senales_arrays` leídas de un histórico compacto; None si `df` no lo es."""
+    if COLUMNA_MASCARA not in df.columns: return None
+    return {columna: senal(df, columna) for columna in COLUMNAS_BOOL + BITS_SENALES}
+
+
+def compactar(df, indicadores, senales):
+    """Añade a `df` los indicadores con el tipo de `COLUMNAS_FLOAT32`/`COLUMNAS_FLOAT64`, la máscara y las señales booleanas."""
+    for columna in COLUMNAS_INDICADORES:
+        df[columna] = indicadores[columna].to_numpy(dtype=np.float32 if columna in COLUMNAS_FLOAT32 else np.float64)
+    df[COLUMNA_MASCARA] = empaquetar_senales(senales)
+    for columna in COLUMNAS_BOOL:
+        df[columna] = senales[columna]
+    return df
+
+
+def huella_memoria(df):
+    """Bytes que ocupa `df` en memoria, índice y columnas de texto incluidos."""
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,176 @@
+"""Modelo RandomForest de la estrategia ML con registro persistente y reentrenamiento bajo demanda.
+
+Los modelos entrenados se guardan en disco por símbolo, intervalo, conjunto de variables,
+horizonte e hiperparámetros. Mientras los datos no cambian se devuelven las predicciones
+guardadas; cuando solo llegan velas nuevas se reutiliza el modelo y se predicen únicamente
+esas velas, y se reentrena cuando se acumulan suficientes velas nuevas (reentrenamiento
+programado), cuando la precisión fuera de muestra cae respecto a la del entrenamiento (deriva)
+o cuando cambian las filas con las que se entrenó (por ejemplo, precios reajustados por un split).
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+FEATURES_ML = ['EMA_20', 'EMA_50', 'RSI_14', 'ATRr_14', 'Volume_SMA', 'MACD_12_26_9', 'MACDh_12_26_9', 'STOCHk_14_3_3', 'VWAP_D']
+PARAMETROS_RF = {'n_estimators': 100, 'min_samples_leaf': 10, 'random_state': 42}
+PROPORCION_ENTRENAMIENTO = 0.8
+DIRECTORIO_POR_DEFECTO = os.environ.get('TRADING_MODELOS_DIR', '.modelos')
+
+
+def preparar_datos_ml(df, prediction_horizon, features=FEATURES_ML):
+    """Variables del modelo sin NaN y objetivo: ¿el cierre dentro de `prediction_horizon` velas es mayor?"""
+    df_ml = df[features].copy()
+    df_ml.dropna(inplace=True)
+    df_ml['target'] = df['Close'].shift(-prediction_horizon) > df['Close']
+    df_ml.dropna(inplace=True)
+    return df_ml
+
+
+def huella_datos(df):
+    """Hash del contenido (índice incluido) de un DataFrame."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def _huellas_entrenamiento(X, y, fin_entrenamiento):
+    """Hash de cada fila (variables, objetivo e índice) hasta `fin_entrenamiento`."""
+    filas = X.index <= fin_entrenamiento
+    return pd.util.hash_pandas_object(pd.concat([X[filas], y[filas]], axis=1), index=True)
+
+
+def entrenar_random_forest(X_train, y_train, n_jobs=-1, parametros=PARAMETROS_RF):
+    """Ajusta el RandomForest de la app construyendo los árboles en paralelo."""
+    from sklearn.ensemble import RandomForestClassifier
+    model = RandomForestClassifier(**parametros, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    return model
+
+
+def precision(probabilidades, y):
+    """Igual que `model.score`: se predice subida cuando la probabilidad supera 0.5."""
+    if len(y) == 0: return float('nan')
+    return float(np.mean((np.asarray(probabilidades) > 0.5) == np.asarray(y, dtype=bool)))
+
+
+class RegistroModelos:
+    """Modelos entrenados en disco más las últimas predicciones de cada uno en memoria."""
+
+    def __init__(self, directorio=DIRECTORIO_POR_DEFECTO, reentrenar_cada=500, umbral_deriva=0.05, min_filas_deriva=50, max_en_memoria=16, n_jobs=-1):
+        self.directorio = directorio
+        self.reentrenar_cada = reentrenar_cada
+        self.umbral_deriva = umbral_deriva
+        self.min_filas_deriva = min_filas_deriva
+        self.max_en_memoria = max_en_memoria
+        self.n_jobs = n_jobs
+        self._memoria = OrderedDict()
+        self._cerrojo = threading.Lock()
+
+    @staticmethod
+    def clave(simbolo, intervalo, features, prediction_horizon, parametros=PARAMETROS_RF):
+        descripcion = f"{simbolo}|{intervalo}|{','.join(features)}|{prediction_horizon}|{sorted(parametros.items())}"
+        return hashlib.sha1(descripcion.encode()).hexdigest()[:20]
+
+    def ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.joblib")
+
+    def _leer(self, clave):
+        if clave in self._memoria:
+            self._memoria.move_to_end(clave)
+            return self._memoria[clave]
+        ruta = self.ruta(clave)
+        if not os.path.exists(ruta): return None
+        import joblib
+        try:
+            entrada = joblib.load(ruta)
+        except Exception:
+            return None
+        entrada.update({'hash_prediccion': None, 'probabilidades': None})
+        self._recordar(clave, entrada)
+        return entrada
+
+    def _recordar(self, clave, entrada):
+        self._memoria[clave] = entrada
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_en_memoria: self._memoria.popitem(last=False)
+
+    def _guardar(self, clave, entrada):
+        import joblib
+        os.makedirs(self.directorio, exist_ok=True)
+        persistente = {k: v for k, v in entrada.items() if k not in ('hash_prediccion', 'probabilidades')}
+        temporal = f"{self.ruta(clave)}.{os.getpid()}.tmp"
+        joblib.dump(persistente, temporal)
+        os.replace(temporal, self.ruta(clave))
+
+    @staticmethod
+    def _datos_entrenamiento_cambiados(entrada, X, y):
+        """Indica si alguna fila de entrenamiento que sigue en `X` es distinta de la usada al entrenar.
+
+        Se comparan fila a fila porque la ventana del período avanza y las primeras filas de
+        entrenamiento dejan de estar en el histórico sin que el modelo deje de valer.
+        """
+        guardadas = entrada.get('huellas_entrenamiento')
+        if guardadas is None: return False
+        actuales = _huellas_entrenamiento(X, y, entrada['fin_entrenamiento'])
+        if not actuales.index.isin(guardadas.index).all(): return True
+        return not np.array_equal(guardadas.loc[actuales.index].to_numpy(), actuales.to_numpy())
+
+    def _motivo_reentrenamiento(self, entrada, X, y, probabilidades, prediction_horizon):
+        if entrada is None: return "sin modelo previo"
+        if entrada['fin_entrenamiento'] not in X.index: return "el histórico ya no contiene los datos de entrenamiento"
+        if self._datos_entrenamiento_cambiados(entrada, X, y): return "los datos de entrenamiento han cambiado"
+        # El período se recorta a una ventana de longitud fija: se cuentan las velas posteriores a la última vista al entrenar.
+        nuevas = int((X.index > entrada.get('ultima_vela', entrada['fin_entrenamiento'])).sum())
+        if nuevas >= self.reentrenar_cada: return f"{nuevas} velas nuevas desde el último entrenamiento"
+        # Las últimas `prediction_horizon` filas todavía no tienen etiqueta: no cuentan para la precisión.
+        fuera_de_muestra = (X.index > entrada['fin_entrenamiento']) & (np.arange(len(X)) < len(X) - prediction_horizon)
+        if fuera_de_muestra.sum() >= self.min_filas_deriva:
+            precision_actual = precision(probabilidades[fuera_de_muestra], y[fuera_de_muestra])
+            if precision_actual < entrada['precision_referencia'] - self.umbral_deriva:
+                return f"deriva: precisión fuera de muestra {precision_actual:.2f} frente a {entrada['precision_referencia']:.2f}"
+        return None
+
+    def _predecir_nuevas(self, entrada, X):
+        """Probabilidades reutilizando las ya calculadas con el mismo modelo; la última vela se recalcula por si cambió."""
+        anteriores = entrada['probabilidades']
+        if anteriores is None:
+            return pd.Series(entrada['modelo'].predict_proba(X)[:, 1], index=X.index)
+        conservadas = anteriores.iloc[:-1]
+        conservadas = conservadas[conservadas.index.isin(X.index)]
+        nuevas = X.loc[~X.index.isin(conservadas.index)]
+        if nuevas.empty: return conservadas.reindex(X.index)
+        return pd.concat([conservadas, pd.Series(entrada['modelo'].predict_proba(nuevas)[:, 1], index=nuevas.index)]).reindex(X.index)
+
+    def predecir(self, simbolo, intervalo, df_ml, prediction_horizon, features=FEATURES_ML):
+        """Probabilidad de subida para cada fila de `df_ml`, entrenando solo cuando hace falta.
+
+        Devuelve un diccionario con 'probabilidades' (Series alineada con df_ml), 'precision'
+        en el 20% final, 'reentrenado' y 'motivo'.
+        """
+        clave = self.clave(simbolo, intervalo, features, prediction_horizon)
+        hash_datos = huella_datos(df_ml[features + ['target']])
+        X, y = df_ml[features], df_ml['target']
+        split_index = int(len(X) * PROPORCION_ENTRENAMIENTO)
+        with self._cerrojo:
+            entrada = self._leer(clave)
+            if entrada is not None and entrada['hash_prediccion'] == hash_datos:
+                return {'probabilidades': entrada['probabilidades'], 'precision': entrada['precision'], 'reentrenado': False, 'motivo': "caché"}
+
+            probabilidades = None
+            if entrada is not None and entrada['fin_entrenamiento'] in X.index:
+                probabilidades = self._predecir_nuevas(entrada, X)
+            motivo = self._motivo_reentrenamiento(entrada, X, y, probabilidades, prediction_horizon)
+            if motivo is not None:
+                model = entrenar_random_forest(X[:split_index], y[:split_index], n_jobs=self.n_jobs)
+                probabilidades = pd.Series(model.predict_proba(X)[:, 1], index=X.index)
+                etiquetadas = max(len(X) - prediction_horizon, split_index)
+                entrada = {'modelo': model, 'fin_entrenamiento': X.index[split_index - 1], 'ultima_vela': X.index[-1],
+                           'precision_referencia': precision(probabilidades[split_index:etiquetadas], y[split_index:etiquetadas]),
+                           'huellas_entrenamiento': _huellas_entrenamiento(X, y, X.index[split_index - 1])}
+                self._guardar(clave, entrada)
+            entrada.update({'hash_prediccion': hash_datos, 'probabilidades': probabilidades,
+                            'precision': precision(probabilidades[split_index:], y[split_index:])})
+            self._recordar(clave, entrada)
+            return {'probabilidades': probabilidades, 'precision': entrada['precision'], 'reentrenado': motivo is not None, 'motivo': motivo or "modelo reutilizado"}
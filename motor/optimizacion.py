@@ -0,0 +1,105 @@
+"""Optimización por rejilla de los parámetros del backtester tradicional en un pool de procesos.
+
+El marco de indicadores se copia una sola vez a memoria compartida y los procesos trabajadores
+lo leen desde ahí, en lugar de recibir una copia serializada con cada trabajo.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from motor.backtest import metricas_operaciones, rentabilidades_tradicional
+from motor.estrategias import ESTRATEGIA_ML, columna_estrategia
+from motor.memoria import senal
+
+PARAMETROS = ['estrategia', 'stop_loss_pct', 'take_profit_pct', 'use_trailing_stop', 'trailing_stop_pct', 'ml_threshold']
+_COLUMNAS_BASE = ['Close', 'High', 'Low', 'ATRr_14']
+_COLUMNA_PROBABILIDAD = 'probabilidad_subida'
+
+# Estado de cada proceso trabajador, fijado una vez por _inicializar_trabajador.
+_memoria = None
+_matriz = None
+_posiciones = None
+
+
+def generar_rejilla(estrategias, stop_loss_pct, take_profit_pct, trailing_stop_pct, ml_threshold=(0.6,), use_trailing_stop=(True,)):
+    """Combinaciones de parámetros sin duplicados que darían el mismo backtest.
+
+    El umbral de ML solo se varía para la estrategia ML y el porcentaje de trailing stop
+    solo cuando el trailing stop está activado.
+    """
+    rejilla = []
+    for estrategia in estrategias:
+        umbrales = list(ml_threshold) if estrategia == ESTRATEGIA_ML else list(ml_threshold)[:1]
+        for usar_trailing in use_trailing_stop:
+            trailing = list(trailing_stop_pct) if usar_trailing else list(trailing_stop_pct)[:1]
+            for sl, tp, ts, umbral in itertools.product(stop_loss_pct, take_profit_pct, trailing, umbrales):
+                rejilla.append((estrategia, sl, tp, usar_trailing, ts, umbral))
+    return rejilla
+
+
+def _columnas_necesarias(estrategias):
+    columnas = list(_COLUMNAS_BASE)
+    for estrategia in dict.fromkeys(estrategias):
+        columnas.append(_COLUMNA_PROBABILIDAD if estrategia == ESTRATEGIA_ML else columna_estrategia(estrategia))
+    return columnas
+
+
+def _matriz_columnas(df, columnas):
+    """Una fila por columna, en float64 contiguo; las señales se guardan como 0/1."""
+    matriz = np.empty((len(columnas), len(df)), dtype=np.float64)
+    for fila, columna in enumerate(columnas):
+        if columna in _COLUMNAS_BASE or columna == _COLUMNA_PROBABILIDAD: matriz[fila] = df[columna].to_numpy(dtype=np.float64)
+        else: matriz[fila] = senal(df, columna)
+    return matriz
+
+
+def _inicializar_trabajador(nombre, forma, columnas):
+    global _memoria, _matriz, _posiciones
+    _memoria = shared_memory.SharedMemory(name=nombre)
+    _matriz = np.ndarray(forma, dtype=np.float64, buffer=_memoria.buf)
+    _posiciones = {columna: fila for fila, columna in enumerate(columnas)}
+
+
+def _senal_compra(estrategia, umbral):
+    if estrategia == ESTRATEGIA_ML:
+        # Igual que senal_ml en la app: sin probabilidad (NaN) no hay señal.
+        return _matriz[_posiciones[_COLUMNA_PROBABILIDAD]] > umbral
+    return _matriz[_posiciones[columna_estrategia(estrategia)]] == 1.0
+
+
+def _evaluar_lote(lote):
+    close, high, low, atr = (_matriz[_posiciones[columna]] for columna in _COLUMNAS_BASE)
+    senales = {}
+    resultados = []
+    for estrategia, sl, tp, usar_trailing, ts, umbral in lote:
+        clave = (estrategia, umbral if estrategia == ESTRATEGIA_ML else None)
+        if clave not in senales: senales[clave] = _senal_compra(estrategia, umbral)
+        rentabilidades = rentabilidades_tradicional(close, high, low, atr, senales[clave], sl, tp, usar_trailing, ts)
+        resultados.append(metricas_operaciones(rentabilidades))
+    return resultados
+
+
+def optimizar(df, estrategias, stop_loss_pct, take_profit_pct, trailing_stop_pct, ml_threshold=(0.6,), use_trailing_stop=(True,), max_workers=None, lotes_por_trabajador=4):
+    """Evalúa la rejilla completa en paralelo y devuelve una tabla ordenada por rentabilidad total."""
+    rejilla = generar_rejilla(estrategias, stop_loss_pct, take_profit_pct, trailing_stop_pct, ml_threshold, use_trailing_stop)
+    columnas = _columnas_necesarias(estrategias)
+    matriz = _matriz_columnas(df, columnas)
+    max_workers = max_workers or os.cpu_count() or 1
+    tamano_lote = max(1, -(-len(rejilla) // (max_workers * lotes_por_trabajador)))
+    lotes = [rejilla[i:i + tamano_lote] for i in range(0, len(rejilla), tamano_lote)]
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(matriz.nbytes, 1))
+    try:
+        np.ndarray(matriz.shape, dtype=np.float64, buffer=memoria.buf)[:] = matriz
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_trabajador, initargs=(memoria.name, matriz.shape, columnas)) as pool:
+            metricas = [resultado for lote in pool.map(_evaluar_lote, lotes) for resultado in lote]
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    tabla = pd.concat([pd.DataFrame(rejilla, columns=PARAMETROS), pd.DataFrame(metricas, columns=['total_operaciones', 'rentabilidad_total', 'porcentaje_aciertos', 'factor_beneficio'])], axis=1)
+    return tabla.sort_values(['rentabilidad_total', 'factor_beneficio'], ascending=False, ignore_index=True)
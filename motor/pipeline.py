@@ -0,0 +1,159 @@
+"""Pipeline completo sin interfaz: datos → indicadores → señales → backtest → señal en vivo.
+
+Reproduce paso a paso lo que hace app.py para poder usarlo desde otros programas, en lotes
+o desde la línea de comandos (`python -m motor`). scikit-learn solo se importa al entrenar
+el modelo de la estrategia ML, y plotly no se usa.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from motor.almacen import AlmacenOHLCV, recortar_periodo
+from motor.backtest import backtest_binario, backtest_tradicional
+from motor.estrategias import ESTRATEGIA_ML, columna_estrategia
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.memoria import compactar
+from motor.modelo import RegistroModelos, preparar_datos_ml
+from motor.senales import analizar_senal_en_vivo, calcular_senales, niveles_relevantes, senales_arrays
+from motor.soportes_resistencias import calculate_support_resistance
+
+PREDICTION_HORIZON_TRADICIONAL = 5
+
+
+def minutos_intervalo(intervalo):
+    """Duración de una vela en minutos ('5m' → 5, '1h' → 60, '1d' → 1440)."""
+    return int(intervalo.replace('m', '').replace('h', '60').replace('d', '1440'))
+
+
+def pasos_expiracion(intervalo, expiracion_minutos):
+    """Velas hasta la expiración de una opción binaria."""
+    return expiracion_minutos // minutos_intervalo(intervalo)
+
+
+def horizonte_prediccion(intervalo, modo_binarias=False, expiracion_minutos=5):
+    """Velas a futuro que predice el modelo: la expiración en binarias, 5 velas en el modo tradicional."""
+    if modo_binarias: return pasos_expiracion(intervalo, expiracion_minutos)
+    return PREDICTION_HORIZON_TRADICIONAL
+
+
+def aplicar_indicadores(datos, motor_indicadores=None, compacto=False, historico=None):
+    """Añade a `datos` los indicadores técnicos y las señales de las estrategias.
+
+    `historico` es el histórico completo del almacén del que `datos` es el tramo final: los
+    indicadores se calculan sobre él y se recortan a `datos`. Su primera vela no cambia al
+    llegar velas nuevas, así que `motor_indicadores` solo procesa las nuevas aunque el inicio
+    del período avance.
+
+    Con `compacto` se usa la disposición de `motor.memoria`: las señales se calculan con los
+    indicadores en float64 y se guardan en una máscara de bits (léelas con `memoria.senal`).
+    """
+    base = datos if historico is None else historico
+    indicadores = calcular_indicadores(base) if motor_indicadores is None else motor_indicadores.calcular(base)
+    if historico is not None: indicadores = indicadores.reindex(datos.index)
+    if not compacto:
+        datos[COLUMNAS_INDICADORES] = indicadores
+        return calcular_senales(datos)
+    columnas = {columna: datos[columna].to_numpy() for columna in ['Close', 'Volume']}
+    columnas.update({columna: indicadores[columna].to_numpy() for columna in COLUMNAS_INDICADORES})
+    return compactar(datos, indicadores, senales_arrays(columnas))
+
+
+def unir_prediccion_ml(datos, df_ml, probabilidades, ml_threshold):
+    """Añade `probabilidad_subida` y `senal_ml` a `datos` a partir de las probabilidades del modelo.
+
+    Las filas de `df_ml` son un subconjunto de las de `datos`; las demás quedan sin probabilidad
+    (NaN) y sin señal. Se escribe sobre `datos` sin unir ni copiar el DataFrame.
+    """
+    probabilidad = np.full(len(datos), np.nan)
+    probabilidad[datos.index.get_indexer(df_ml.index)] = pd.Series(probabilidades, index=df_ml.index).to_numpy(dtype=np.float64)
+    datos['probabilidad_subida'] = probabilidad
+    datos['senal_ml'] = probabilidad > ml_threshold
+    return datos
+
+
+def aplicar_modelo_ml(datos, simbolo, intervalo, prediction_horizon, ml_threshold=0.6, registro=None):
+    """Entrena (o reutiliza del registro) el RandomForest y añade su señal a `datos`.
+
+    Devuelve (datos, resultado); `resultado` es None si el objetivo solo tiene una clase.
+    """
+    df_ml = preparar_datos_ml(datos, prediction_horizon)
+    if df_ml['target'].nunique() < 2: return datos, None
+    registro = RegistroModelos() if registro is None else registro
+    resultado = registro.predecir(simbolo, intervalo, df_ml, prediction_horizon)
+    return unir_prediccion_ml(datos, df_ml, resultado['probabilidades'], ml_threshold), resultado
+
+
+def resumen_operaciones(operaciones, modo_binarias=False, inversion=100):
+    """Métricas del panel de resultados del backtester; None si no hubo operaciones."""
+    if not operaciones: return None
+    df_operaciones = pd.DataFrame(operaciones)
+    rentabilidades = df_operaciones['rentabilidad']
+    total_ops, ops_ganadoras = len(df_operaciones), int((rentabilidades > 0).sum())
+    resumen = {'total_operaciones': total_ops, 'operaciones_ganadoras': ops_ganadoras, 'porcentaje_aciertos': (ops_ganadoras / total_ops) * 100}
+    if modo_binarias:
+        beneficio_total, inversion_total = df_operaciones['beneficio'].sum(), total_ops * inversion
+        resumen.update({'beneficio_total': float(beneficio_total), 'roi_total': (beneficio_total / inversion_total) * 100 if inversion_total > 0 else 0})
+    else:
+        perdidas = rentabilidades[rentabilidades < 0]
+        resumen.update({'rentabilidad_total': float(rentabilidades.sum()), 'rentabilidad_media': float(rentabilidades.mean()),
+                        'max_ganancia': float(rentabilidades.max()), 'max_perdida': float(rentabilidades.min()),
+                        'factor_beneficio': float(abs(rentabilidades[rentabilidades > 0].sum() / perdidas.sum())) if not perdidas.empty else 0})
+    return resumen
+
+
+def senal_en_vivo(datos, sr_window=5, sr_threshold=0.5):
+    """Soportes/resistencias cercanos al precio actual y recomendación sobre la última vela."""
+    support_levels, resistance_levels = calculate_support_resistance(datos, window=sr_window, threshold_pct=sr_threshold)
+    current_price = datos['Close'].iloc[-1]
+    relevant_support, relevant_resistance = niveles_relevantes(support_levels, resistance_levels, current_price)
+    return {'precio_actual': float(current_price), 'soportes': relevant_support, 'resistencias': relevant_resistance,
+            'senal': analizar_senal_en_vivo(datos, relevant_support, relevant_resistance)}
+
+
+def analizar(datos, simbolo='', intervalo='1d', estrategia='Momentum', modo_binarias=False, stop_loss_pct=0.05, take_profit_pct=0.10,
+             use_trailing_stop=True, trailing_stop_pct=0.03, expiracion_minutos=5, payout=0.85, inversion=100, ml_threshold=0.6,
+             sr_window=5, sr_threshold=0.5, registro=None, motor_indicadores=None, historico=None):
+    """Ejecuta el pipeline de la app sobre un histórico OHLCV ya cargado.
+
+    `historico` es, como en `aplicar_indicadores`, el histórico completo del que `datos` es el final.
+    Devuelve un diccionario con los datos enriquecidos, las operaciones, su resumen, la
+    señal en vivo, el resultado del modelo ML (si aplica) y el tiempo de cada etapa.
+    """
+    tiempos = {}
+    inicio = time.perf_counter()
+    datos = aplicar_indicadores(datos, motor_indicadores, historico=historico)
+    tiempos['indicadores'] = time.perf_counter() - inicio
+
+    datos['senal_ml'] = False
+    resultado_ml = None
+    if estrategia == ESTRATEGIA_ML:
+        inicio = time.perf_counter()
+        prediction_horizon = horizonte_prediccion(intervalo, modo_binarias, expiracion_minutos)
+        if prediction_horizon < 1: raise ValueError("La expiración es menor que una vela del timeframe.")
+        datos, resultado_ml = aplicar_modelo_ml(datos, simbolo, intervalo, prediction_horizon, ml_threshold, registro)
+        tiempos['modelo_ml'] = time.perf_counter() - inicio
+    datos['senal_compra'] = datos[columna_estrategia(estrategia)]
+
+    inicio = time.perf_counter()
+    if modo_binarias: operaciones = backtest_binario(datos, pasos_expiracion(intervalo, expiracion_minutos), payout, inversion)
+    else: operaciones = backtest_tradicional(datos, stop_loss_pct, take_profit_pct, use_trailing_stop, trailing_stop_pct)
+    tiempos['backtest'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    en_vivo = senal_en_vivo(datos, sr_window, sr_threshold)
+    tiempos['senal_en_vivo'] = time.perf_counter() - inicio
+    return {'datos': datos, 'operaciones': operaciones, 'resumen': resumen_operaciones(operaciones, modo_binarias, inversion),
+            'en_vivo': en_vivo, 'ml': resultado_ml, 'tiempos': tiempos}
+
+
+def analizar_activo(activo, periodo='1y', intervalo='1d', almacen=None, **parametros):
+    """Carga `activo` desde el almacén OHLCV y ejecuta `analizar`; None si no hay datos."""
+    inicio = time.perf_counter()
+    historico, simbolo = (AlmacenOHLCV() if almacen is None else almacen).cargar(activo, periodo, intervalo, completo=True)
+    if historico is None: return None
+    carga = time.perf_counter() - inicio
+    resultado = analizar(recortar_periodo(historico, periodo), simbolo=simbolo, intervalo=intervalo, historico=historico, **parametros)
+    resultado['simbolo'] = simbolo
+    resultado['tiempos'] = {'carga': carga, **resultado['tiempos']}
+    return resultado
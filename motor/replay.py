@@ -0,0 +1,126 @@
+"""Simulador de la señal en vivo sobre el histórico (replay / paper trading) a velocidad acelerada.
+
+Reproduce vela a vela lo que habría recomendado el servicio en vivo (`motor.servicio`): en
+cada vela solo se usa lo conocido hasta ella. Los indicadores, las señales y los fractales
+son causales, así que se calculan de una pasada y valen en cada vela lo mismo que en el
+cálculo incremental; los soportes/resistencias se agrupan a medida que se confirman los
+fractales y la recomendación se gradúa con `graduar_senal`, como en `analizar_senal_en_vivo`.
+Solo se evalúan las velas con señal base: en el resto la recomendación es siempre ESPERAR.
+
+El resultado de cada recomendación es el movimiento del cierre `velas_resultado` velas
+después, en la dirección recomendada.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from motor.estrategias import ESTRATEGIA_ML, columna_estrategia
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.memoria import senales_guardadas
+from motor.senales import PRICE_FILTER_PCT, calculate_ema_slope, check_proximity_to_sr, graduar_senal, niveles_relevantes, senales_arrays
+from motor.soportes_resistencias import _Agrupador, fractales
+
+COLUMNAS_REPLAY = ['accion', 'fuerza', 'razon', 'precio', 'pendiente_ema', 'cerca_soporte', 'cerca_resistencia', 'volumen_alto',
+                   'fecha_resultado', 'precio_resultado', 'rentabilidad', 'acierto']
+PERIODO_PENDIENTE = 5
+# La pendiente vectorizada difiere de np.polyfit en el redondeo; cerca de los umbrales de
+# `graduar_senal` (0.5, 0.1 y 0) se recalcula con `calculate_ema_slope`.
+_TOLERANCIA_PENDIENTE = 1e-9
+
+
+def pendientes_ema(ema, period=PERIODO_PENDIENTE):
+    """`calculate_ema_slope` en cada vela con las `period` EMA anteriores; 0 en las primeras `period` velas."""
+    ema = np.asarray(ema, dtype=np.float64)
+    pendientes = np.zeros(len(ema))
+    if len(ema) < period + 1: return pendientes
+    ventanas = sliding_window_view(ema, period)
+    x = np.arange(period) - (period - 1) / 2
+    normalizadas = ventanas @ x / (x @ x) / ventanas.mean(axis=1) * 1000
+    pendientes[period:] = normalizadas[1:]
+    return pendientes
+
+
+def _pendiente_exacta(ema, i, pendiente):
+    distancia = min(abs(abs(pendiente) - 0.5), abs(abs(pendiente) - 0.1), abs(pendiente))
+    if i < PERIODO_PENDIENTE or not distancia < _TOLERANCIA_PENDIENTE: return pendiente
+    return calculate_ema_slope(pd.DataFrame({'EMA_20': ema[i - PERIODO_PENDIENTE:i + 1]}))
+
+
+def _cerca(medias, precio):
+    # Las medias de los grupos están ordenadas: solo se revisan las que pueden estar a menos del 0.5%.
+    inicio, fin = bisect.bisect_left(medias, precio * 0.98), bisect.bisect_right(medias, precio * 1.02)
+    relevantes, _ = niveles_relevantes(medias[inicio:fin], [], precio, PRICE_FILTER_PCT)
+    return check_proximity_to_sr(precio, relevantes)
+
+
+def replay(datos, estrategia='Momentum', sr_window=5, sr_threshold=0.5, velas_resultado=5):
+    """Recomendaciones de la señal en vivo vela a vela sobre `datos` y su resultado.
+
+    Si `datos` ya tiene los indicadores se reutilizan, y las señales si es un histórico compacto
+    (`aplicar_indicadores(..., compacto=True)`). Devuelve un DataFrame con una fila por
+    vela con recomendación de compra o venta (índice: la vela de la señal); la rentabilidad y
+    el acierto quedan vacíos si no hay `velas_resultado` velas posteriores.
+    """
+    if estrategia == ESTRATEGIA_ML: raise ValueError("El replay no admite la estrategia de Machine Learning.")
+    columnas = {columna: datos[columna].to_numpy() for columna in ['Close', 'High', 'Low', 'Volume']}
+    senales = senales_guardadas(datos)
+    if senales is None:
+        indicadores = datos if set(COLUMNAS_INDICADORES) <= set(datos.columns) else calcular_indicadores(datos)
+        columnas.update({columna: indicadores[columna].to_numpy() for columna in COLUMNAS_INDICADORES})
+        senales = senales_arrays(columnas)
+    else: columnas['EMA_20'] = datos['EMA_20'].to_numpy()
+    compra, venta = senales[columna_estrategia(estrategia)], senales['senal_venta']
+    close, ema = columnas['Close'].astype(np.float64), columnas['EMA_20'].astype(np.float64)
+    n = len(close)
+
+    # Un fractal con centro c se conoce a partir de la vela c + window // 2.
+    mitad = sr_window // 2
+    confirmaciones = []
+    for valores, es_maximo in [(columnas['High'], True), (columnas['Low'], False)]:
+        valores = np.asarray(valores, dtype=np.float64)
+        centros = fractales(valores, sr_window, es_maximo)
+        confirmaciones.append(((centros + mitad).tolist(), valores[centros].tolist(), _Agrupador(sr_threshold)))
+    insertados = [0] * len(confirmaciones)
+
+    indices = np.flatnonzero(compra | venta)
+    pendientes = pendientes_ema(ema)[indices].tolist()
+    filas = []
+    for i, pendiente in zip(indices.tolist(), pendientes):
+        for k, (vela_confirmacion, niveles, agrupador) in enumerate(confirmaciones):
+            hasta = bisect.bisect_right(vela_confirmacion, i, lo=insertados[k])
+            agrupador.insertar_varios(niveles[insertados[k]:hasta])
+            insertados[k] = hasta
+        resistencias, soportes = confirmaciones[0][2].medias, confirmaciones[1][2].medias
+        precio, volumen_alto = float(close[i]), bool(senales['volumen_alto'][i])
+        cerca_soporte, cerca_resistencia = _cerca(soportes, precio), _cerca(resistencias, precio)
+        pendiente = _pendiente_exacta(ema, i, pendiente)
+        recomendacion = graduar_senal(bool(compra[i]), bool(venta[i]), pendiente, cerca_soporte, cerca_resistencia, volumen_alto)
+        filas.append((recomendacion['action'], recomendacion['strength'], recomendacion['reason'], precio, pendiente, cerca_soporte, cerca_resistencia, volumen_alto))
+
+    recomendaciones = pd.DataFrame(filas, index=datos.index[indices], columns=COLUMNAS_REPLAY[:8])
+    resueltas = indices + velas_resultado < n
+    posiciones_resultado = np.where(resueltas, indices + velas_resultado, n - 1)
+    direccion = np.where(compra[indices], 1.0, -1.0)
+    precio_resultado = np.where(resueltas, close[posiciones_resultado], np.nan)
+    rentabilidad = (precio_resultado - close[indices]) / close[indices] * direccion
+    recomendaciones['fecha_resultado'] = pd.Series(datos.index[posiciones_resultado], index=recomendaciones.index).where(resueltas)
+    recomendaciones['precio_resultado'] = precio_resultado
+    recomendaciones['rentabilidad'] = rentabilidad
+    acierto = pd.array(rentabilidad > 0, dtype='boolean')
+    acierto[~resueltas] = pd.NA
+    recomendaciones['acierto'] = acierto
+    recomendaciones.index.name = datos.index.name
+    return recomendaciones
+
+
+def resumen_replay(recomendaciones):
+    """Aciertos y rentabilidad de las recomendaciones resueltas por acción y fuerza."""
+    resueltas = recomendaciones.dropna(subset=['rentabilidad'])
+    resumen = resueltas.groupby(['accion', 'fuerza'], sort=False).agg(
+        recomendaciones=('rentabilidad', 'size'), porcentaje_aciertos=('acierto', 'mean'),
+        rentabilidad_media=('rentabilidad', 'mean'), rentabilidad_total=('rentabilidad', 'sum'))
+    resumen['porcentaje_aciertos'] = resumen['porcentaje_aciertos'].astype(np.float64) * 100
+    orden = {'FUERTE': 0, 'MODERADA': 1, 'DÉBIL': 2}
+    return resumen.sort_index(key=lambda nivel: nivel.map(orden) if nivel.name == 'fuerza' else nivel)
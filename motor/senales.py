@@ -0,0 +1,127 @@
+"""Señales de las estrategias y análisis de la señal en vivo sobre la última vela."""
+import numpy as np
+
+PRICE_FILTER_PCT = 0.10
+
+
+def _desplazar(valores):
+    """`Series.shift(1)` sobre un array: NaN en la primera posición."""
+    desplazado = np.empty(len(valores))
+    desplazado[:1] = np.nan
+    desplazado[1:] = valores[:-1]
+    return desplazado
+
+
+def senales_arrays(columnas):
+    """Las señales de `calcular_senales` como arrays booleanos a partir de las columnas OHLCV e indicadores.
+
+    `columnas` es cualquier mapeo columna → valores (un DataFrame o un dict de arrays). Las
+    comparaciones con NaN dan False igual que en pandas; sin construir Series el coste no
+    depende de pandas, lo que importa en la señal en vivo, donde se calcula sobre pocas filas.
+    """
+    valores = {columna: np.asarray(columnas[columna], dtype=np.float64) for columna in
+               ['Close', 'Volume', 'Volume_SMA', 'EMA_20', 'EMA_50', 'RSI_14', 'BBL', 'MACD_12_26_9', 'MACDs_12_26_9', 'STOCHk_14_3_3', 'STOCHd_14_3_3', 'VWAP_D']}
+    close, ema_20, rsi, macd, macds, vwap = (valores[columna] for columna in ['Close', 'EMA_20', 'RSI_14', 'MACD_12_26_9', 'MACDs_12_26_9', 'VWAP_D'])
+    close_anterior = _desplazar(close)
+    senales = {'volumen_alto': valores['Volume'] > valores['Volume_SMA'] * 1.2}
+    senales['tendencia_alcista'] = (close > ema_20) & (close > valores['EMA_50'])
+    senales['senal_momentum'] = (close > ema_20) & (close_anterior <= ema_20) & senales['tendencia_alcista'] & (rsi < 70) & senales['volumen_alto']
+    senales['senal_mean_reversion'] = (close < valores['BBL']) & (rsi < 30) & senales['volumen_alto']
+    senales['senal_macd'] = (macd > macds) & (_desplazar(macd) <= _desplazar(macds)) & (macd < 0)
+    senales['senal_stoch'] = (valores['STOCHk_14_3_3'] < 20) & (valores['STOCHk_14_3_3'] > valores['STOCHd_14_3_3'])
+    senales['senal_vwap'] = (close < vwap) & (close_anterior >= _desplazar(vwap)) & senales['volumen_alto']
+    senales['senal_venta'] = (close < ema_20) & (close_anterior >= _desplazar(ema_20)) & (rsi > 30)
+    return senales
+
+
+def calcular_senales(df):
+    """Añade a `df` el volumen alto, la tendencia y la señal de cada estrategia salvo la de ML."""
+    for columna, valores in senales_arrays(df).items():
+        df[columna] = valores
+    return df
+
+
+def niveles_relevantes(support_levels, resistance_levels, current_price, price_filter_pct=PRICE_FILTER_PCT):
+    """Filtra los soportes y resistencias a menos de `price_filter_pct` del precio actual."""
+    relevant_support = [level for level in support_levels if abs(level - current_price) / current_price < price_filter_pct]
+    relevant_resistance = [level for level in resistance_levels if abs(level - current_price) / current_price < price_filter_pct]
+    return relevant_support, relevant_resistance
+
+
+def calculate_ema_slope(df, ema_col='EMA_20', period=5):
+    """Calcula la pendiente de una EMA para determinar la fuerza de la tendencia."""
+    if len(df) < period + 1:
+        return 0
+    recent_values = df[ema_col].tail(period)
+    slope = np.polyfit(range(len(recent_values)), recent_values, 1)[0]
+    # Normalizar la pendiente para que sea más interpretable
+    normalized_slope = (slope / recent_values.mean()) * 1000
+    return normalized_slope
+
+
+def check_proximity_to_sr(price, levels, threshold_pct=0.5):
+    """Verifica si el precio está cerca de un nivel de soporte o resistencia."""
+    for level in levels:
+        if abs(price - level) / price * 100 < threshold_pct:
+            return True
+    return False
+
+
+def analizar_senal_en_vivo(df, support_levels, resistance_levels):
+    """Analiza la última vela para generar una recomendación de trading en vivo."""
+    if df.empty:
+        return {"action": "ESPERAR", "strength": "N/A", "reason": "No hay datos para analizar."}
+
+    last_row = df.iloc[-1]
+    current_price = last_row['Close']
+
+    # 1. Señal Base de la Estrategia
+    base_buy_signal = last_row['senal_compra']
+    base_sell_signal = last_row['senal_venta']
+
+    # 2. Fuerza de la Tendencia
+    ema_slope = calculate_ema_slope(df)
+
+    # 3. Proximidad a S/R
+    near_resistance = check_proximity_to_sr(current_price, resistance_levels)
+    near_support = check_proximity_to_sr(current_price, support_levels)
+
+    # 4. Confirmación de Volumen
+    volume_confirmed = last_row['volumen_alto']
+
+    return graduar_senal(base_buy_signal, base_sell_signal, ema_slope, near_support, near_resistance, volume_confirmed)
+
+
+def graduar_senal(base_buy_signal, base_sell_signal, ema_slope, near_support, near_resistance, volume_confirmed):
+    """Recomendación graduada (FUERTE/MODERADA/DÉBIL) a partir de la señal base y sus confirmaciones."""
+    trend_strength = "Fuerte" if abs(ema_slope) > 0.5 else "Moderada" if abs(ema_slope) > 0.1 else "Débil"
+    trend_direction = "alcista" if ema_slope > 0 else "bajista"
+
+    # --- Lógica de Decisión ---
+    recommendation = {}
+
+    if base_buy_signal:
+        strength_score = 0
+        reasons = []
+        if trend_direction == "alcista": strength_score += 2; reasons.append(f"Tendencia {trend_strength} alcista.")
+        if near_support: strength_score += 2; reasons.append("Cercano a soporte clave.")
+        if volume_confirmed: strength_score += 1; reasons.append("Confirmado por volumen alto.")
+
+        if strength_score >= 4: recommendation = {"action": "COMPRA (CALL)", "strength": "FUERTE", "reason": " | ".join(reasons)}
+        elif strength_score >= 2: recommendation = {"action": "COMPRA (CALL)", "strength": "MODERADA", "reason": " | ".join(reasons)}
+        else: recommendation = {"action": "COMPRA (CALL)", "strength": "DÉBIL", "reason": "Señal sin confirmaciones claras."}
+
+    elif base_sell_signal:
+        strength_score = 0
+        reasons = []
+        if trend_direction == "bajista": strength_score += 2; reasons.append(f"Tendencia {trend_strength} bajista.")
+        if near_resistance: strength_score += 2; reasons.append("Cercano a resistencia clave.")
+        if volume_confirmed: strength_score += 1; reasons.append("Confirmado por volumen alto.")
+
+        if strength_score >= 4: recommendation = {"action": "VENTA (PUT)", "strength": "FUERTE", "reason": " | ".join(reasons)}
+        elif strength_score >= 2: recommendation = {"action": "VENTA (PUT)", "strength": "MODERADA", "reason": " | ".join(reasons)}
+        else: recommendation = {"action": "VENTA (PUT)", "strength": "DÉBIL", "reason": "Señal sin confirmaciones claras."}
+    else:
+        recommendation = {"action": "ESPERAR", "strength": "N/A", "reason": "No hay señal de entrada según la estrategia."}
+
+    return recommendation
@@ -0,0 +1,163 @@
+"""Servicio asíncrono de la señal en vivo: consume velas de una fuente y publica recomendaciones.
+
+La fuente es cualquier iterable asíncrono de DataFrames OHLCV (una o varias velas nuevas, o
+la última vela revisada). Con cada vela se actualizan los indicadores de forma incremental,
+se recalculan las señales solo sobre las últimas filas, los soportes/resistencias solo
+añaden los fractales que confirma la vela nueva, y la recomendación se envía a los
+suscriptores (la interfaz, un websocket, un log...). Cada evento lleva la latencia desde
+que llegó la vela hasta que se calculó la señal.
+"""
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from motor.estrategias import ESTRATEGIA_ML, columna_estrategia
+from motor.indicadores import COLUMNAS_INDICADORES, MotorIndicadores
+from motor.senales import analizar_senal_en_vivo, niveles_relevantes, senales_arrays
+from motor.soportes_resistencias import SoportesResistenciasIncrementales
+
+COLUMNAS_OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Filas necesarias para la señal de la última vela: el cruce mira la vela anterior y la pendiente de la EMA, 6 velas.
+VENTANA_SENAL = 8
+
+
+class FuenteReplay:
+    """Reproduce las velas de un histórico de una en una, con una pausa opcional entre ellas."""
+
+    def __init__(self, velas, pausa=0.0):
+        self.velas = velas
+        self.pausa = pausa
+
+    async def __aiter__(self):
+        for i in range(len(self.velas)):
+            yield self.velas.iloc[i:i + 1]
+            await asyncio.sleep(self.pausa)
+
+
+class FuenteAlmacen:
+    """Consulta el almacén OHLCV cada `cada_segundos` y emite las velas nuevas y la última revisada."""
+
+    def __init__(self, almacen, activo, periodo, intervalo, cada_segundos=60, desde=None):
+        self.almacen, self.activo, self.periodo, self.intervalo = almacen, activo, periodo, intervalo
+        self.cada_segundos = cada_segundos
+        self.desde = desde
+
+    async def __aiter__(self):
+        while True:
+            try:
+                datos, _ = await asyncio.to_thread(self.almacen.cargar, self.activo, self.periodo, self.intervalo)
+            except Exception:
+                datos = None
+            if datos is not None and not datos.empty:
+                nuevas = datos if self.desde is None else datos[datos.index >= self.desde]
+                if not nuevas.empty:
+                    self.desde = nuevas.index[-1]
+                    yield nuevas
+            await asyncio.sleep(self.cada_segundos)
+
+
+class ServicioSenales:
+    """Recomendación en vivo de un activo, actualizada vela a vela y publicada a los suscriptores."""
+
+    def __init__(self, historico, estrategia='Momentum', simbolo='', sr_window=5, sr_threshold=0.5, max_latencias=1000):
+        if estrategia == ESTRATEGIA_ML: raise ValueError("El servicio en vivo no admite la estrategia de Machine Learning.")
+        self.columna = columna_estrategia(estrategia)
+        self.simbolo, self.sr_window, self.sr_threshold = simbolo, sr_window, sr_threshold
+        self.motor = MotorIndicadores(max_filas=VENTANA_SENAL)
+        self.soportes_resistencias = SoportesResistenciasIncrementales(window=sr_window, threshold_pct=sr_threshold)
+        # Solo las últimas velas: las que miran la señal y los fractales pendientes de confirmar.
+        self.velas = historico[COLUMNAS_OHLCV].iloc[:0]
+        self.max_velas = max(VENTANA_SENAL, sr_window + 1)
+        self.total_velas = 0
+        self._indicadores_cola = None
+        self.ultimo_evento = None
+        self.latencias_ms = deque(maxlen=max_latencias)
+        self._suscriptores = []
+        self._cerrojo = threading.Lock()
+        self._bucle = self._tarea = None
+        if not historico.empty:
+            self.procesar(historico)
+            self.latencias_ms.clear()
+
+    def suscribir(self, suscriptor):
+        """Registra una función (normal o corrutina) que recibe cada evento; devuelve la función para darse de baja."""
+        self._suscriptores.append(suscriptor)
+        return lambda: self._suscriptores.remove(suscriptor)
+
+    def _unir(self, velas):
+        """Añade `velas` a la cola (sustituyendo las que llegan revisadas) y devuelve cuántas filas nuevas o revisadas hay."""
+        velas = velas[COLUMNAS_OHLCV]
+        velas = velas[~velas.index.duplicated(keep='last')]
+        anteriores = self.velas[self.velas.index < velas.index[0]]
+        self.total_velas += len(velas) - (len(self.velas) - len(anteriores))
+        self.velas = pd.concat([anteriores, velas]) if not anteriores.empty else velas
+        return len(velas)
+
+    def procesar(self, velas, recibida=None):
+        """Incorpora `velas` y devuelve el evento con la recomendación sobre la última vela."""
+        recibida = time.perf_counter() if recibida is None else recibida
+        with self._cerrojo:
+            revisada = not self.velas.empty and velas.index[0] <= self.velas.index[-1]
+            nuevas = self._unir(velas)
+            nuevos = self.motor.actualizar(self.velas.iloc[-nuevas:])
+            if self._indicadores_cola is not None:
+                nuevos = pd.concat([self._indicadores_cola[self._indicadores_cola.index < nuevos.index[0]], nuevos])
+            self._indicadores_cola = nuevos.iloc[-VENTANA_SENAL:]
+            velas_cola = self.velas.iloc[-VENTANA_SENAL:]
+            columnas = {**{columna: velas_cola[columna].to_numpy() for columna in COLUMNAS_OHLCV},
+                        **{columna: self._indicadores_cola[columna].to_numpy() for columna in COLUMNAS_INDICADORES}}
+            senales = senales_arrays(columnas)
+            cola = pd.DataFrame({'Close': columnas['Close'], 'EMA_20': columnas['EMA_20'], 'volumen_alto': senales['volumen_alto'],
+                                 'senal_compra': senales[self.columna], 'senal_venta': senales['senal_venta']}, index=velas_cola.index)
+
+            support_levels, resistance_levels = self.soportes_resistencias.actualizar(self.velas['High'].to_numpy(), self.velas['Low'].to_numpy(),
+                                                                                      inicio=self.total_velas - len(self.velas))
+            self.velas = self.velas.iloc[-self.max_velas:]
+            current_price = float(cola['Close'].iloc[-1])
+            relevant_support, relevant_resistance = niveles_relevantes(support_levels, resistance_levels, current_price)
+            senal = analizar_senal_en_vivo(cola, relevant_support, relevant_resistance)
+            latencia_ms = (time.perf_counter() - recibida) * 1000
+            self.latencias_ms.append(latencia_ms)
+            self.ultimo_evento = {'simbolo': self.simbolo, 'vela': cola.index[-1], 'revisada': revisada, 'precio': current_price,
+                                  'senal': senal, 'soportes': relevant_support, 'resistencias': relevant_resistance, 'latencia_ms': latencia_ms}
+            return self.ultimo_evento
+
+    async def publicar(self, evento):
+        for suscriptor in list(self._suscriptores):
+            resultado = suscriptor(evento)
+            if inspect.isawaitable(resultado): await resultado
+
+    async def ejecutar(self, fuente):
+        """Procesa y publica cada vela de `fuente` hasta que se agote o se llame a `detener`."""
+        self._bucle, self._tarea = asyncio.get_running_loop(), asyncio.current_task()
+        try:
+            async for velas in fuente:
+                recibida = time.perf_counter()
+                if velas.empty: continue
+                await self.publicar(self.procesar(velas, recibida))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._tarea = None
+
+    def detener(self):
+        """Cancela `ejecutar` desde cualquier hilo."""
+        if self._tarea is not None: self._bucle.call_soon_threadsafe(self._tarea.cancel)
+
+    def estadisticas(self):
+        """Eventos procesados y percentiles de la latencia vela → señal en milisegundos."""
+        if not self.latencias_ms: return {'eventos': 0}
+        latencias = np.fromiter(self.latencias_ms, dtype=np.float64)
+        return {'eventos': len(latencias), 'p50_ms': float(np.percentile(latencias, 50)), 'p95_ms': float(np.percentile(latencias, 95)), 'max_ms': float(latencias.max())}
+
+
+def iniciar_en_segundo_plano(servicio, fuente):
+    """Ejecuta el servicio en un hilo con su propio bucle de eventos (p. ej. junto a Streamlit)."""
+    hilo = threading.Thread(target=asyncio.run, args=(servicio.ejecutar(fuente),), daemon=True, name=f"servicio-senales-{servicio.simbolo}")
+    hilo.start()
+    return hilo
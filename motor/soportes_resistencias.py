@@ -0,0 +1,175 @@
+"""Detección vectorizada de soportes y resistencias por fractales, en bloque o vela a vela."""
+import bisect
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# np.mean suma por pares a partir de 8 elementos; por debajo de ese tamaño la suma
+# acumulada coincide bit a bit con la suya y no hace falta recalcular la media.
+_TAMANO_SUMA_SECUENCIAL = 8
+# La suma acumulada difiere de la de np.mean en ~1e-12 relativo; con esta distancia al umbral
+# (en puntos porcentuales) la decisión de agrupar no puede cambiar.
+_TOLERANCIA_UMBRAL = 1e-6
+
+
+def fractales(valores, window=5, es_maximo=True):
+    """Índices de las velas cuyo valor supera estrictamente (o queda por debajo de) todos sus vecinos."""
+    valores = np.asarray(valores, dtype=np.float64)
+    mitad = window // 2
+    n = len(valores)
+    if n <= 2 * mitad:
+        return np.empty(0, dtype=np.intp)
+    centros = valores[mitad:n - mitad]
+    if mitad == 0:
+        return np.arange(n, dtype=np.intp)
+    # Vista sin copia de todas las ventanas; fmax/fmin ignoran NaN igual que el bucle original.
+    ventanas = sliding_window_view(valores, 2 * mitad + 1)
+    reduccion = np.fmax if es_maximo else np.fmin
+    vecinos = reduccion(reduccion.reduce(ventanas[:, :mitad], axis=1), reduccion.reduce(ventanas[:, mitad + 1:], axis=1))
+    # Un vecino igual o más extremo invalida el fractal; comparar con NaN nunca lo invalida.
+    invalido = vecinos >= centros if es_maximo else vecinos <= centros
+    return np.flatnonzero(~invalido) + mitad
+
+
+def _dentro(nivel, cluster_mean, threshold_pct):
+    if cluster_mean == 0: return abs(nivel - cluster_mean) < (threshold_pct / 100)
+    return abs(nivel - cluster_mean) / cluster_mean * 100 < threshold_pct
+
+
+def cluster_levels(levels, threshold_pct=0.5):
+    """Agrupa niveles ordenados en una sola pasada manteniendo la suma acumulada de cada grupo."""
+    levels_array = np.sort(np.asarray(levels, dtype=np.float64))
+    if levels_array.size == 0: return []
+    clustered = []
+    inicio, suma = 0, levels_array[0]
+    for i in range(1, len(levels_array)):
+        tamano = i - inicio
+        cluster_mean = suma / tamano if tamano < _TAMANO_SUMA_SECUENCIAL else np.mean(levels_array[inicio:i])
+        nivel = levels_array[i]
+        if _dentro(nivel, cluster_mean, threshold_pct):
+            suma += nivel
+        else:
+            clustered.append(cluster_mean)
+            inicio, suma = i, nivel
+    clustered.append(np.mean(levels_array[inicio:]))
+    return clustered
+
+
+def calculate_support_resistance(df, window=5, threshold_pct=0.5):
+    """Calcula niveles de soporte y resistencia agrupando fractales de máximos y mínimos."""
+    highs = df['High'].to_numpy(dtype=np.float64)
+    lows = df['Low'].to_numpy(dtype=np.float64)
+    fractal_highs = highs[fractales(highs, window, es_maximo=True)]
+    fractal_lows = lows[fractales(lows, window, es_maximo=False)]
+    resistance_levels = cluster_levels(fractal_highs, threshold_pct)
+    support_levels = cluster_levels(fractal_lows, threshold_pct)
+    return support_levels, resistance_levels
+
+
+class _Agrupador:
+    """`cluster_levels` incremental: niveles ordenados, inicio de cada grupo y su media.
+
+    La agrupación recorre los niveles de menor a mayor, así que al insertar uno solo cambian
+    los grupos desde el que lo contiene hasta que un grupo vuelve a empezar en el mismo nivel
+    que antes; a partir de ahí el recorrido es idéntico y se reutiliza.
+    """
+
+    def __init__(self, threshold_pct):
+        self.threshold_pct = threshold_pct
+        self.niveles, self.inicios, self.medias = [], [], []
+
+    def _recorrer(self, grupo, desde_nuevos=None, siguientes=()):
+        """Reagrupa desde el grupo `grupo`; se detiene al coincidir con un inicio de `siguientes` posterior a `desde_nuevos`."""
+        niveles = self.niveles
+        inicio = self.inicios[grupo] if grupo < len(self.inicios) else 0
+        inicios, medias = [], []
+        suma, pendiente, coincidencia = niveles[inicio], 0, None
+        for i in range(inicio + 1, len(niveles)):
+            tamano = i - inicio
+            cluster_mean = suma / tamano
+            if tamano >= _TAMANO_SUMA_SECUENCIAL and (cluster_mean == 0 or abs(abs(niveles[i] - cluster_mean) / cluster_mean * 100 - self.threshold_pct) < _TOLERANCIA_UMBRAL):
+                # Solo cerca del umbral puede cambiar la decisión con la media exacta de np.mean.
+                cluster_mean = np.mean(niveles[inicio:i])
+            if _dentro(niveles[i], cluster_mean, self.threshold_pct):
+                suma += niveles[i]
+                continue
+            inicios.append(inicio); medias.append(cluster_mean if tamano < _TAMANO_SUMA_SECUENCIAL else np.mean(niveles[inicio:i]))
+            inicio, suma = i, niveles[i]
+            if desde_nuevos is not None and i > desde_nuevos:
+                while pendiente < len(siguientes) and siguientes[pendiente] < i: pendiente += 1
+                if pendiente < len(siguientes) and siguientes[pendiente] == i:
+                    coincidencia = pendiente
+                    break
+        if coincidencia is None:
+            inicios.append(inicio); medias.append(np.mean(niveles[inicio:]))
+            self.inicios, self.medias = self.inicios[:grupo] + inicios, self.medias[:grupo] + medias
+        else:
+            resto = grupo + 1 + coincidencia
+            self.inicios = self.inicios[:grupo] + inicios + siguientes[coincidencia:]
+            self.medias = self.medias[:grupo] + medias + self.medias[resto:]
+
+    def copia(self):
+        otro = _Agrupador(self.threshold_pct)
+        otro.niveles, otro.inicios, otro.medias = list(self.niveles), list(self.inicios), list(self.medias)
+        return otro
+
+    def insertar(self, nivel):
+        posicion = bisect.bisect_right(self.niveles, nivel)
+        self.niveles.insert(posicion, nivel)
+        grupo = max(bisect.bisect_right(self.inicios, posicion - 1) - 1, 0)
+        self._recorrer(grupo, posicion, [inicio + 1 for inicio in self.inicios[grupo + 1:]])
+
+    def insertar_varios(self, niveles):
+        if len(niveles) <= _TAMANO_SUMA_SECUENCIAL:
+            for nivel in niveles: self.insertar(nivel)
+        else:
+            self.niveles = sorted(self.niveles + list(niveles))
+            self.inicios, self.medias = [], []
+            self._recorrer(0)
+
+
+class SoportesResistenciasIncrementales:
+    """`calculate_support_resistance` para un histórico que crece vela a vela.
+
+    Un fractal solo se confirma cuando existen las `window // 2` velas posteriores, así que
+    cada vela nueva puede añadir como mucho un máximo y un mínimo. Como en `MotorIndicadores`,
+    se guarda el estado previo a la última vela y se vuelve a procesar con cada actualización,
+    por si llega revisada (sola o junto a velas nuevas). Basta con pasar las últimas
+    `window + 1` velas ya procesadas más las nuevas, indicando su posición con `inicio`.
+    """
+
+    def __init__(self, window=5, threshold_pct=0.5):
+        self.window, self.threshold_pct = window, threshold_pct
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._maximos, self._minimos = _Agrupador(self.threshold_pct), _Agrupador(self.threshold_pct)
+        self._velas = 0
+        self._previo = None
+
+    def _procesar(self, highs, lows, n, inicio):
+        mitad = self.window // 2
+        desde, hasta = max(self._velas - mitad, mitad), n - mitad
+        if hasta > desde:
+            if desde - mitad < inicio: raise ValueError(f"Faltan velas anteriores: se necesitan desde la posición {desde - mitad} y empiezan en {inicio}.")
+            for valores, agrupador, es_maximo in [(highs, self._maximos, True), (lows, self._minimos, False)]:
+                tramo = valores[desde - mitad - inicio:hasta + mitad - inicio]
+                agrupador.insertar_varios([float(nivel) for nivel in tramo[fractales(tramo, self.window, es_maximo)]])
+        self._velas = n
+
+    def actualizar(self, highs, lows, inicio=0):
+        """Devuelve (soportes, resistencias) de `highs`/`lows`, que continúan lo ya procesado salvo quizá la última vela.
+
+        `inicio` es la posición en el histórico de la primera vela de `highs`/`lows`.
+        """
+        highs, lows = np.asarray(highs, dtype=np.float64), np.asarray(lows, dtype=np.float64)
+        n = inicio + len(highs)
+        if n < self._velas: self._reiniciar()
+        elif self._previo is not None:
+            maximos, minimos, self._velas = self._previo
+            self._maximos, self._minimos = maximos.copia(), minimos.copia()
+        if n > self._velas:
+            if n - self._velas > 1: self._procesar(highs, lows, n - 1, inicio)
+            self._previo = (self._maximos.copia(), self._minimos.copia(), self._velas)
+            self._procesar(highs, lows, n, inicio)
+        return list(self._minimos.medias), list(self._maximos.medias)
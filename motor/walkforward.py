@@ -0,0 +1,118 @@
+"""Evaluación walk-forward del modelo RandomForest con pliegues en paralelo.
+
+El histórico se recorre en bloques de `reentrenar_cada` filas: para cada bloque se entrena
+con las filas anteriores cuya etiqueta ya se conocía (ventana creciente o deslizante) y
+se predice solo el bloque, de modo que todas las probabilidades son fuera de muestra.
+Las variables se comparten con los procesos trabajadores a través de memoria compartida.
+"""
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from motor.modelo import FEATURES_ML, PARAMETROS_RF, entrenar_random_forest, precision
+
+VENTANA_MINIMA = 500
+MAX_PLIEGUES = 20
+
+# Estado de cada proceso trabajador, fijado una vez por _inicializar_trabajador.
+_memoria = None
+_matriz = None
+
+
+def _ventana_minima(n_filas, ventana_minima):
+    return min(n_filas // 2, VENTANA_MINIMA) if ventana_minima is None else ventana_minima
+
+
+def paso_reentrenamiento(n_filas, prediction_horizon, reentrenar_cada=250, ventana_minima=None, max_pliegues=MAX_PLIEGUES):
+    """Filas entre reentrenamientos: `reentrenar_cada`, o más si con él saldrían más de `max_pliegues` pliegues."""
+    ventana_minima = _ventana_minima(n_filas, ventana_minima)
+    return max(reentrenar_cada, math.ceil(max(n_filas - ventana_minima - prediction_horizon, 0) / max_pliegues))
+
+
+def generar_pliegues(n_filas, prediction_horizon, reentrenar_cada=250, ventana_minima=None, ventana_maxima=None, max_pliegues=MAX_PLIEGUES):
+    """Lista de (inicio_entrenamiento, fin_entrenamiento, inicio_prueba, fin_prueba) en posiciones de fila.
+
+    Entre el entrenamiento y la prueba se dejan `prediction_horizon` filas, cuyas etiquetas
+    todavía no se conocerían al predecir. `max_pliegues` acota el coste total ampliando el
+    paso de reentrenamiento si hace falta (ver `paso_reentrenamiento`). Sin `ventana_minima`
+    el primer entrenamiento usa la mitad del histórico, hasta VENTANA_MINIMA filas.
+    """
+    ventana_minima = _ventana_minima(n_filas, ventana_minima)
+    if n_filas <= ventana_minima + prediction_horizon: return []
+    paso = paso_reentrenamiento(n_filas, prediction_horizon, reentrenar_cada, ventana_minima, max_pliegues)
+    pliegues = []
+    for inicio_prueba in range(ventana_minima + prediction_horizon, n_filas, paso):
+        fin_entrenamiento = inicio_prueba - prediction_horizon
+        inicio_entrenamiento = 0 if ventana_maxima is None else max(0, fin_entrenamiento - ventana_maxima)
+        pliegues.append((inicio_entrenamiento, fin_entrenamiento, inicio_prueba, min(inicio_prueba + paso, n_filas)))
+    return pliegues
+
+
+def _inicializar_trabajador(nombre, forma):
+    global _memoria, _matriz
+    _memoria = shared_memory.SharedMemory(name=nombre)
+    _matriz = np.ndarray(forma, dtype=np.float64, buffer=_memoria.buf)
+
+
+def _evaluar_pliegue(pliegue, parametros):
+    inicio_entrenamiento, fin_entrenamiento, inicio_prueba, fin_prueba = pliegue
+    inicio = time.perf_counter()
+    X, y = _matriz[:, :-1], _matriz[:, -1] == 1.0
+    y_train = y[inicio_entrenamiento:fin_entrenamiento]
+    if len(np.unique(y_train)) < 2:
+        # Con una sola clase el modelo predice siempre esa clase.
+        probabilidades = np.full(fin_prueba - inicio_prueba, float(y_train[0]) if len(y_train) else np.nan)
+    else:
+        model = entrenar_random_forest(X[inicio_entrenamiento:fin_entrenamiento], y_train, n_jobs=1, parametros=parametros)
+        probabilidades = model.predict_proba(X[inicio_prueba:fin_prueba])[:, 1]
+    return probabilidades, time.perf_counter() - inicio
+
+
+def walk_forward(df_ml, prediction_horizon, features=FEATURES_ML, reentrenar_cada=250, ventana_minima=None, ventana_maxima=None,
+                 max_pliegues=MAX_PLIEGUES, max_workers=None, parametros=PARAMETROS_RF):
+    """Probabilidades de subida fuera de muestra y métricas por pliegue.
+
+    Devuelve (probabilidades, pliegues): una Series alineada con `df_ml` (NaN en las filas
+    anteriores al primer pliegue) y un DataFrame con la precisión y el coste de cada pliegue.
+    Las últimas `prediction_horizon` filas no tienen etiqueta conocida y no cuentan para la
+    precisión; `filas_evaluadas` son las de cada pliegue que sí cuentan.
+    """
+    pliegues = generar_pliegues(len(df_ml), prediction_horizon, reentrenar_cada, ventana_minima, ventana_maxima, max_pliegues)
+    probabilidades = pd.Series(np.nan, index=df_ml.index, name='probabilidad_subida')
+    columnas_pliegues = ['pliegue', 'inicio_prueba', 'fin_prueba', 'filas_entrenamiento', 'filas_prueba', 'filas_evaluadas', 'precision', 'segundos']
+    if not pliegues: return probabilidades, pd.DataFrame(columns=columnas_pliegues)
+
+    matriz = np.column_stack((df_ml[features].to_numpy(dtype=np.float64), df_ml['target'].to_numpy(dtype=np.float64)))
+    max_workers = max_workers or os.cpu_count() or 1
+    memoria = shared_memory.SharedMemory(create=True, size=matriz.nbytes)
+    try:
+        np.ndarray(matriz.shape, dtype=np.float64, buffer=memoria.buf)[:] = matriz
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_trabajador, initargs=(memoria.name, matriz.shape)) as pool:
+            resultados = list(pool.map(_evaluar_pliegue, pliegues, [parametros] * len(pliegues)))
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    y = df_ml['target'].to_numpy(dtype=bool)
+    etiquetadas = len(df_ml) - prediction_horizon
+    filas = []
+    for numero, ((inicio_entrenamiento, fin_entrenamiento, inicio_prueba, fin_prueba), (probabilidades_pliegue, segundos)) in enumerate(zip(pliegues, resultados), 1):
+        probabilidades.iloc[inicio_prueba:fin_prueba] = probabilidades_pliegue
+        fin_etiquetado = max(inicio_prueba, min(fin_prueba, etiquetadas))
+        filas.append({'pliegue': numero, 'inicio_prueba': df_ml.index[inicio_prueba], 'fin_prueba': df_ml.index[fin_prueba - 1],
+                      'filas_entrenamiento': fin_entrenamiento - inicio_entrenamiento, 'filas_prueba': fin_prueba - inicio_prueba,
+                      'filas_evaluadas': fin_etiquetado - inicio_prueba,
+                      'precision': precision(probabilidades_pliegue[:fin_etiquetado - inicio_prueba], y[inicio_prueba:fin_etiquetado]), 'segundos': segundos})
+    return probabilidades, pd.DataFrame(filas, columns=columnas_pliegues)
+
+
+def precision_global(pliegues):
+    """Precisión sobre todas las filas evaluadas: la media de los pliegues ponderada por `filas_evaluadas`."""
+    evaluadas = pliegues['filas_evaluadas'].sum()
+    if evaluadas == 0: return float('nan')
+    return float((pliegues['precision'].fillna(0) * pliegues['filas_evaluadas']).sum() / evaluadas)
@@ -0,0 +1,50 @@
+"""Almacén OHLCV: actualización incremental, precios reajustados por la fuente y escrituras concurrentes."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from benchmarks.bench_almacen import FuenteLocal
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.almacen import AlmacenOHLCV
+
+
+def _referencia(fuente, simbolo, periodo):
+    datos = fuente(simbolo, '5m', periodo=periodo)
+    datos.columns = datos.columns.get_level_values(0)
+    return datos
+
+
+def test_incremental_igual_a_descarga_completa(tmp_path):
+    fuente = FuenteLocal(generar_ohlcv(4 * 78, intervalo='5m'), {'AAPL'}, latencia_por_mb=0)
+    almacen = AlmacenOHLCV(str(tmp_path), descargar=fuente)
+    almacen.cargar('AAPL', '60d', '5m')
+    for _ in range(3):
+        fuente.ahora += pd.Timedelta(minutes=5)
+        fuente.bytes_servidos = 0
+        datos, _ = almacen.cargar('AAPL', '60d', '5m')
+        assert fuente.bytes_servidos < 1_000
+        pd.testing.assert_frame_equal(datos, _referencia(fuente, 'AAPL', '60d'), check_freq=False)
+
+
+def test_split_vuelve_a_descargar_el_periodo(tmp_path):
+    historico = generar_ohlcv(4 * 78, intervalo='5m')
+    fuente = FuenteLocal(historico, {'AAPL'}, latencia_por_mb=0)
+    almacen = AlmacenOHLCV(str(tmp_path), descargar=fuente)
+    almacen.cargar('AAPL', '60d', '5m')
+    # Split 4:1 con auto_adjust: la fuente reescribe todos los precios anteriores.
+    fuente.historico = historico.copy()
+    fuente.historico[['Open', 'High', 'Low', 'Close']] /= 4
+    fuente.ahora += pd.Timedelta(minutes=5)
+    datos, _ = almacen.cargar('AAPL', '60d', '5m')
+    pd.testing.assert_frame_equal(datos, _referencia(fuente, 'AAPL', '60d'), check_freq=False)
+    assert datos['Close'].pct_change().abs().max() < 0.5
+
+
+def test_escrituras_concurrentes_del_mismo_simbolo(tmp_path):
+    almacen = AlmacenOHLCV(str(tmp_path), descargar=lambda *args, **kwargs: None)
+    versiones = [generar_ohlcv(2_000, semilla=semilla) for semilla in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda datos: [almacen.guardar('AAPL', '1d', datos) for _ in range(5)], versiones))
+    guardado = almacen.leer('AAPL', '1d')
+    assert any(guardado.equals(datos) for datos in versiones)
+    assert [nombre for nombre in tmp_path.iterdir() if nombre.suffix == '.tmp'] == []
@@ -0,0 +1,41 @@
+"""La app completa con AppTest sobre un histórico local (sin conexión)."""
+import os
+
+import pytest
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.almacen import AlmacenOHLCV
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+# Símbolo por defecto de la barra lateral: la primera ejecución lo carga antes de cambiarlo.
+SIMBOLO_POR_DEFECTO = 'AAPL'
+
+
+def _sin_conexion(*args, **kwargs):
+    raise ConnectionError("Los tests no deben descargar datos.")
+
+
+def ejecutar_app(tmp_path, monkeypatch, n_velas, simbolo):
+    pytest.importorskip('streamlit.testing.v1')
+    from streamlit.testing.v1 import AppTest
+    # El almacén y el registro de modelos usan directorios relativos al directorio de trabajo.
+    monkeypatch.chdir(tmp_path)
+    # Sin conexión el almacén sirve el histórico guardado en lugar de actualizarlo.
+    monkeypatch.setattr('yfinance.download', _sin_conexion)
+    for simbolo_guardado in [SIMBOLO_POR_DEFECTO, simbolo]:
+        datos = generar_ohlcv(n_velas, intervalo='1d', semilla=n_velas)
+        datos.index = datos.index.normalize()
+        datos.attrs['inicio_cubierto'] = 'max'
+        AlmacenOHLCV().guardar(simbolo_guardado, '1d', datos)
+    app = AppTest.from_file(APP, default_timeout=120).run()
+    assert not app.exception
+    app.text_input[0].set_value(simbolo).run()
+    return app
+
+
+@pytest.mark.parametrize('n_velas', [40, 50, 51])
+def test_historico_corto(tmp_path, monkeypatch, n_velas):
+    app = ejecutar_app(tmp_path, monkeypatch, n_velas, f"PRUEBA{n_velas}")
+    assert not app.exception
+    assert any(caption.value.startswith(f"Histórico en memoria: {n_velas} velas") for caption in app.caption)
+    assert any(slider.label.startswith("Velas Visibles") for slider in app.sidebar.slider) == (n_velas > 50)
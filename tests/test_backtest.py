@@ -0,0 +1,39 @@
+"""El núcleo sobre arrays da las mismas listas de operaciones, byte a byte, que los bucles originales de app.py."""
+import pickle
+
+import pytest
+
+from benchmarks.bench_backtest import backtest_binario_bucle, backtest_tradicional_bucle, preparar_datos
+from motor import backtest
+from motor.backtest import backtest_binario, backtest_tradicional
+
+
+@pytest.fixture(params=['jit', 'python'])
+def ruta_kernel(request, monkeypatch):
+    """Ejecuta cada test con los kernels compilados por numba (si está instalado) y en Python puro."""
+    if request.param == 'python':
+        for nombre in ('_kernel_tradicional', '_kernel_binario'):
+            kernel = getattr(backtest, nombre)
+            if not hasattr(kernel, 'py_func'): pytest.skip("numba no está instalado: los kernels ya son Python puro")
+            monkeypatch.setattr(backtest, nombre, kernel.py_func)
+    return request.param
+
+
+@pytest.mark.parametrize('semilla', range(3))
+@pytest.mark.parametrize('parametros', [(0.05, 0.10, True, 0.03), (0.01, 0.02, False, 0.03), (0.20, 0.30, True, 0.01)])
+def test_tradicional_identico_al_bucle(ruta_kernel, semilla, parametros):
+    df = preparar_datos(2_000, semilla)
+    assert pickle.dumps(backtest_tradicional(df, *parametros)) == pickle.dumps(backtest_tradicional_bucle(df, *parametros))
+
+
+@pytest.mark.parametrize('semilla', range(3))
+@pytest.mark.parametrize('expiracion_steps', [0, 1, 3, 48])
+def test_binario_identico_al_bucle(ruta_kernel, semilla, expiracion_steps):
+    df = preparar_datos(2_000, semilla)
+    assert pickle.dumps(backtest_binario(df, expiracion_steps, 0.85, 100)) == pickle.dumps(backtest_binario_bucle(df, expiracion_steps, 0.85, 100))
+
+
+def test_sin_operaciones(ruta_kernel):
+    df = preparar_datos(200)
+    df['senal_compra'] = df['senal_venta'] = False
+    assert backtest_tradicional(df, 0.05, 0.10, True, 0.03) == [] and backtest_binario(df, 1, 0.85, 100) == []
@@ -0,0 +1,89 @@
+"""Caché compartida: single-flight, errores, interrupciones de la sesión que calcula y desalojo."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from motor.cache_resultados import CacheResultados, clave_resultado
+
+HILOS = 8
+
+
+class Detener(BaseException):
+    """Como StopException/RerunException de Streamlit: no hereda de Exception."""
+
+
+def _a_la_vez(funcion):
+    barrera = threading.Barrier(HILOS)
+    def pedir(_):
+        barrera.wait()
+        return funcion()
+    with ThreadPoolExecutor(HILOS) as pool:
+        return list(pool.map(pedir, range(HILOS)))
+
+
+def test_single_flight():
+    cache, llamadas = CacheResultados(), []
+    def calcular():
+        llamadas.append(1)
+        time.sleep(0.05)
+        return 42
+    assert _a_la_vez(lambda: cache.obtener('clave', calcular)) == [42] * HILOS
+    assert len(llamadas) == 1
+    estadisticas = cache.estadisticas()
+    assert estadisticas['fallos'] == 1 and estadisticas['aciertos'] + estadisticas['esperas'] == HILOS - 1
+
+
+def test_error_compartido_y_no_guardado():
+    cache = CacheResultados()
+    def fallar():
+        time.sleep(0.05)
+        raise ValueError("fallo")
+    def pedir():
+        with pytest.raises(ValueError): cache.obtener('clave', fallar)
+        return True
+    assert all(_a_la_vez(pedir))
+    assert cache.estadisticas()['entradas'] == 0
+
+
+def test_interrupcion_solo_a_la_sesion_que_calcula():
+    cache, llamadas, empezado = CacheResultados(), [], threading.Event()
+    def interrumpido():
+        llamadas.append('interrumpido')
+        empezado.set()
+        time.sleep(0.05)
+        raise Detener()
+    def calcular():
+        llamadas.append('calculado')
+        return 7
+    resultados = []
+    def primera():
+        with pytest.raises(Detener): cache.obtener('clave', interrumpido)
+    hilo = threading.Thread(target=primera)
+    hilo.start()
+    empezado.wait()
+    esperando = [threading.Thread(target=lambda: resultados.append(cache.obtener('clave', calcular))) for _ in range(3)]
+    for hilo_espera in esperando: hilo_espera.start()
+    for hilo_espera in [hilo, *esperando]: hilo_espera.join()
+    assert resultados == [7, 7, 7] and llamadas == ['interrumpido', 'calculado']
+
+
+def test_desalojo_lru_por_bytes():
+    fila = np.zeros(1_000)
+    cache = CacheResultados(max_bytes=int(fila.nbytes * 2.5))
+    for clave in ('a', 'b'): cache.obtener(clave, lambda: fila.copy())
+    cache.obtener('a', lambda: None)  # 'a' pasa a ser la más reciente
+    cache.obtener('c', lambda: fila.copy())
+    estadisticas = cache.estadisticas()
+    assert estadisticas['desalojos'] == 1 and estadisticas['entradas'] == 2
+    assert isinstance(cache.obtener('a', lambda: 'recalculado'), np.ndarray)
+    assert cache.obtener('b', lambda: 'recalculado') == 'recalculado'
+
+
+def test_clave_por_contenido():
+    datos = np.arange(10)
+    assert clave_resultado('AAPL', '1d', '1y', 'etapa', datos, umbral=1) == clave_resultado('AAPL', '1d', '1y', 'etapa', datos.copy(), umbral=1)
+    assert clave_resultado('AAPL', '1d', '1y', 'etapa', datos, umbral=1) != clave_resultado('AAPL', '1d', '1y', 'etapa', datos, umbral=2)
+    assert clave_resultado('AAPL', '1d', '1y', 'etapa', datos) != clave_resultado('AAPL', '1d', '1y', 'etapa', datos + 1)
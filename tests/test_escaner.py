@@ -0,0 +1,49 @@
+"""Escáner con una fuente local: descarga por lotes, orden de la tabla, símbolos que fallan y pool frente a secuencial."""
+import pandas as pd
+
+from benchmarks.bench_escaner import FuenteSintetica
+from motor.almacen import AlmacenOHLCV
+from motor.escaner import ORDEN_FUERZA, analizar_simbolo, escanear
+
+WATCHLIST = [f"SIM{i:03d}" for i in range(12)] + ['FALLA1', 'FALLA2']
+
+
+def _almacen(directorio, por_lotes=True):
+    fuente = FuenteSintetica(n_velas=1_000, latencia=0)
+    return AlmacenOHLCV(str(directorio), descargar=fuente, descargar_lote=fuente.lote if por_lotes else None), fuente
+
+
+def test_una_descarga_por_lote(tmp_path):
+    almacen, fuente = _almacen(tmp_path)
+    escanear(WATCHLIST, '60d', '5m', almacen=almacen, max_workers=1, tamano_lote=5)
+    # Tres lotes y una petición suelta por cada símbolo que no vino en su lote.
+    assert fuente.peticiones == 3 + 2
+    fuente.peticiones = 0
+    escanear(WATCHLIST, '60d', '5m', almacen=almacen, max_workers=1, tamano_lote=5)
+    # Ya guardados, se piden juntos solo las velas nuevas; el último lote pide aparte el período de los que fallaron.
+    assert fuente.peticiones == 3 + 1 + 2
+
+
+def test_orden_y_simbolos_que_fallan(tmp_path):
+    almacen, _ = _almacen(tmp_path)
+    tabla, estadisticas = escanear(WATCHLIST + [' SIM000 ', ''], '60d', '5m', almacen=almacen, max_workers=2, tamano_lote=5)
+    assert estadisticas['simbolos'] == len(WATCHLIST) and sorted(tabla['simbolo']) == sorted(WATCHLIST)
+    fallidos = tabla[tabla['error'].notna()]
+    assert list(fallidos['simbolo']) == ['FALLA1', 'FALLA2'] and list(fallidos.index) == [len(tabla) - 2, len(tabla) - 1]
+    validos = tabla[tabla['error'].isna()]
+    orden = list(zip(validos['fuerza'].map(ORDEN_FUERZA), validos['simbolo']))
+    assert orden == sorted(orden)
+
+
+def test_pool_igual_que_secuencial(tmp_path):
+    almacen, _ = _almacen(tmp_path / 'lotes')
+    tabla, _ = escanear(WATCHLIST, '60d', '5m', almacen=almacen, max_workers=2, max_descargas=3, tamano_lote=4)
+    secuencial, _ = _almacen(tmp_path / 'secuencial', por_lotes=False)
+    filas = []
+    for simbolo in WATCHLIST:
+        datos, simbolo_datos = secuencial.cargar(simbolo, '60d', '5m')
+        if datos is None: filas.append({'simbolo': simbolo, 'simbolo_datos': simbolo_datos, 'error': "No se pudieron descargar los datos."})
+        else: filas.append({**analizar_simbolo(simbolo, datos, 'Momentum'), 'simbolo_datos': simbolo_datos})
+    referencia = pd.DataFrame(filas, columns=tabla.columns)
+    referencia = referencia.set_index('simbolo').loc[tabla['simbolo']].reset_index()
+    pd.testing.assert_frame_equal(tabla, referencia)
@@ -0,0 +1,34 @@
+"""El gráfico completo es el de app.py original y el modo rápido conserva los extremos del precio."""
+import json
+
+import plotly.io as pio
+import pytest
+
+from benchmarks.bench_grafico import figura_original
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.grafico import construir_figura
+from motor.pipeline import aplicar_indicadores, senal_en_vivo
+
+
+@pytest.fixture(scope='module', params=[(252, '1d'), (3_276, '5m')])
+def datos(request):
+    n_velas, intervalo = request.param
+    datos = aplicar_indicadores(generar_ohlcv(n_velas, intervalo=intervalo))
+    datos['senal_compra'] = datos['senal_momentum']
+    return datos, senal_en_vivo(datos)
+
+
+def test_modo_completo_igual_al_original(datos):
+    datos, en_vivo = datos
+    fig, _ = construir_figura(datos, en_vivo['soportes'], en_vivo['resistencias'], rapido=False)
+    original = figura_original(datos, en_vivo['soportes'], en_vivo['resistencias'])
+    assert json.loads(pio.to_json(fig, validate=False)) == json.loads(pio.to_json(original, validate=False))
+
+
+@pytest.mark.parametrize('max_puntos', [500, 2_000])
+def test_modo_rapido_conserva_extremos(datos, max_puntos):
+    datos, en_vivo = datos
+    fig, puntos = construir_figura(datos, en_vivo['soportes'], en_vivo['resistencias'], max_puntos=max_puntos)
+    velas = fig.data[0]
+    assert len(velas.x) <= max_puntos
+    assert max(velas.high) == datos['High'].max() and min(velas.low) == datos['Low'].min()
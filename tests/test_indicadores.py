@@ -0,0 +1,51 @@
+"""Motor de indicadores incremental frente al cálculo completo."""
+import pandas as pd
+
+from benchmarks.bench_almacen import FuenteLocal
+from benchmarks.bench_indicadores import comprobar, indicadores_referencia
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.almacen import AlmacenOHLCV, recortar_periodo
+from motor.indicadores import MotorIndicadores, calcular_indicadores
+from motor.pipeline import aplicar_indicadores
+
+
+def test_velas_nuevas_igual_que_referencia():
+    df = generar_ohlcv(1_200, intervalo='5m')
+    motor = MotorIndicadores()
+    for fin in (600, 601, 900, 1_200):
+        comprobar(motor.calcular(df.iloc[:fin]), indicadores_referencia(df.iloc[:fin]), f"{fin} velas")
+
+
+def test_vela_revisada():
+    df = generar_ohlcv(500, intervalo='5m')
+    motor = MotorIndicadores()
+    motor.calcular(df)
+    revisada = df.copy()
+    revisada.iloc[-1, revisada.columns.get_loc('Close')] *= 1.01
+    comprobar(motor.calcular(revisada), indicadores_referencia(revisada), "última vela revisada")
+
+
+def test_ventana_desplazada_igual_que_calculo_nuevo():
+    # El almacén recorta el período desde la última vela: el inicio de la ventana avanza en cada refresco.
+    df = generar_ohlcv(1_600, intervalo='5m')
+    motor = MotorIndicadores()
+    for inicio in (0, 1, 50, 100):
+        ventana = df.iloc[inicio:inicio + 1_500]
+        pd.testing.assert_frame_equal(motor.calcular(ventana), calcular_indicadores(ventana))
+
+
+def test_app_con_almacen_avanzando_no_reinicia_el_motor(tmp_path, monkeypatch):
+    # Como en la app: cada refresco trae una vela de 5m nueva y el período de 5d empieza más tarde.
+    reinicios = []
+    reiniciar = MotorIndicadores._reiniciar
+    monkeypatch.setattr(MotorIndicadores, '_reiniciar', lambda motor: (reinicios.append(motor), reiniciar(motor)))
+    fuente = FuenteLocal(generar_ohlcv(2 * 60 * 78, intervalo='5m'), {'AAPL'}, latencia_por_mb=0)
+    almacen, motor, inicios = AlmacenOHLCV(str(tmp_path), descargar=fuente), MotorIndicadores(), set()
+    for _ in range(6):
+        completo, _ = almacen.cargar('AAPL', '5d', '5m', completo=True)
+        datos = recortar_periodo(completo, '5d')
+        inicios.add(datos.index[0])
+        pd.testing.assert_frame_equal(aplicar_indicadores(datos.copy(), motor, compacto=True, historico=completo),
+                                      aplicar_indicadores(datos.copy(), compacto=True, historico=completo))
+        fuente.ahora += pd.Timedelta(minutes=5)
+    assert len(inicios) > 1 and sum(reiniciado is motor for reiniciado in reinicios) == 1
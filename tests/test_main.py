@@ -0,0 +1,58 @@
+"""La línea de comandos (`python -m motor`) sobre un almacén local sintético, sin conexión."""
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.__main__ import main
+from motor.almacen import AlmacenOHLCV, recortar_periodo
+from motor.estrategias import ESTRATEGIA_ML
+
+
+def _sin_conexion(*args, **kwargs):
+    raise ConnectionError("Los tests no deben descargar datos.")
+
+
+@pytest.fixture
+def almacen(tmp_path, monkeypatch):
+    # El almacén usa un directorio relativo al directorio de trabajo.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('TRADING_JIT', '0')
+    monkeypatch.setattr('yfinance.download', _sin_conexion)
+    datos = generar_ohlcv(300, intervalo='1d', semilla=9)
+    datos.attrs['inicio_cubierto'] = 'max'
+    AlmacenOHLCV().guardar('PRUEBA', '1d', datos)
+    return datos
+
+
+def test_resumen_json(almacen, capsys):
+    assert main(['PRUEBA', '--sin-descarga']) == 0
+    resumen = json.loads(capsys.readouterr().out)
+    assert resumen['simbolo'] == 'PRUEBA' and resumen['estrategia'] == 'Momentum'
+    assert pd.Timestamp(resumen['ultima_vela']) == almacen.index[-1]
+    assert resumen['precio_actual'] == almacen['Close'].iloc[-1]
+    assert resumen['senal']['action'] and 'total_operaciones' in resumen
+    assert all(isinstance(nivel, float) for nivel in resumen['soportes'] + resumen['resistencias'])
+
+
+def test_datos_csv(almacen, capsys):
+    assert main(['PRUEBA', '--sin-descarga', '--salida', 'datos', '--formato', 'csv']) == 0
+    datos = pd.read_csv(io.StringIO(capsys.readouterr().out), index_col=0)
+    assert len(datos) == len(recortar_periodo(almacen, '1y')) and {'Open', 'High', 'Low', 'Close', 'Volume', 'RSI_14', 'senal_momentum'} <= set(datos.columns)
+
+
+def test_replay_json(almacen, capsys):
+    assert main(['PRUEBA', '--sin-descarga', '--salida', 'replay', '--velas-resultado', '3']) == 0
+    recomendaciones = json.loads(capsys.readouterr().out)
+    assert recomendaciones and {'rentabilidad'} <= set(recomendaciones[0])
+
+
+def test_activo_sin_datos(almacen, capsys):
+    assert main(['NOEXISTE', '--sin-descarga']) == 1
+    assert "NOEXISTE" in capsys.readouterr().err
+
+
+def test_replay_ml_no_admitido(almacen, capsys):
+    assert main(['PRUEBA', '--sin-descarga', '--salida', 'replay', '--estrategia', ESTRATEGIA_ML]) == 2
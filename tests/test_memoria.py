@@ -0,0 +1,30 @@
+"""La disposición compacta del histórico ocupa menos y da los mismos resultados que la anterior."""
+import numpy as np
+import pytest
+
+from benchmarks.bench_memoria import comprobar, resultados, sesion
+from benchmarks.datos_sinteticos import generar_escenario
+from motor.estrategias import ESTRATEGIAS
+from motor.memoria import BITS_SENALES, huella_memoria, senal
+from motor.pipeline import aplicar_indicadores
+
+
+@pytest.fixture(scope='module')
+def velas():
+    return generar_escenario('60d_5m')
+
+
+@pytest.mark.parametrize('estrategia', ESTRATEGIAS)
+def test_resultados_identicos(velas, estrategia):
+    anterior, probabilidades_anterior = sesion(velas, estrategia, compacto=False)
+    compacto, probabilidades_compacto = sesion(velas, estrategia, compacto=True)
+    if probabilidades_anterior is not None: assert np.array_equal(probabilidades_anterior, probabilidades_compacto)
+    comprobar(resultados(anterior, estrategia), resultados(compacto, estrategia))
+    assert huella_memoria(compacto) < huella_memoria(anterior) * 0.75
+
+
+def test_mascara_de_senales(velas):
+    completo = aplicar_indicadores(velas.copy())
+    compacto = aplicar_indicadores(velas.copy(), compacto=True)
+    for columna in BITS_SENALES + ['volumen_alto', 'senal_venta']:
+        assert np.array_equal(senal(compacto, columna), completo[columna].to_numpy()), columna
@@ -0,0 +1,43 @@
+"""Registro de modelos: reentrenamiento programado con la ventana del período, datos cambiados y deriva."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.modelo import FEATURES_ML, RegistroModelos, preparar_datos_ml
+
+VENTANA = 600
+
+
+@pytest.fixture(scope='module')
+def df_ml():
+    df = generar_ohlcv(900, intervalo='1h')
+    df[COLUMNAS_INDICADORES] = calcular_indicadores(df)
+    return preparar_datos_ml(df, 5)
+
+
+def test_ventana_deslizante_reentrena_cada_n_velas_nuevas(tmp_path, df_ml):
+    registro = RegistroModelos(str(tmp_path), reentrenar_cada=40, n_jobs=1)
+    reentrenado = [registro.predecir('SIM', '1h', df_ml.iloc[inicio:inicio + VENTANA], 5)['reentrenado'] for inicio in range(0, 120, 20)]
+    assert reentrenado == [True, False, True, False, True, False]
+
+
+def test_filas_de_entrenamiento_cambiadas(tmp_path, df_ml):
+    registro = RegistroModelos(str(tmp_path), n_jobs=1)
+    registro.predecir('SIM', '1h', df_ml.iloc[:VENTANA], 5)
+    assert registro.predecir('SIM', '1h', df_ml.iloc[10:VENTANA + 10], 5)['motivo'] == "modelo reutilizado"
+    cambiado = df_ml.iloc[10:VENTANA + 10].copy()
+    cambiado.iloc[20, cambiado.columns.get_loc('EMA_20')] *= 1.5
+    assert registro.predecir('SIM', '1h', cambiado, 5)['motivo'] == "los datos de entrenamiento han cambiado"
+
+
+def test_deriva_sin_filas_sin_etiqueta():
+    registro = RegistroModelos(min_filas_deriva=5)
+    indice = pd.date_range('2024-01-01', periods=30, freq='h')
+    X = pd.DataFrame(0.0, index=indice, columns=FEATURES_ML)
+    y = pd.Series(np.r_[np.ones(25, dtype=bool), np.zeros(5, dtype=bool)], index=indice)
+    # Acierta en todas las filas con etiqueta; en las 5 últimas el objetivo es un False provisional.
+    probabilidades = pd.Series(0.9, index=indice)
+    entrada = {'fin_entrenamiento': indice[9], 'ultima_vela': indice[-1], 'precision_referencia': 1.0}
+    assert registro._motivo_reentrenamiento(entrada, X, y, probabilidades, prediction_horizon=5) is None
@@ -0,0 +1,42 @@
+"""Optimización por rejilla en memoria compartida frente al backtest tradicional ejecutado directamente."""
+import pandas as pd
+import pytest
+
+from benchmarks.bench_optimizacion import preparar_datos_estrategias
+from motor.backtest import backtest_tradicional, metricas_operaciones
+from motor.estrategias import ESTRATEGIA_ML, ESTRATEGIAS, columna_estrategia
+from motor.optimizacion import generar_rejilla, optimizar
+
+REJILLA = dict(estrategias=ESTRATEGIAS, stop_loss_pct=[0.02, 0.05], take_profit_pct=[0.04, 0.10], trailing_stop_pct=[0.01, 0.03],
+               ml_threshold=[0.5, 0.7], use_trailing_stop=(True, False))
+
+
+@pytest.fixture(scope='module')
+def datos():
+    # Señales aleatorias por estrategia y una probabilidad de subida con NaN en las primeras velas.
+    return preparar_datos_estrategias(2_000)
+
+
+@pytest.fixture(scope='module')
+def tabla(datos):
+    return optimizar(datos, max_workers=1, **REJILLA)
+
+
+def test_cada_fila_igual_que_el_backtest(datos, tabla):
+    assert len(tabla) == len(generar_rejilla(**REJILLA)) and ESTRATEGIA_ML in set(tabla['estrategia'])
+    assert datos['probabilidad_subida'].isna().any()
+    for fila in tabla.itertuples(index=False):
+        df = datos.copy()
+        df['senal_compra'] = df['probabilidad_subida'] > fila.ml_threshold if fila.estrategia == ESTRATEGIA_ML else df[columna_estrategia(fila.estrategia)]
+        operaciones = backtest_tradicional(df, fila.stop_loss_pct, fila.take_profit_pct, fila.use_trailing_stop, fila.trailing_stop_pct)
+        esperado = metricas_operaciones([operacion['rentabilidad'] for operacion in operaciones])
+        assert {clave: getattr(fila, clave) for clave in esperado} == esperado, fila
+
+
+def test_ordenada_por_rentabilidad(tabla):
+    orden = list(zip(tabla['rentabilidad_total'], tabla['factor_beneficio']))
+    assert orden == sorted(orden, reverse=True)
+
+
+def test_varios_procesos_igual_que_uno(datos, tabla):
+    pd.testing.assert_frame_equal(optimizar(datos, max_workers=3, lotes_por_trabajador=2, **REJILLA), tabla)
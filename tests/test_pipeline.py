@@ -0,0 +1,13 @@
+"""El pipeline sin interfaz y la línea de comandos usan por defecto los mismos parámetros que la app."""
+import inspect
+
+from motor.__main__ import _argumentos
+from motor.pipeline import analizar
+
+
+def test_valores_por_defecto_de_la_app():
+    parametros = inspect.signature(analizar).parameters
+    args = _argumentos(['AAPL'])
+    assert parametros['stop_loss_pct'].default == args.stop_loss / 100 == 0.05
+    assert parametros['take_profit_pct'].default == args.take_profit / 100 == 0.10
+    assert parametros['trailing_stop_pct'].default == args.trailing_stop / 100 == 0.03
@@ -0,0 +1,29 @@
+"""El replay recomienda lo mismo, vela a vela, que el servicio de la señal en vivo."""
+import pytest
+
+from benchmarks.bench_replay import comprobar_equivalencia
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.estrategias import ESTRATEGIA_ML, ESTRATEGIAS
+from motor.replay import replay, resumen_replay
+
+
+@pytest.fixture(scope='module')
+def velas():
+    return generar_ohlcv(400, intervalo='5m', semilla=3)
+
+
+@pytest.mark.parametrize('estrategia', [estrategia for estrategia in ESTRATEGIAS if estrategia != ESTRATEGIA_ML])
+def test_igual_que_el_servicio_en_vivo(velas, estrategia):
+    comprobar_equivalencia(velas, estrategia)
+
+
+def test_resultado_y_resumen(velas):
+    recomendaciones = replay(velas, velas_resultado=5)
+    pendientes = recomendaciones.index > velas.index[-6]
+    assert recomendaciones.loc[pendientes, 'rentabilidad'].isna().all() and recomendaciones.loc[~pendientes, 'rentabilidad'].notna().all()
+    assert resumen_replay(recomendaciones)['recomendaciones'].sum() == (~pendientes).sum()
+
+
+def test_ml_no_admitida(velas):
+    with pytest.raises(ValueError):
+        replay(velas, ESTRATEGIA_ML)
@@ -0,0 +1,68 @@
+"""Servicio de la señal en vivo frente a recalcular la señal con todo el histórico hasta cada vela."""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_servicio import ESTRATEGIA, comprobar_evento, senal_completa
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.servicio import VENTANA_SENAL, FuenteReplay, ServicioSenales
+from motor.soportes_resistencias import SoportesResistenciasIncrementales, calculate_support_resistance
+
+HISTORICO = 300
+
+
+@pytest.fixture(scope='module')
+def velas():
+    return generar_ohlcv(HISTORICO + 120, intervalo='5m', semilla=11)
+
+
+def test_cada_evento_igual_que_el_recalculo(velas):
+    servicio = ServicioSenales(velas.iloc[:HISTORICO], estrategia=ESTRATEGIA)
+    eventos = []
+    servicio.suscribir(eventos.append)
+    asyncio.run(servicio.ejecutar(FuenteReplay(velas.iloc[HISTORICO:])))
+    assert len(eventos) == len(velas) - HISTORICO
+    for i, evento in enumerate(eventos, HISTORICO + 1):
+        comprobar_evento(evento, senal_completa(velas.iloc[:i]))
+    # Solo se conservan las últimas velas y filas de indicadores.
+    assert len(servicio.velas) == servicio.max_velas and len(servicio.motor.indicadores()) <= 2 * VENTANA_SENAL
+
+
+def _revisada(velas, posicion):
+    revisada = velas.iloc[posicion:posicion + 1].copy()
+    revisada[['High', 'Close']] *= 1.01
+    revisada['Low'] *= 0.99
+    return revisada
+
+
+@pytest.mark.parametrize('nuevas', [0, 1, 3])
+def test_vela_revisada(velas, nuevas):
+    # La última vela llega revisada, sola o junto a las siguientes (como las emite FuenteAlmacen).
+    servicio = ServicioSenales(velas.iloc[:HISTORICO], estrategia=ESTRATEGIA)
+    for fin in range(HISTORICO + 1, HISTORICO + 40, nuevas + 1):
+        servicio.procesar(_revisada(velas, fin - 2))
+        evento = servicio.procesar(pd.concat([velas.iloc[fin - 2:fin - 1], velas.iloc[fin - 1:fin - 1 + nuevas]]))
+        assert evento['revisada']
+        comprobar_evento(evento, senal_completa(velas.iloc[:fin - 1 + nuevas]))
+
+
+@pytest.mark.parametrize('window, threshold_pct', [(5, 0.5), (4, 0.2), (11, 1.0)])
+def test_soportes_resistencias_con_solo_la_cola(window, threshold_pct):
+    velas = generar_ohlcv(1_500, intervalo='5m', semilla=window)
+    highs, lows = velas['High'].to_numpy(), velas['Low'].to_numpy()
+    incremental = SoportesResistenciasIncrementales(window, threshold_pct)
+    anterior = 0
+    for n in range(1, len(velas) + 1, 7):
+        inicio = max(anterior - window - 1, 0)
+        niveles = incremental.actualizar(highs[inicio:n], lows[inicio:n], inicio=inicio)
+        assert niveles == calculate_support_resistance(velas.iloc[:n], window, threshold_pct)
+        anterior = n
+
+
+def test_faltan_velas_anteriores():
+    velas = generar_ohlcv(100, intervalo='5m')
+    incremental = SoportesResistenciasIncrementales()
+    incremental.actualizar(velas['High'].to_numpy()[:50], velas['Low'].to_numpy()[:50])
+    with pytest.raises(ValueError):
+        incremental.actualizar(velas['High'].to_numpy()[48:60], velas['Low'].to_numpy()[48:60], inicio=48)
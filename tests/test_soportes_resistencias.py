@@ -0,0 +1,59 @@
+"""Soportes y resistencias vectorizados: idénticos, bit a bit, al bucle original por vela."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_soportes_resistencias import calculate_support_resistance_bucle, cluster_levels_bucle, fractales_bucle
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.soportes_resistencias import calculate_support_resistance, cluster_levels, fractales
+
+
+def _bits(niveles):
+    return [float(nivel).hex() for nivel in niveles]
+
+
+def _comprobar(df, window, threshold_pct):
+    esperados = calculate_support_resistance_bucle(df, window, threshold_pct)
+    obtenidos = calculate_support_resistance(df, window, threshold_pct)
+    assert [_bits(niveles) for niveles in obtenidos] == [_bits(niveles) for niveles in esperados]
+
+
+@pytest.mark.parametrize('semilla', [1, 2])
+@pytest.mark.parametrize('window', [2, 3, 5, 11, 21])
+def test_fractales_igual_que_el_bucle(semilla, window):
+    df = generar_ohlcv(600, semilla=semilla)
+    maximos, minimos = fractales_bucle(df['High'], df['Low'], window)
+    assert list(fractales(df['High'], window, es_maximo=True)) == maximos
+    assert list(fractales(df['Low'], window, es_maximo=False)) == minimos
+
+
+@pytest.mark.parametrize('window', [3, 5, 11, 21])
+@pytest.mark.parametrize('threshold_pct', [0.05, 0.5, 2.0])
+def test_paseo_aleatorio(window, threshold_pct):
+    _comprobar(generar_ohlcv(800, semilla=window), window, threshold_pct)
+
+
+@pytest.mark.parametrize('threshold_pct', [0.1, 0.5, 5.0])
+def test_cluster_levels_con_grupos_grandes_y_ceros(threshold_pct):
+    # Con grupos de 8 o más niveles la media deja de ser la suma acumulada; los ceros usan el umbral absoluto.
+    rng = np.random.default_rng(7)
+    niveles = np.concatenate([100 + rng.normal(0, 0.05, 200), 101 + rng.normal(0, 0.3, 50), [0.0, 0.0, 0.0005, 0.01]])
+    assert _bits(cluster_levels(niveles, threshold_pct)) == _bits(cluster_levels_bucle(niveles, threshold_pct))
+    assert cluster_levels([], threshold_pct) == cluster_levels_bucle([], threshold_pct) == []
+
+
+@pytest.mark.parametrize('n_velas', [0, 1, 4, 5])
+def test_menos_velas_que_la_ventana(n_velas):
+    df = generar_ohlcv(n_velas) if n_velas else generar_ohlcv(1).iloc[:0]
+    _comprobar(df, 11, 0.5)
+    assert calculate_support_resistance(df, 11, 0.5) == ([], [])
+
+
+def test_precios_planos():
+    df = pd.DataFrame({'High': np.full(50, 100.0), 'Low': np.full(50, 99.0)})
+    _comprobar(df, 5, 0.5)
+    assert calculate_support_resistance(df, 5, 0.5) == ([], [])
+    # Una meseta con un solo pico: solo el pico es fractal.
+    df.loc[25, 'High'], df.loc[30, 'Low'] = 101.0, 98.0
+    _comprobar(df, 5, 0.5)
+    assert calculate_support_resistance(df, 5, 0.5) == ([98.0], [101.0])
@@ -0,0 +1,54 @@
+"""Walk-forward: pliegues sin fuga de etiquetas, paso de reentrenamiento y pliegues en paralelo iguales que en secuencia."""
+import numpy as np
+import pytest
+
+from benchmarks.bench_walkforward import comprobar_sin_fuga
+from benchmarks.datos_sinteticos import generar_ohlcv
+from motor.indicadores import COLUMNAS_INDICADORES, calcular_indicadores
+from motor.modelo import precision, preparar_datos_ml
+from motor.walkforward import generar_pliegues, paso_reentrenamiento, precision_global, walk_forward
+
+HORIZONTE = 5
+
+
+@pytest.fixture(scope='module')
+def df_ml():
+    df = generar_ohlcv(700, intervalo='1d')
+    df[COLUMNAS_INDICADORES] = calcular_indicadores(df)
+    return preparar_datos_ml(df, HORIZONTE)
+
+
+@pytest.mark.parametrize('n_filas, reentrenar_cada, ventana_maxima', [(700, 60, None), (5_000, 100, 300), (10_000, 20, None)])
+def test_pliegues_sin_fuga(n_filas, reentrenar_cada, ventana_maxima):
+    pliegues = generar_pliegues(n_filas, HORIZONTE, reentrenar_cada, ventana_maxima=ventana_maxima)
+    paso = paso_reentrenamiento(n_filas, HORIZONTE, reentrenar_cada)
+    assert paso >= reentrenar_cada and len(pliegues) <= 20
+    for inicio_entrenamiento, fin_entrenamiento, inicio_prueba, fin_prueba in pliegues:
+        assert fin_entrenamiento + HORIZONTE <= inicio_prueba < fin_prueba <= n_filas
+        assert inicio_entrenamiento < fin_entrenamiento and fin_prueba - inicio_prueba <= paso
+        if ventana_maxima is not None: assert fin_entrenamiento - inicio_entrenamiento <= ventana_maxima
+    assert all(anterior[3] == siguiente[2] for anterior, siguiente in zip(pliegues, pliegues[1:]))
+    assert pliegues[-1][3] == n_filas
+
+
+def test_paso_de_reentrenamiento():
+    assert paso_reentrenamiento(700, HORIZONTE, 60) == 60
+    # 10.000 filas cada 20 velas serían casi 500 pliegues: el paso se amplía a (10.000 - 500 - 5) / 20 para quedarse en 20.
+    assert paso_reentrenamiento(10_000, HORIZONTE, 20) == 475
+
+
+def test_paralelo_igual_que_secuencial(df_ml):
+    probabilidades, pliegues = walk_forward(df_ml, HORIZONTE, reentrenar_cada=60, max_workers=2)
+    comprobar_sin_fuga(df_ml, HORIZONTE, 60, probabilidades)
+    secuenciales, pliegues_secuenciales = walk_forward(df_ml, HORIZONTE, reentrenar_cada=60, max_workers=1)
+    assert probabilidades.equals(secuenciales)
+    assert pliegues.drop(columns='segundos').equals(pliegues_secuenciales.drop(columns='segundos'))
+    assert probabilidades.iloc[:pliegues['filas_prueba'].iloc[0]].isna().any() and probabilidades.iloc[-1:].notna().all()
+
+
+def test_precision_global_sobre_las_filas_evaluadas(df_ml):
+    probabilidades, pliegues = walk_forward(df_ml, HORIZONTE, reentrenar_cada=60, max_workers=1)
+    assert pliegues['filas_evaluadas'].sum() == probabilidades.iloc[:-HORIZONTE].notna().sum()
+    evaluadas = probabilidades.iloc[:-HORIZONTE].notna().to_numpy()
+    esperada = precision(probabilidades.iloc[:-HORIZONTE].to_numpy()[evaluadas], df_ml['target'].iloc[:-HORIZONTE].to_numpy()[evaluadas])
+    assert np.isclose(precision_global(pliegues), esperada)